@@ -1,18 +1,58 @@
 """Base agent class untuk semua agent."""
 
+import itertools
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from ..utils.ollama_client import ollama_client
-from ..config.settings import model_config
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple, Type, Union
+from ..utils.ollama_client import get_async_ollama_client, get_ollama_client
+from ..utils.stream_renderer import StreamAccumulator, StreamRenderer
+from ..utils.telemetry import telemetry
+from ..utils.token_budget import token_budget
+from ..config.settings import context_config, ollama_config, structured_config
+from ..utils.errors import CircuitOpenError, OllamaTimeoutError
+from ..utils.failover import model_failover
+from ..utils.memory_scheduler import MemoryLease, memory_scheduler
+from ..utils.structured_output import StructuredOutputError, decode, repair_prompt
+from pydantic import BaseModel
 from rich.console import Console
 from rich.panel import Panel
 
 console = Console()
 
 
+def _prompt_chars(messages: list[Dict[str, str]]) -> int:
+    """Total panjang prompt (karakter) untuk telemetry prompt reuse."""
+    return sum(len(message.get('content', '')) for message in messages)
+
+
+def _open_stream(stream: Iterator[Dict]) -> Iterator[Dict]:
+    """Ambil chunk pertama sekarang agar error sebelum token pertama bisa di-failover."""
+    first = next(stream, None)
+    return stream if first is None else itertools.chain([first], stream)
+
+
+async def _aopen_stream(stream: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+    """Versi async dari _open_stream."""
+    first = await anext(stream, None)
+
+    async def chained():
+        if first is not None:
+            yield first
+        async for chunk in stream:
+            yield chunk
+
+    return chained()
+
+
 class BaseAgent(ABC):
     """Base class untuk semua agent."""
 
+    # Opt-in response cache; aktifkan di agent yang output-nya layak di-reuse
+    cache_responses: bool = False
+
+    # Key AgentRole untuk override timeout per role (lihat OllamaConfig.role_timeouts)
+    agent_role: str = ""
+
     def __init__(self, model: str, role: str, temperature: float = 0.7):
         """
         Initialize base agent.
@@ -25,7 +65,10 @@ class BaseAgent(ABC):
         self.model = model
         self.role = role
         self.temperature = temperature
-        self.client = ollama_client
+        self.client = get_ollama_client()
+        self.async_client = get_async_ollama_client()
+        # Berapa lama Ollama menahan model di memori setelah call (None = default server)
+        self.keep_alive = None
 
     @abstractmethod
     def execute(self, **kwargs) -> Any:
@@ -44,7 +87,9 @@ class BaseAgent(ABC):
         self,
         messages: list[Dict[str, str]],
         stream: bool = False,
-        temperature: Optional[float] = None
+        temperature: Optional[float] = None,
+        options: Optional[Dict] = None,
+        format: Optional[Union[str, Dict]] = None
     ):
         """
         Chat dengan model.
@@ -53,25 +98,106 @@ class BaseAgent(ABC):
             messages: List of messages
             stream: Apakah streaming
             temperature: Override temperature
+            options: Options Ollama tambahan (num_ctx, num_predict, dll)
+            format: "json" atau JSON schema untuk output terstruktur
 
         Returns:
-            Response dari model atau Generator jika streaming
+            Response dari model atau Generator jika streaming (failover dan
+            izin memori berlaku sampai stream habis atau ditutup)
         """
         temp = temperature if temperature is not None else self.temperature
 
-        return self.client.chat(
-            model=self.model,
-            messages=messages,
-            stream=stream,
-            temperature=temp
+        def call(model: str):
+            return self.client.chat(
+                model=model,
+                messages=messages,
+                stream=stream,
+                temperature=temp,
+                cache=self.cache_responses,
+                keep_alive=self.keep_alive,
+                options=options or {},
+                format=format,
+                **self._timeouts()
+            )
+
+        if stream:
+            started = time.perf_counter()
+            chunks, model, lease = self._open_leased_stream(call)
+            return self._leased_stream(chunks, model, lease, started, messages)
+
+        def reserved_call(model: str):
+            # Tunggu sampai model muat di budget memori bersama call lain
+            with memory_scheduler.reserve(model):
+                return call(model)
+
+        started = time.perf_counter()
+        response, model = model_failover.run(self.agent_role, self.model, reserved_call)
+        telemetry.record(
+            self.role, model, response, time.perf_counter() - started,
+            prompt_chars=_prompt_chars(messages)
         )
+        return response
     
+    def chat_structured(
+        self,
+        messages: list[Dict[str, str]],
+        response_model: Type[BaseModel],
+        schema: Optional[Dict] = None,
+        temperature: Optional[float] = None,
+        options: Optional[Dict] = None
+    ) -> BaseModel:
+        """
+        Chat dengan output JSON yang dibatasi dan divalidasi oleh schema.
+
+        Schema dikirim sebagai `format` sehingga Ollama hanya men-generate
+        JSON yang sesuai. Jika output tetap tidak valid (misal terpotong
+        num_predict), output dan daftar error dikirim balik ke model untuk
+        diperbaiki, maksimal `structured_config.max_repairs` kali.
+
+        Args:
+            messages: List of messages
+            response_model: Model pydantic untuk validasi
+            schema: JSON schema untuk `format` (default: schema response_model)
+            temperature: Override temperature
+            options: Options Ollama tambahan (num_ctx, num_predict, dll)
+
+        Returns:
+            Instance response_model
+
+        Raises:
+            StructuredOutputError: Jika output masih tidak valid setelah repair
+        """
+        schema = schema or response_model.model_json_schema()
+        fmt = schema if structured_config.enabled else None
+        history = list(messages)
+        for attempt in range(structured_config.max_repairs + 1):
+            response = self.chat(history, temperature=temperature, options=options, format=fmt)
+            content = response['message']['content']
+            try:
+                return decode(response_model, content)
+            except StructuredOutputError as e:
+                error = e
+            console.print(
+                f"[yellow]⚠ {self.role}: output tidak sesuai schema ({error}), "
+                f"memperbaiki ({attempt + 1}/{structured_config.max_repairs})...[/yellow]"
+                if attempt < structured_config.max_repairs else
+                f"[yellow]⚠ {self.role}: output tetap tidak sesuai schema ({error})[/yellow]"
+            )
+            history = list(messages) + [
+                {"role": "assistant", "content": content},
+                {"role": "user", "content": repair_prompt(error, None if fmt else schema)},
+            ]
+        raise error
+
     def chat_stream(
         self,
         messages: list[Dict[str, str]],
         temperature: Optional[float] = None,
         display_live: bool = True,
-        show_progress: bool = True
+        show_progress: bool = True,
+        options: Optional[Dict] = None,
+        sinks: Optional[List] = None,
+        format: Optional[Union[str, Dict]] = None
     ) -> str:
         """
         Chat dengan streaming dan display real-time.
@@ -81,75 +207,353 @@ class BaseAgent(ABC):
             temperature: Override temperature
             display_live: Apakah menampilkan output secara live
             show_progress: Show progress indicators
+            options: Options Ollama tambahan (num_ctx, num_predict, dll)
+            sinks: Tujuan tambahan untuk setiap potongan teks (misal FileSink)
+            format: "json" atau JSON schema untuk output terstruktur
 
         Returns:
             Complete response text
         """
         temp = temperature if temperature is not None else self.temperature
-        
-        try:
-            stream = self.client.chat(
-                model=self.model,
+        accumulator = StreamAccumulator()
+        outputs = list(sinks or [])
+        if display_live:
+            outputs.append(StreamRenderer())
+
+        # Izin memori dipegang selama stream berjalan
+        leases = []
+
+        def call(candidate: str):
+            return self.client.chat(
+                model=candidate,
                 messages=messages,
                 stream=True,
-                temperature=temp
+                temperature=temp,
+                cache=self.cache_responses,
+                keep_alive=self.keep_alive,
+                options=options or {},
+                format=format,
+                **self._timeouts()
             )
-            
-            full_response = ""
-            word_count = 0
-            char_count = 0
-            
+
+        model, opened = self.model, False
+        try:
+            started = time.perf_counter()
+            # Failover hanya sebelum token pertama; stream yang putus di tengah
+            # diulang orchestrator (model ditandai gagal agar percobaan berikutnya pindah)
+            stream, model, lease = self._open_leased_stream(call)
+            leases.append(lease)
+
+            opened = True
+            ttft = None
+            final_chunk = None
+
             if display_live and show_progress:
-                console.print(f"\n[bold cyan]🤖 {self.model}[/bold cyan] [dim]sedang menulis...[/dim]")
-                console.print("[dim]" + "─" * 70 + "[/dim]\n")
-            
-            # Stream output with word-level buffering for better readability
-            # Accumulate characters until we hit a space, then print the complete word
-            word_buffer = ""
-            
+                self._print_stream_header(model)
+
             for chunk in stream:
-                if 'message' in chunk and 'content' in chunk['message']:
-                    content = chunk['message']['content']
-                    full_response += content
-                    char_count += len(content)
-                    
-                    if display_live:
-                        word_buffer += content
-                        
-                        # Print when we have a complete word (space, newline, or punctuation followed by space)
-                        if ' ' in word_buffer or '\n' in word_buffer:
-                            print(word_buffer, end='', flush=True)
-                            word_buffer = ""
-            
-            # Print any remaining buffer
-            if display_live and word_buffer:
-                print(word_buffer, end='', flush=True)
-            
-            if display_live:
-                # Count final words
-                word_count = len(full_response.split())
-                
-                # New line after streaming
-                print()  # Simple newline
-                
-                if show_progress:
-                    console.print(f"\n[dim]{'─' * 70}[/dim]")
-                    console.print(f"[green]✓[/green] [bold]Selesai![/bold] "
-                                f"[cyan]{word_count}[/cyan] kata "
-                                f"[dim]({char_count} karakter)[/dim]")
-                
-            return full_response
-            
+                if chunk.get('done') or chunk.get('cached'):
+                    # Chunk terakhir membawa statistik eval/prompt_eval/load
+                    # (cache hit: satu chunk berisi seluruh teks, tidak dihitung di telemetry)
+                    final_chunk = chunk
+                content = chunk.get('message', {}).get('content')
+                if content:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    accumulator.append(content)
+                    for sink in outputs:
+                        sink.write(content)
+
+            telemetry.record(
+                self.role, model, final_chunk, time.perf_counter() - started,
+                streamed=True, ttft=ttft, prompt_chars=_prompt_chars(messages)
+            )
+
+            for sink in outputs:
+                sink.close()
+            if display_live and show_progress:
+                self._print_stream_footer(accumulator)
+
+            return accumulator.text()
+
+        except (OllamaTimeoutError, CircuitOpenError) as e:
+            # Server macet/down: fallback non-streaming ke server yang sama tidak membantu,
+            # biarkan orchestrator yang mengulang (teks .partial tetap tersimpan)
+            for sink in outputs:
+                sink.abort()
+            if opened:
+                model_failover.record_failure(model, e)
+            raise
         except Exception as e:
+            for sink in outputs:
+                sink.abort()
+            # Lepas izin memori dulu: fallback bisa memakai model lain
+            for lease in leases:
+                lease.release()
             console.print(f"\n[red]✗ Error saat streaming: {e}[/red]")
             # Fallback to non-streaming
             console.print("[yellow]⚠ Beralih ke mode non-streaming...[/yellow]")
             try:
-                response = self.chat(messages, stream=False, temperature=temp)
+                response = self.chat(
+                    messages, stream=False, temperature=temp, options=options, format=format
+                )
+                return response['message']['content']
+            except Exception as e2:
+                # Jangan kembalikan teks kosong: chapter harus tercatat gagal
+                console.print(f"[red]✗ Error fallback: {e2}[/red]")
+                raise
+        finally:
+            for lease in leases:
+                lease.release()
+
+    def _open_leased_stream(self, call) -> Tuple[Iterator[Dict], str, MemoryLease]:
+        """
+        Buka stream dengan failover model dan izin memori scheduler.
+
+        Args:
+            call: Callable(model) yang membuka stream Ollama
+
+        Returns:
+            (stream, model yang berhasil, izin memori yang harus di-release)
+        """
+        leases = []
+
+        def open_candidate(candidate: str):
+            lease = memory_scheduler.acquire(candidate)
+            try:
+                stream = _open_stream(call(candidate))
+            except BaseException:
+                lease.release()
+                raise
+            leases.append(lease)
+            return stream
+
+        stream, model = model_failover.run(self.agent_role, self.model, open_candidate)
+        return stream, model, leases[-1]
+
+    def _leased_stream(
+        self,
+        stream: Iterator[Dict],
+        model: str,
+        lease: MemoryLease,
+        started: float,
+        messages: list[Dict[str, str]]
+    ) -> Iterator[Dict]:
+        """Teruskan chunk stream; telemetry dicatat dan izin memori dilepas saat stream selesai."""
+        ttft = None
+        final_chunk = None
+        try:
+            for chunk in stream:
+                if chunk.get('done') or chunk.get('cached'):
+                    final_chunk = chunk
+                if ttft is None and chunk.get('message', {}).get('content'):
+                    ttft = time.perf_counter() - started
+                yield chunk
+            telemetry.record(
+                self.role, model, final_chunk, time.perf_counter() - started,
+                streamed=True, ttft=ttft, prompt_chars=_prompt_chars(messages)
+            )
+        except (OllamaTimeoutError, CircuitOpenError) as e:
+            # Sama seperti chat_stream: percobaan berikutnya pindah ke model lain
+            model_failover.record_failure(model, e)
+            raise
+        finally:
+            lease.release()
+
+    async def achat(
+        self,
+        messages: list[Dict[str, str]],
+        temperature: Optional[float] = None,
+        options: Optional[Dict] = None,
+        format: Optional[Union[str, Dict]] = None
+    ) -> Dict:
+        """
+        Versi async dari chat (non-streaming).
+
+        Args:
+            messages: List of messages
+            temperature: Override temperature
+            options: Options Ollama tambahan (num_ctx, num_predict, dll)
+            format: "json" atau JSON schema untuk output terstruktur
+
+        Returns:
+            Response dari model
+        """
+        temp = temperature if temperature is not None else self.temperature
+
+        async def call(model: str):
+            lease = await memory_scheduler.aacquire(model)
+            try:
+                return await self.async_client.chat(
+                    model=model,
+                    messages=messages,
+                    temperature=temp,
+                    cache=self.cache_responses,
+                    keep_alive=self.keep_alive,
+                    options=options or {},
+                    format=format,
+                    **self._timeouts()
+                )
+            finally:
+                lease.release()
+
+        started = time.perf_counter()
+        response, model = await model_failover.arun(self.agent_role, self.model, call)
+        telemetry.record(
+            self.role, model, response, time.perf_counter() - started,
+            prompt_chars=_prompt_chars(messages)
+        )
+        return response
+
+    async def achat_stream(
+        self,
+        messages: list[Dict[str, str]],
+        temperature: Optional[float] = None,
+        display_live: bool = False,
+        show_progress: bool = False,
+        options: Optional[Dict] = None,
+        sinks: Optional[List] = None,
+        format: Optional[Union[str, Dict]] = None
+    ) -> str:
+        """
+        Versi async dari chat_stream.
+
+        Default-nya tidak menampilkan output karena biasanya banyak stream
+        berjalan bersamaan; aktifkan display_live hanya untuk satu stream.
+
+        Args:
+            messages: List of messages
+            temperature: Override temperature
+            display_live: Apakah menampilkan output secara live
+            show_progress: Show progress indicators
+            options: Options Ollama tambahan (num_ctx, num_predict, dll)
+            sinks: Tujuan tambahan untuk setiap potongan teks (misal FileSink)
+            format: "json" atau JSON schema untuk output terstruktur
+
+        Returns:
+            Complete response text
+        """
+        temp = temperature if temperature is not None else self.temperature
+        accumulator = StreamAccumulator()
+        outputs = list(sinks or [])
+        if display_live:
+            outputs.append(StreamRenderer())
+
+        leases = []
+
+        async def open_candidate(candidate: str):
+            lease = await memory_scheduler.aacquire(candidate)
+            try:
+                stream = await _aopen_stream(self.async_client.chat_stream(
+                    model=candidate,
+                    messages=messages,
+                    temperature=temp,
+                    cache=self.cache_responses,
+                    keep_alive=self.keep_alive,
+                    options=options or {},
+                    format=format,
+                    **self._timeouts()
+                ))
+            except BaseException:
+                lease.release()
+                raise
+            leases.append(lease)
+            return stream
+
+        model, opened = self.model, False
+        try:
+            ttft = None
+            final_chunk = None
+            started = time.perf_counter()
+
+            stream, model = await model_failover.arun(self.agent_role, self.model, open_candidate)
+            opened = True
+
+            if display_live and show_progress:
+                self._print_stream_header(model)
+
+            async for chunk in stream:
+                if chunk.get('done') or chunk.get('cached'):
+                    final_chunk = chunk
+                content = chunk.get('message', {}).get('content')
+                if content:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    accumulator.append(content)
+                    for sink in outputs:
+                        sink.write(content)
+
+            telemetry.record(
+                self.role, model, final_chunk, time.perf_counter() - started,
+                streamed=True, ttft=ttft, prompt_chars=_prompt_chars(messages)
+            )
+
+            for sink in outputs:
+                sink.close()
+            if display_live and show_progress:
+                self._print_stream_footer(accumulator)
+
+            return accumulator.text()
+
+        except (OllamaTimeoutError, CircuitOpenError) as e:
+            # Server macet/down: fallback non-streaming ke server yang sama tidak membantu,
+            # biarkan orchestrator yang mengulang (teks .partial tetap tersimpan)
+            for sink in outputs:
+                sink.abort()
+            if opened:
+                model_failover.record_failure(model, e)
+            raise
+        except Exception as e:
+            for sink in outputs:
+                sink.abort()
+            for lease in leases:
+                lease.release()
+            console.print(f"\n[red]✗ Error saat streaming: {e}[/red]")
+            console.print("[yellow]⚠ Beralih ke mode non-streaming...[/yellow]")
+            try:
+                response = await self.achat(
+                    messages, temperature=temp, options=options, format=format
+                )
                 return response['message']['content']
             except Exception as e2:
+                # Jangan kembalikan teks kosong: chapter harus tercatat gagal
                 console.print(f"[red]✗ Error fallback: {e2}[/red]")
-                return ""
+                raise
+        finally:
+            for lease in leases:
+                lease.release()
+
+    def _timeouts(self) -> Dict[str, float]:
+        """Deadline dan stall timeout untuk role agent ini."""
+        timeout, stall_timeout = ollama_config.timeouts_for(self.agent_role)
+        return {"timeout": timeout, "stall_timeout": stall_timeout}
+
+    def _print_stream_header(self, model: str):
+        """Header sebelum output streaming ditampilkan."""
+        console.print(f"\n[bold cyan]🤖 {model}[/bold cyan] [dim]sedang menulis...[/dim]")
+        console.print("[dim]" + "─" * 70 + "[/dim]\n")
+
+    def _print_stream_footer(self, accumulator: StreamAccumulator):
+        """Ringkasan jumlah kata setelah streaming selesai."""
+        console.print(f"\n[dim]{'─' * 70}[/dim]")
+        console.print(f"[green]✓[/green] [bold]Selesai![/bold] "
+                      f"[cyan]{accumulator.word_count}[/cyan] kata "
+                      f"[dim]({accumulator.char_count} karakter)[/dim]")
+
+    def budget_options(self, messages: list[Dict[str, str]], output_tokens: int) -> Dict:
+        """
+        Options num_ctx/num_predict yang pas untuk call ini.
+
+        Args:
+            messages: Messages yang akan dikirim
+            output_tokens: Perkiraan token output yang dibutuhkan
+
+        Returns:
+            Options Ollama, atau {} jika context budgeting dimatikan
+        """
+        if not context_config.enabled:
+            return {}
+        return token_budget.plan(messages, output_tokens)
 
     def display_status(self, message: str, style: str = "info"):
         """
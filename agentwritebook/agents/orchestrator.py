@@ -1,18 +1,59 @@
 """Orchestrator untuk mengoordinasikan semua agents."""
 
-from typing import Dict, Optional
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 from pathlib import Path
+from pydantic import ValidationError
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 from rich.panel import Panel
 
-from .planner_agent import PlannerAgent
+from .planner_agent import OutlineStream, PlannerAgent
 from .writer_agent import WriterAgent
 from .reviewer_agent import ReviewerAgent
-from ..utils.file_manager import file_manager
+from .summarizer_agent import SummarizerAgent
+from ..utils.file_manager import OUTLINE_JSON_FILENAME, get_file_manager
+from ..config.settings import continuity_config, ollama_config, retry_config
+from ..utils.continuity import ContinuityMemory
+from ..utils.errors import CircuitOpenError, OllamaCallError, OllamaTimeoutError
+from ..utils.failover import model_failover
+from ..utils.job_journal import JobJournal
+from ..utils.memory_scheduler import memory_scheduler
+from ..utils.lazy import lazy_singleton
+from ..utils.response_cache import response_cache
+from ..utils.retry import retry_manager
+from ..utils.stream_renderer import FileSink
+from ..utils.structured_output import describe_errors, outline_model
+from ..utils.telemetry import telemetry
 
 console = Console()
 
+# Sentinel akhir stream di pipeline write -> review
+_PIPELINE_DONE = object()
+
+
+def _count_model_loads(models: List[str]) -> int:
+    """Hitung berapa kali model harus di-load untuk urutan call (satu slot VRAM)."""
+    loads = 0
+    previous = None
+    for model in models:
+        if model != previous:
+            loads += 1
+            previous = model
+    return loads
+
+
+def _infer_book_type(outline: Dict) -> str:
+    """Tebak tipe buku dari field outline (non-fiksi punya key_takeaways/key_points)."""
+    chapters = outline.get('chapters', [])
+    if 'key_takeaways' in outline or any('key_points' in c for c in chapters):
+        return "non_fiction"
+    return "fiction"
+
 
 class BookOrchestrator:
     """Orchestrator untuk proses penulisan buku."""
@@ -22,7 +63,8 @@ class BookOrchestrator:
         self.planner = PlannerAgent()
         self.writer = WriterAgent()
         self.reviewer = ReviewerAgent()
-        self.file_manager = file_manager
+        self.summarizer = SummarizerAgent()
+        self.file_manager = get_file_manager()
 
     def create_book(
         self,
@@ -36,7 +78,12 @@ class BookOrchestrator:
         auto_revise: bool = False,
         enable_streaming: bool = False,
         custom_models: dict = None,
-        language: str = "indonesian"
+        language: str = "indonesian",
+        parallel: int = 1,
+        pipeline: bool = False,
+        pipeline_depth: int = 2,
+        schedule: str = "chapter",
+        outline: Optional[Dict] = None
     ) -> Dict:
         """
         Buat buku lengkap dari awal hingga akhir.
@@ -52,52 +99,313 @@ class BookOrchestrator:
             auto_revise: Auto revisi jika score rendah
             enable_streaming: Enable streaming output untuk live preview
             custom_models: Custom model configuration (optional)
+            language: Bahasa penulisan
+            parallel: Jumlah chapter yang ditulis bersamaan (1 = berurutan)
+            pipeline: Review chapter N sambil menulis chapter N+1
+            pipeline_depth: Maksimal chapter yang menunggu review di pipeline
+            schedule: "chapter" (tulis→review per chapter) atau "by-model"
+                (kelompokkan call per model untuk mengurangi model swap)
+            outline: Outline yang sudah jadi (planning dilewati, lihat
+                create_book_from_outline)
 
         Returns:
             Dictionary berisi informasi buku dan path
         """
         # Apply custom models if provided
         if custom_models:
-            if 'planner' in custom_models:
-                self.planner.model = custom_models['planner']
-            if 'writer' in custom_models:
-                self.writer.model = custom_models['writer']
-            if 'reviewer' in custom_models:
-                self.reviewer.model = custom_models['reviewer']
+            self._apply_models(custom_models)
+
+        telemetry.reset()
+        retry_manager.reset_metrics()
+        model_failover.reset_metrics()
+        memory_scheduler.reset_metrics()
+
+        self._check_memory_budget()
+
         console.print(Panel(
             f"[bold cyan]Memulai proses penulisan buku[/bold cyan]\n"
             f"Topik: {topic}\n"
             f"Tipe: {book_type}\n"
-            f"Chapters: {num_chapters}",
+            f"Chapters: {num_chapters}\n"
+            f"Parallel: {max(1, parallel)}",
             title="Book Generation",
             border_style="cyan"
         ))
 
         # Step 1: Buat outline
         console.print("\n[bold]Step 1: Membuat Outline[/bold]")
-        outline = self.planner.execute(
-            topic=topic,
-            book_type=book_type,
-            num_chapters=num_chapters,
-            target_audience=target_audience,
-            additional_info=additional_info
-        )
+        planner_args = {
+            'topic': topic,
+            'book_type': book_type,
+            'num_chapters': num_chapters,
+            'target_audience': target_audience,
+            'additional_info': additional_info
+        }
+        outline_stream = None
+        if outline is not None:
+            console.print(
+                f"[dim]Memakai outline yang sudah ada ({len(outline['chapters'])} chapters), "
+                f"planner dilewati[/dim]"
+            )
+        elif schedule == "by-model":
+            # Fase per model butuh daftar chapter lengkap sebelum fase tulis dimulai
+            outline = self.planner.execute(**planner_args)
+        else:
+            # Chapter 1 mulai ditulis begitu selesai direncanakan
+            outline_stream = OutlineStream(self.planner, **planner_args)
+            outline = {**outline_stream.metadata(), 'chapters': []}
 
         # Buat direktori untuk buku
         book_title = outline.get('title', topic)
         book_dir = self.file_manager.create_book_directory(book_title)
 
-        # Simpan outline
-        outline_path = self.file_manager.save_outline(book_dir, outline)
-        console.print(f"[green]✓[/green] Outline disimpan: {outline_path}")
+        # Simpan outline (outline yang di-stream disimpan setelah planner selesai)
+        if outline_stream is None:
+            outline_path = self.file_manager.save_outline(book_dir, outline)
+            console.print(f"[green]✓[/green] Outline disimpan: {outline_path}")
+
+        # Journal untuk checkpoint/resume
+        settings = {
+            'topic': topic,
+            'book_type': book_type,
+            'num_chapters': num_chapters,
+            'target_audience': target_audience,
+            'additional_info': additional_info,
+            'min_words_per_chapter': min_words_per_chapter,
+            'enable_review': enable_review,
+            'auto_revise': auto_revise,
+            'enable_streaming': enable_streaming,
+            'language': language,
+            'parallel': parallel,
+            'pipeline': pipeline,
+            'pipeline_depth': pipeline_depth,
+            'schedule': schedule
+        }
+        journal = JobJournal.create(book_dir, outline, settings, self._current_models())
+
+        return self._write_book(book_dir, outline, journal, settings, outline_stream)
+
+    def create_book_from_outline(
+        self,
+        outline: Union[Dict, str, Path],
+        book_type: Optional[str] = None,
+        **kwargs
+    ) -> Dict:
+        """
+        Tulis buku dari outline yang sudah jadi tanpa menjalankan planner.
+
+        Args:
+            outline: Dictionary outline, atau path ke 00_outline.json /
+                directory buku dari `writebook outline`
+            book_type: fiction/non_fiction (default: ditebak dari outline)
+            **kwargs: Parameter create_book lainnya (min_words_per_chapter,
+                parallel, custom_models, dll)
+
+        Returns:
+            Dictionary berisi informasi buku dan path (sama seperti create_book)
+
+        Raises:
+            FileNotFoundError: Jika file outline tidak ditemukan
+            ValueError: Jika outline tidak valid
+        """
+        if not isinstance(outline, dict):
+            outline = self.file_manager.load_outline(outline)
+        book_type = book_type or _infer_book_type(outline)
+
+        try:
+            outline_model(book_type).model_validate(outline)
+        except ValidationError as e:
+            raise ValueError("Outline tidak valid: " + "; ".join(describe_errors(e)[:5]))
+
+        # Nomor chapter mengikuti urutan di outline (file bisa saja diedit manual)
+        outline = dict(outline)
+        outline['chapters'] = [
+            dict(chapter, number=number) for number, chapter in enumerate(outline['chapters'], 1)
+        ]
+        return self.create_book(
+            topic=kwargs.pop('topic', None) or outline['title'],
+            book_type=book_type,
+            num_chapters=len(outline['chapters']),
+            target_audience=kwargs.pop('target_audience', None) or outline.get('target_audience', 'general'),
+            outline=outline,
+            **kwargs
+        )
+
+    def resume_book(
+        self,
+        book_dir: str,
+        enable_streaming: Optional[bool] = None,
+        parallel: Optional[int] = None
+    ) -> Dict:
+        """
+        Lanjutkan buku yang prosesnya terhenti.
+
+        Outline, setting, dan model dibaca dari journal di book directory;
+        chapter yang sudah selesai dilewati.
+
+        Args:
+            book_dir: Directory buku yang berisi job.json
+            enable_streaming: Override setting streaming (optional)
+            parallel: Override jumlah chapter bersamaan (optional)
+
+        Returns:
+            Dictionary berisi informasi buku dan path (sama seperti create_book)
+        """
+        book_dir = Path(book_dir)
+        journal = JobJournal.load(book_dir)
+
+        settings = dict(journal.settings)
+        if enable_streaming is not None:
+            settings['enable_streaming'] = enable_streaming
+        if parallel is not None:
+            settings['parallel'] = parallel
+
+        self._apply_models(journal.models)
+        telemetry.reset()
+        retry_manager.reset_metrics()
+        model_failover.reset_metrics()
+        memory_scheduler.reset_metrics()
+
+        self._check_memory_budget()
+
+        if not journal.outline_complete:
+            self._complete_planning(book_dir, journal)
+
+        done = len(journal.completed_chapters())
+        total = len(journal.outline.get('chapters', []))
+        console.print(Panel(
+            f"[bold cyan]Melanjutkan penulisan buku[/bold cyan]\n"
+            f"Judul: {journal.outline.get('title', book_dir.name)}\n"
+            f"Selesai: {done}/{total} chapters",
+            title="Resume",
+            border_style="cyan"
+        ))
+
+        return self._write_book(book_dir, journal.outline, journal, settings)
+
+    def _complete_planning(self, book_dir: Path, journal: JobJournal):
+        """
+        Lengkapi outline yang planning-nya terhenti sebelum resume menulis.
+
+        Chapter yang belum direncanakan diminta ke planner dan dicatat ke
+        journal, lalu outline (markdown + JSON) disimpan seperti run biasa.
+        """
+        settings = journal.settings
+        planned = len(journal.outline.get('chapters', []))
+        console.print(
+            f"[yellow]⚠ Planner berhenti sebelum outline selesai ({planned}/"
+            f"{settings['num_chapters']} chapters); melengkapi outline...[/yellow]"
+        )
+        try:
+            outline = self.planner.complete_outline(
+                dict(journal.outline),
+                book_type=settings['book_type'],
+                topic=settings['topic'],
+                num_chapters=settings['num_chapters'],
+                target_audience=settings.get('target_audience', 'general'),
+                additional_info=settings.get('additional_info', ''),
+                on_chapter=journal.add_chapter
+            )
+        except OllamaCallError as e:
+            # Chapter yang sudah direncanakan tetap ditulis
+            console.print(f"[yellow]⚠ Gagal melengkapi outline: {e}[/yellow]")
+            outline = {}
+        journal.complete_outline(outline)
+        outline_path = self.file_manager.save_outline(book_dir, journal.outline)
+        console.print(
+            f"[green]✓[/green] Outline selesai ({len(journal.outline['chapters'])} chapters): "
+            f"{outline_path}"
+        )
+
+    def _apply_models(self, models: Dict[str, str]):
+        """Set model untuk setiap agent (key: planner/writer/reviewer)."""
+        if 'planner' in models:
+            self.planner.model = models['planner']
+        if 'writer' in models:
+            self.writer.model = models['writer']
+        if 'reviewer' in models:
+            self.reviewer.model = models['reviewer']
+        if 'summarizer' in models:
+            self.summarizer.model = models['summarizer']
+
+    def _check_memory_budget(self):
+        """Peringatkan jika model planner/writer/reviewer tidak muat dipakai bersamaan."""
+        for a, b in memory_scheduler.conflicts(list(self._current_models().values())):
+            console.print(
+                f"[yellow]⚠ {a} + {b} melebihi budget memori {memory_scheduler.budget_gb:g} GB; "
+                f"call keduanya akan diantrikan[/yellow]"
+            )
+
+    def _current_models(self) -> Dict[str, str]:
+        """Model yang sedang dipakai setiap agent."""
+        models = {
+            'planner': self.planner.model,
+            'writer': self.writer.model,
+            'reviewer': self.reviewer.model
+        }
+        if continuity_config.enabled:
+            models['summarizer'] = self.summarizer.model
+        return models
+
+    def _write_book(
+        self,
+        book_dir: Path,
+        outline: Dict,
+        journal: JobJournal,
+        settings: Dict,
+        outline_stream: Optional[OutlineStream] = None
+    ) -> Dict:
+        """
+        Tulis semua chapter yang belum selesai lalu susun buku lengkap.
+
+        Args:
+            book_dir: Directory buku
+            outline: Outline buku
+            journal: Journal untuk checkpoint per chapter
+            settings: Parameter run (lihat create_book)
+            outline_stream: Planner yang masih berjalan; chapter ditulis
+                begitu direncanakan dan ditambahkan ke outline
+
+        Returns:
+            Dictionary berisi informasi buku dan path
+        """
+        book_title = outline.get('title', settings['topic'])
+        enable_streaming = settings['enable_streaming']
+        parallel = max(1, settings['parallel'])
+        pipeline = settings['pipeline']
+        schedule = settings.get('schedule', 'chapter')
+
+        if parallel > 1 and enable_streaming:
+            # Output live dari beberapa chapter sekaligus akan saling tumpang tindih
+            console.print("[yellow]⚠ Streaming dinonaktifkan karena mode parallel aktif[/yellow]")
+            enable_streaming = False
+        if parallel > 1 and pipeline:
+            # Worker pool sudah meng-overlap writer dan reviewer antar chapter
+            pipeline = False
 
         # Step 2: Tulis semua chapter
         console.print("\n[bold]Step 2: Menulis Chapters[/bold]")
         chapters = outline.get('chapters', [])
 
-        chapter_results = []
+        chapter_results = journal.completed_chapters()
         failed_chapters = []
 
+        completed_numbers = {r['number'] for r in chapter_results}
+        if outline_stream is not None:
+            pending = self._planned_chapters(book_dir, journal, outline_stream)
+        else:
+            pending = [c for c in chapters if c.get('number', 0) not in completed_numbers]
+        if chapter_results:
+            console.print(
+                f"[dim]Melewati {len(chapter_results)} chapter yang sudah selesai[/dim]"
+            )
+
+        def total_chapters() -> int:
+            # Selama planner berjalan, pakai jumlah chapter yang diminta
+            if journal.outline_complete:
+                return len(chapters)
+            return max(len(chapters), settings['num_chapters'])
+
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -106,119 +414,121 @@ class BookOrchestrator:
         ) as progress:
             task = progress.add_task(
                 "[cyan]Menulis chapters...",
-                total=len(chapters)
+                total=total_chapters(),
+                completed=len(chapter_results)
             )
 
-            for chapter_info in chapters:
-                chapter_num = chapter_info.get('number', 0)
-                chapter_title = chapter_info.get('title', 'Untitled')
+            chapter_options = {
+                'total_chapters': total_chapters(),
+                'min_words': settings['min_words_per_chapter'],
+                'enable_review': settings['enable_review'],
+                'auto_revise': settings['auto_revise'],
+                'enable_streaming': enable_streaming,
+                'language': settings['language'],
+                'book_dir': book_dir,
+                'continuity': self._continuity_memory(journal, schedule)
+            }
 
-                try:
-                    # Tulis chapter
-                    if enable_streaming:
-                        console.print(f"\n{'═' * 80}")
-                        console.print(f"[bold cyan]📖 Chapter {chapter_num}/{len(chapters)}: {chapter_title}[/bold cyan]")
-                        console.print(f"{'═' * 80}")
-                    
-                    chapter_result = self.writer.execute(
-                        chapter_info=chapter_info,
-                        book_context=outline,
-                        min_words=min_words_per_chapter,
-                        enable_streaming=enable_streaming,
-                        language=language
-                    )
-                    
-                    if enable_streaming:
-                        console.print(f"\n{'═' * 80}\n")
-
-                    # Review jika diaktifkan
-                    if enable_review:
-                        review_result = self.reviewer.execute(
-                            content=chapter_result['content'],
-                            chapter_info=chapter_info,
-                            book_context=outline
-                        )
+            schedule_report = {}
+            if schedule == "by-model":
+                results = self._iter_by_model(
+                    pending, outline, chapter_options, parallel, schedule_report
+                )
+            elif parallel > 1:
+                results = self._iter_parallel(pending, outline, chapter_options, parallel)
+            elif pipeline and settings['enable_review']:
+                results = self._iter_pipelined(
+                    pending, outline, chapter_options, settings['pipeline_depth']
+                )
+            else:
+                results = self._iter_sequential(pending, outline, chapter_options)
 
-                        chapter_result['review'] = review_result
+            try:
+                for chapter_info, chapter_result, error in results:
+                    chapter_num = chapter_info.get('number', 0)
+                    chapter_title = chapter_info.get('title', 'Untitled')
 
-                        # Auto revise jika score rendah dan diaktifkan
-                        if auto_revise and review_result.get('needs_revision', False):
-                            console.print(
-                                f"[yellow]Chapter {chapter_num} perlu revisi, menulis ulang...[/yellow]"
+                    if error is None:
+                        try:
+                            entry = self._save_chapter_result(
+                                book_dir, chapter_info, chapter_result
                             )
-                            # Tulis ulang dengan feedback
-                            chapter_result = self._revise_chapter(
-                                chapter_info,
-                                outline,
-                                review_result,
-                                min_words_per_chapter,
-                                enable_streaming,
-                                language
+                            chapter_results.append(entry)
+                            journal.mark_completed(entry, chapter_result.get('review'))
+                            if chapter_options['continuity'] is not None:
+                                journal.save_continuity(chapter_options['continuity'].to_dict())
+                            self._print_chapter_progress(
+                                entry, len(chapter_results), total_chapters()
                             )
+                        except Exception as e:
+                            error = e
 
-                    # Simpan chapter
-                    chapter_path = self.file_manager.save_chapter(
-                        book_dir=book_dir,
-                        chapter_number=chapter_num,
-                        chapter_title=chapter_title,
-                        content=chapter_result['content'],
-                        metadata={
-                            'word_count': chapter_result.get('word_count', 0),
-                            'review_score': chapter_result.get('review', {}).get('overall_score', 'N/A')
-                        }
-                    )
+                    if error is not None:
+                        console.print(f"[red]✗[/red] Error pada Chapter {chapter_num}: {error}")
+                        failed_chapters.append({
+                            'number': chapter_num,
+                            'title': chapter_title,
+                            'error': str(error)
+                        })
+                        journal.mark_failed(failed_chapters[-1])
 
-                    chapter_results.append({
-                        'number': chapter_num,
-                        'title': chapter_title,
-                        'path': chapter_path,
-                        'word_count': chapter_result.get('word_count', 0),
-                        'score': chapter_result.get('review', {}).get('overall_score', None)
-                    })
-
-                    # Show completion with statistics
-                    wc = chapter_result.get('word_count', 0)
-                    score = chapter_result.get('review', {}).get('overall_score', 'N/A')
-                    
-                    console.print(f"[green]✓[/green] [bold green]Chapter {chapter_num} selesai![/bold green] "
-                                f"[cyan]{wc}[/cyan] kata • Score: [yellow]{score}[/yellow]/10")
-                    
-                    # Progress indicator
-                    progress_pct = (len(chapter_results) / len(chapters)) * 100
-                    progress_bar = "█" * int(progress_pct / 5) + "░" * (20 - int(progress_pct / 5))
-                    console.print(f"[dim]Progress: [{progress_bar}] {progress_pct:.1f}% ({len(chapter_results)}/{len(chapters)} chapters)[/dim]")
+                    progress.update(task, advance=1, total=total_chapters())
+            finally:
+                results.close()
 
-                except Exception as e:
-                    console.print(f"[red]✗[/red] Error pada Chapter {chapter_num}: {e}")
-                    failed_chapters.append({
-                        'number': chapter_num,
-                        'title': chapter_title,
-                        'error': str(e)
-                    })
-
-                progress.update(task, advance=1)
+        chapter_results.sort(key=lambda r: r['number'])
+        journal.finish(len(failed_chapters))
 
         # Step 3: Gabungkan menjadi buku lengkap
         console.print("\n[bold]Step 3: Menyusun Buku Lengkap[/bold]")
-        full_book_path = self.file_manager.save_full_book(book_dir, book_title)
+        # Hanya chapter yang selesai (bukan sisa file chapter yang gagal/dari run lama)
+        full_book_path = self.file_manager.save_full_book(
+            book_dir, book_title, [r['path'] for r in chapter_results]
+        )
         console.print(f"[green]✓[/green] Buku lengkap disimpan: {full_book_path}")
 
         # Simpan metadata
         total_words = sum(r['word_count'] for r in chapter_results)
-        avg_score = sum(r['score'] for r in chapter_results if r['score']) / len(chapter_results) if chapter_results else 0
+        # Chapter yang review-nya gagal (score None) tidak ikut dirata-rata
+        scores = [r['score'] for r in chapter_results if r['score'] is not None]
+        avg_score = sum(scores) / len(scores) if scores else 0
 
         metadata = {
             'title': book_title,
-            'type': book_type,
+            'type': settings['book_type'],
             'total_chapters': len(chapters),
             'completed_chapters': len(chapter_results),
             'failed_chapters': len(failed_chapters),
             'total_words': total_words,
             'average_review_score': round(avg_score, 2),
-            'target_audience': target_audience
+            'target_audience': settings['target_audience']
         }
+        if schedule_report:
+            metadata['model_loads'] = schedule_report['model_loads']
+            metadata['model_loads_avoided'] = schedule_report['model_loads_avoided']
 
-        metadata_path = self.file_manager.save_metadata(book_dir, metadata)
+        retries = retry_manager.summary()
+        if retries['retries'] or retries['failures']:
+            metadata['transport_retries'] = retries['retries']
+            metadata['breaker_trips'] = retries['breaker_trips']
+
+        failover = model_failover.summary()
+        if failover['fallback_calls']:
+            metadata['fallback_model_calls'] = failover['fallback_calls']
+
+        memory = memory_scheduler.summary()
+        if memory['waits']:
+            metadata['memory_wait_seconds'] = memory['wait_time']
+
+        inference = telemetry.export()
+        inference['retries'] = retries
+        inference['failover'] = failover
+        inference['memory'] = memory
+        self.file_manager.save_telemetry(book_dir, inference)
+        metadata_path = self.file_manager.save_metadata(
+            book_dir, metadata, telemetry_summary=inference['summary'],
+            chapter_models={r['number']: r.get('models', {}) for r in chapter_results}
+        )
 
         # Summary
         console.print(Panel(
@@ -232,10 +542,42 @@ class BookOrchestrator:
             border_style="green"
         ))
 
+        if schedule_report:
+            console.print(
+                f"[dim]Model loads: {schedule_report['model_loads']} "
+                f"(per-chapter: {schedule_report['interleaved_model_loads']}, "
+                f"dihindari: {schedule_report['model_loads_avoided']})[/dim]"
+            )
+
+        cache_stats = response_cache.stats() if response_cache.hits + response_cache.misses else None
+        if cache_stats:
+            console.print(
+                f"[dim]Cache: {cache_stats['hits']} hit / {cache_stats['misses']} miss "
+                f"({cache_stats['hit_rate']:.0%})[/dim]"
+            )
+
+        if retries['retries'] or retries['failures']:
+            kinds = ", ".join(f"{kind}: {count}" for kind, count in retries['retries_by_kind'].items())
+            console.print(
+                f"[dim]Retry: {retries['retries']} ({kinds or '-'}), "
+                f"menunggu {retries['retry_wait']}s, breaker trips: {retries['breaker_trips']}[/dim]"
+            )
+
+        if failover['fallback_calls']:
+            roles = ", ".join(f"{role}: {count}" for role, count in failover['fallback_by_role'].items())
+            console.print(f"[dim]Model cadangan: {failover['fallback_calls']} call ({roles})[/dim]")
+
+        if memory['waits']:
+            console.print(
+                f"[dim]Menunggu memori: {memory['waits']} call, total {memory['wait_time']}s "
+                f"(budget {memory['budget_gb']:g} GB)[/dim]"
+            )
+
         if failed_chapters:
             console.print("\n[yellow]Chapters yang gagal:[/yellow]")
             for fc in failed_chapters:
                 console.print(f"  - Chapter {fc['number']}: {fc['title']} ({fc['error']})")
+            console.print(f"[dim]Lanjutkan dengan: writebook resume {book_dir}[/dim]")
 
         return {
             'success': True,
@@ -247,6 +589,460 @@ class BookOrchestrator:
             'metadata': metadata
         }
 
+    def _planned_chapters(
+        self,
+        book_dir: Path,
+        journal: JobJournal,
+        outline_stream: OutlineStream
+    ) -> Iterator[Dict]:
+        """
+        Yield chapter dari planner yang masih berjalan.
+
+        Setiap chapter dicatat ke journal (dan outline) sebelum ditulis;
+        setelah planner selesai, field outline yang datang terakhir
+        disimpan dan outline.json ditulis.
+        """
+        for chapter_info in outline_stream.chapters():
+            journal.add_chapter(chapter_info)
+            yield chapter_info
+
+        try:
+            final = outline_stream.result()
+        except Exception as e:
+            # Chapter yang sudah direncanakan tetap ditulis
+            console.print(f"[yellow]⚠ Planner gagal menyelesaikan outline: {e}[/yellow]")
+            final = {}
+        journal.complete_outline(final)
+        outline_path = self.file_manager.save_outline(book_dir, journal.outline)
+        console.print(
+            f"[green]✓[/green] Outline selesai ({len(journal.outline['chapters'])} chapters): "
+            f"{outline_path}"
+        )
+
+    def _continuity_memory(self, journal: JobJournal, schedule: str) -> Optional[ContinuityMemory]:
+        """Memori kontinuitas untuk writer (None jika dinonaktifkan)."""
+        if not continuity_config.enabled:
+            return None
+        if schedule == "by-model":
+            # Ringkasan per chapter memaksa swap ke fast_model di tengah fase tulis
+            console.print("[dim]Memori kontinuitas tidak dipakai dengan --schedule by-model[/dim]")
+            return None
+        return ContinuityMemory(self.summarizer.compress, state=journal.continuity)
+
+    def _remember_chapter(self, chapter_info: Dict, chapter_result: Dict, options: Dict):
+        """
+        Ringkas chapter ke memori kontinuitas.
+
+        Gagal meringkas tidak menggagalkan chapter; deskripsi outline
+        dipakai sebagai gantinya.
+        """
+        continuity = options.get('continuity')
+        if continuity is None:
+            return
+
+        chapter_num = chapter_info.get('number', 0)
+        with telemetry.chapter_scope(chapter_num):
+            try:
+                summary = self.summarizer.execute(
+                    chapter_info=chapter_info,
+                    content=chapter_result['content'],
+                    language=options['language']
+                )
+            except OllamaCallError as e:
+                console.print(
+                    f"[yellow]⚠ Ringkasan chapter {chapter_num} gagal ({e}); "
+                    f"memakai deskripsi outline[/yellow]"
+                )
+                summary = chapter_info.get('description', '')
+            continuity.record(chapter_num, chapter_info.get('title', 'Untitled'), summary)
+
+    def _iter_sequential(self, chapters: Iterable[Dict], outline: Dict, options: Dict):
+        """Tulis dan review chapter satu per satu (mode default)."""
+        for chapter_info in chapters:
+            try:
+                chapter_result = self._write_chapter(chapter_info, outline, options)
+                chapter_result = self._review_chapter(chapter_info, outline, chapter_result, options)
+                yield chapter_info, chapter_result, None
+            except Exception as e:
+                yield chapter_info, None, e
+
+    def _iter_parallel(
+        self,
+        chapters: Iterable[Dict],
+        outline: Dict,
+        options: Dict,
+        parallel: int
+    ):
+        """
+        Tulis dan review chapter di worker pool.
+
+        Hasil di-yield sesuai urutan outline, sehingga penyimpanan dan
+        progress bar tetap deterministik walaupun chapter selesai acak.
+        Chapter di-submit begitu tersedia (outline boleh masih di-stream).
+        """
+        def generate(chapter_info):
+            chapter_result = self._write_chapter(chapter_info, outline, options)
+            return self._review_chapter(chapter_info, outline, chapter_result, options)
+
+        def collect(chapter_info, future):
+            try:
+                return chapter_info, future.result(), None
+            except Exception as e:
+                return chapter_info, None, e
+
+        executor = ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="chapter")
+        in_flight = deque()
+        try:
+            for chapter_info in chapters:
+                in_flight.append((chapter_info, executor.submit(generate, chapter_info)))
+                while in_flight and in_flight[0][1].done():
+                    yield collect(*in_flight.popleft())
+            while in_flight:
+                yield collect(*in_flight.popleft())
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _iter_pipelined(
+        self,
+        chapters: Iterable[Dict],
+        outline: Dict,
+        options: Dict,
+        depth: int
+    ):
+        """
+        Pipeline dua stage: writer di background thread, reviewer di thread ini.
+
+        Chapter N direview sementara chapter N+1 ditulis. Queue dibatasi
+        `depth` agar writer tidak berlari terlalu jauh di depan reviewer.
+        """
+        written = queue.Queue(maxsize=max(1, depth))
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    written.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        def write_stage():
+            try:
+                for chapter_info in chapters:
+                    if stop.is_set():
+                        return
+                    try:
+                        put((chapter_info, self._write_chapter(chapter_info, outline, options), None))
+                    except Exception as e:
+                        put((chapter_info, None, e))
+            except Exception as e:
+                # Sumber chapter gagal (misal I/O journal/outline saat outline di-stream)
+                put((None, None, e))
+            finally:
+                # Selalu kirim sentinel agar consumer tidak menunggu selamanya
+                put(_PIPELINE_DONE)
+
+        writer_thread = threading.Thread(target=write_stage, name="write-stage", daemon=True)
+        writer_thread.start()
+        try:
+            while True:
+                item = written.get()
+                if item is _PIPELINE_DONE:
+                    break
+                chapter_info, chapter_result, error = item
+                if chapter_info is None:
+                    # Sama seperti mode berurutan: error dari sumber chapter diteruskan
+                    raise error
+                if error is None:
+                    try:
+                        chapter_result = self._review_chapter(
+                            chapter_info, outline, chapter_result, options
+                        )
+                    except Exception as e:
+                        chapter_result, error = None, e
+                yield chapter_info, chapter_result, error
+            writer_thread.join()
+        finally:
+            # Hentikan writer jika consumer berhenti lebih awal (error/Ctrl-C)
+            stop.set()
+
+    def _iter_by_model(
+        self,
+        chapters: List[Dict],
+        outline: Dict,
+        options: Dict,
+        parallel: int,
+        report: Dict
+    ):
+        """
+        Jadwalkan call per model: tulis semua, review semua, lalu revisi.
+
+        Urutan default (tulis → review → revisi per chapter) memaksa Ollama
+        bergantian load writer dan reviewer untuk setiap chapter. Di sini
+        setiap fase hanya memakai satu model yang di-pin dengan keep_alive,
+        dan model di-unload saat fase berganti agar model berikutnya muat.
+        Jumlah model load yang dihindari dicatat di `report`.
+        """
+        executed = []
+        interleaved = {chapter.get('number', 0): [self.writer.model] for chapter in chapters}
+
+        # Fase 1: tulis semua chapter
+        written = self._run_model_phase(
+            "Menulis", self.writer, chapters,
+            lambda chapter_info: self._write_chapter(chapter_info, outline, options),
+            parallel
+        )
+        executed += [self.writer.model] * len(chapters)
+
+        to_review = []
+        for chapter_info, chapter_result, error in written:
+            if error is not None or not options['enable_review']:
+                yield chapter_info, chapter_result, error
+            else:
+                to_review.append((chapter_info, chapter_result))
+
+        # Fase 2: review semua chapter (writer tetap di memori jika tidak ada yang direview)
+        if to_review:
+            self._switch_model(self.writer, self.reviewer)
+        reviewed = self._run_model_phase(
+            "Mereview", self.reviewer, to_review,
+            lambda item: self._run_review(item[0], outline, item[1]),
+            parallel
+        )
+        executed += [self.reviewer.model] * len(to_review)
+
+        to_revise = []
+        for (chapter_info, _), chapter_result, error in reviewed:
+            interleaved[chapter_info.get('number', 0)].append(self.reviewer.model)
+            if error is None and self._needs_revision(chapter_result, options):
+                to_revise.append((chapter_info, chapter_result))
+            else:
+                yield chapter_info, chapter_result, error
+
+        # Fase 3: revisi chapter dengan score rendah
+        if to_revise:
+            self._switch_model(self.reviewer, self.writer)
+            revised = self._run_model_phase(
+                "Merevisi", self.writer, to_revise,
+                lambda item: self._run_revision(item[0], outline, item[1], options),
+                parallel
+            )
+            executed += [self.writer.model] * len(to_revise)
+            for (chapter_info, _), chapter_result, error in revised:
+                interleaved[chapter_info.get('number', 0)].append(self.writer.model)
+                yield chapter_info, chapter_result, error
+
+        interleaved_sequence = [m for chapter in chapters for m in interleaved[chapter.get('number', 0)]]
+        report['model_loads'] = _count_model_loads(executed)
+        report['interleaved_model_loads'] = _count_model_loads(interleaved_sequence)
+        report['model_loads_avoided'] = report['interleaved_model_loads'] - report['model_loads']
+
+    def _run_model_phase(self, label: str, agent, items: List, fn, parallel: int) -> List:
+        """
+        Jalankan fn untuk setiap item dengan model agent di-pin di memori.
+
+        Returns:
+            List (item, result, error) sesuai urutan items
+        """
+        if not items:
+            return []
+
+        console.print(f"\n[bold]Fase {label}[/bold] [dim]({agent.model}, {len(items)} call)[/dim]")
+        agent.keep_alive = ollama_config.pin_keep_alive
+        try:
+            if parallel > 1:
+                with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="phase") as executor:
+                    futures = [executor.submit(fn, item) for item in items]
+                    outcomes = []
+                    for item, future in zip(items, futures):
+                        try:
+                            outcomes.append((item, future.result(), None))
+                        except Exception as e:
+                            outcomes.append((item, None, e))
+                    return outcomes
+
+            outcomes = []
+            for item in items:
+                try:
+                    outcomes.append((item, fn(item), None))
+                except Exception as e:
+                    outcomes.append((item, None, e))
+            return outcomes
+        finally:
+            agent.keep_alive = None
+
+    def _switch_model(self, previous_agent, next_agent):
+        """Unload model fase sebelumnya jika fase berikutnya memakai model lain."""
+        if previous_agent.model != next_agent.model:
+            previous_agent.client.unload_model(previous_agent.model)
+
+    def _write_chapter(self, chapter_info: Dict, outline: Dict, options: Dict) -> Dict:
+        """
+        Stage tulis: jalankan WriterAgent untuk satu chapter.
+
+        Aman dipanggil dari worker thread: tidak menyentuh file atau
+        progress bar, sehingga penyimpanan tetap dilakukan berurutan.
+        """
+        chapter_num = chapter_info.get('number', 0)
+        chapter_title = chapter_info.get('title', 'Untitled')
+        enable_streaming = options['enable_streaming']
+
+        if enable_streaming:
+            console.print(f"\n{'═' * 80}")
+            console.print(f"[bold cyan]📖 Chapter {chapter_num}/{options['total_chapters']}: {chapter_title}[/bold cyan]")
+            console.print(f"{'═' * 80}")
+
+        book_dir = options.get('book_dir')
+
+        def attempt():
+            sinks = []
+            partial_content = ""
+            if book_dir is not None:
+                # Lanjutkan teks dari stream yang terhenti (run sebelumnya atau attempt yang timeout)
+                partial_content = self.file_manager.load_partial_chapter(
+                    book_dir, chapter_num, chapter_title
+                )
+                if partial_content:
+                    console.print(
+                        f"[dim]Chapter {chapter_num}: melanjutkan {len(partial_content.split())} "
+                        f"kata yang tersimpan[/dim]"
+                    )
+                if enable_streaming:
+                    sinks.append(FileSink(
+                        self.file_manager.chapter_path(book_dir, chapter_num, chapter_title),
+                        header=self.file_manager.chapter_header(chapter_num, chapter_title)
+                    ))
+
+            return self.writer.execute(
+                chapter_info=chapter_info,
+                book_context=outline,
+                min_words=options['min_words'],
+                enable_streaming=enable_streaming,
+                language=options['language'],
+                sinks=sinks,
+                partial_content=partial_content,
+                story_so_far=story_so_far
+            )
+
+        continuity = options.get('continuity')
+        story_so_far = continuity.render(before=chapter_num) if continuity else ""
+
+        with telemetry.chapter_scope(chapter_num):
+            chapter_result = self._retry_stage(f"Menulis chapter {chapter_num}", attempt)
+
+        if enable_streaming:
+            console.print(f"\n{'═' * 80}\n")
+
+        # Diringkas di stage tulis agar chapter berikutnya (pipeline) sudah melihatnya
+        self._remember_chapter(chapter_info, chapter_result, options)
+        return chapter_result
+
+    def _review_chapter(
+        self,
+        chapter_info: Dict,
+        outline: Dict,
+        chapter_result: Dict,
+        options: Dict
+    ) -> Dict:
+        """Stage review: review chapter dan revisi jika perlu (jika diaktifkan)."""
+        if not options['enable_review']:
+            return chapter_result
+
+        chapter_result = self._run_review(chapter_info, outline, chapter_result)
+
+        if self._needs_revision(chapter_result, options):
+            chapter_result = self._run_revision(chapter_info, outline, chapter_result, options)
+
+        return chapter_result
+
+    def _run_review(self, chapter_info: Dict, outline: Dict, chapter_result: Dict) -> Dict:
+        """Jalankan ReviewerAgent dan simpan hasilnya di key 'review'."""
+        chapter_num = chapter_info.get('number', 0)
+        with telemetry.chapter_scope(chapter_num):
+            chapter_result['review'] = self._retry_stage(
+                f"Mereview chapter {chapter_num}",
+                lambda: self.reviewer.execute(
+                    content=chapter_result['content'],
+                    chapter_info=chapter_info,
+                    book_context=outline
+                )
+            )
+        return chapter_result
+
+    def _needs_revision(self, chapter_result: Dict, options: Dict) -> bool:
+        """Cek apakah chapter perlu ditulis ulang (auto_revise + score rendah)."""
+        return options['auto_revise'] and chapter_result.get('review', {}).get('needs_revision', False)
+
+    def _run_revision(
+        self,
+        chapter_info: Dict,
+        outline: Dict,
+        chapter_result: Dict,
+        options: Dict
+    ) -> Dict:
+        """Tulis ulang chapter yang score review-nya rendah."""
+        console.print(
+            f"[yellow]Chapter {chapter_info.get('number', 0)} perlu revisi, menulis ulang...[/yellow]"
+        )
+        continuity = options.get('continuity')
+        chapter_num = chapter_info.get('number', 0)
+        # Tulis ulang dengan feedback
+        revised = self._revise_chapter(
+            chapter_info,
+            outline,
+            chapter_result['review'],
+            options['min_words'],
+            options['enable_streaming'],
+            options['language'],
+            continuity.render(before=chapter_num) if continuity else ""
+        )
+        self._remember_chapter(chapter_info, revised, options)
+        return revised
+
+    def _save_chapter_result(
+        self,
+        book_dir: Path,
+        chapter_info: Dict,
+        chapter_result: Dict
+    ) -> Dict:
+        """Simpan chapter ke disk dan kembalikan entry untuk chapter_results."""
+        chapter_num = chapter_info.get('number', 0)
+        chapter_title = chapter_info.get('title', 'Untitled')
+        # Model yang benar-benar dipakai (bisa model cadangan hasil failover)
+        models = telemetry.chapter_models(chapter_num)
+
+        chapter_path = self.file_manager.save_chapter(
+            book_dir=book_dir,
+            chapter_number=chapter_num,
+            chapter_title=chapter_title,
+            content=chapter_result['content'],
+            metadata={
+                'word_count': chapter_result.get('word_count', 0),
+                'review_score': chapter_result.get('review', {}).get('overall_score', 'N/A')
+            }
+        )
+
+        return {
+            'number': chapter_num,
+            'title': chapter_title,
+            'path': chapter_path,
+            'word_count': chapter_result.get('word_count', 0),
+            'score': chapter_result.get('review', {}).get('overall_score', None),
+            'models': models
+        }
+
+    def _print_chapter_progress(self, entry: Dict, done: int, total: int):
+        """Tampilkan statistik chapter yang selesai dan progress keseluruhan."""
+        score = entry['score'] if entry['score'] is not None else 'N/A'
+
+        console.print(f"[green]✓[/green] [bold green]Chapter {entry['number']} selesai![/bold green] "
+                    f"[cyan]{entry['word_count']}[/cyan] kata • Score: [yellow]{score}[/yellow]/10")
+
+        # Progress indicator
+        progress_pct = (done / total) * 100
+        progress_bar = "█" * int(progress_pct / 5) + "░" * (20 - int(progress_pct / 5))
+        console.print(f"[dim]Progress: [{progress_bar}] {progress_pct:.1f}% ({done}/{total} chapters)[/dim]")
+
     def _revise_chapter(
         self,
         chapter_info: Dict,
@@ -254,21 +1050,60 @@ class BookOrchestrator:
         review_result: Dict,
         min_words: int,
         enable_streaming: bool = False,
-        language: str = "indonesian"
+        language: str = "indonesian",
+        story_so_far: str = ""
     ) -> Dict:
         """Revisi chapter berdasarkan feedback review."""
         # Untuk saat ini, tulis ulang dengan temperature yang berbeda
         # Di versi yang lebih advanced, bisa include feedback dalam prompt
-        revised_writer = WriterAgent()
+        revised_writer = WriterAgent(model=self.writer.model)
         revised_writer.temperature = 0.9  # Lebih kreatif untuk revisi
+        revised_writer.keep_alive = self.writer.keep_alive
 
-        return revised_writer.execute(
-            chapter_info=chapter_info,
-            book_context=book_context,
-            min_words=min_words,
-            enable_streaming=enable_streaming,
-            language=language
-        )
+        chapter_num = chapter_info.get('number', 0)
+        with telemetry.chapter_scope(chapter_num):
+            return self._retry_stage(
+                f"Merevisi chapter {chapter_num}",
+                lambda: revised_writer.execute(
+                    chapter_info=chapter_info,
+                    book_context=book_context,
+                    min_words=min_words,
+                    enable_streaming=enable_streaming,
+                    language=language,
+                    story_so_far=story_so_far
+                )
+            )
+
+    def _retry_stage(self, label: str, fn):
+        """
+        Jalankan stage dan ulangi jika call ke Ollama gagal secara transient.
+
+        Error transient sudah diulang di level transport (RetryManager); di
+        sini stage diulang utuh untuk timeout, breaker terbuka, dan error
+        yang tetap gagal setelah semua retry transport, misalnya chapter
+        yang stream-nya macet dilanjutkan dari file .partial.
+
+        Args:
+            label: Deskripsi stage untuk pesan di console
+            fn: Callable tanpa argumen yang menjalankan stage
+
+        Returns:
+            Hasil fn
+        """
+        retries = max(0, retry_config.stage_retries)
+        for attempt in range(retries + 1):
+            try:
+                return fn()
+            except OllamaCallError as e:
+                transient = e.retryable or isinstance(e, (OllamaTimeoutError, CircuitOpenError))
+                if not transient or attempt == retries:
+                    raise
+                console.print(
+                    f"[yellow]⚠ {label}: {e}; mencoba lagi ({attempt + 1}/{retries})[/yellow]"
+                )
+                if isinstance(e, CircuitOpenError):
+                    # Tunggu sampai breaker mengizinkan call percobaan
+                    time.sleep(e.retry_after)
 
     def create_outline_only(
         self,
@@ -311,6 +1146,7 @@ class BookOrchestrator:
             'success': True,
             'outline': outline,
             'outline_path': str(outline_path),
+            'outline_json_path': str(book_dir / OUTLINE_JSON_FILENAME),
             'book_dir': str(book_dir)
         }
 
@@ -365,5 +1201,12 @@ class BookOrchestrator:
         return result
 
 
-# Singleton instance
-orchestrator = BookOrchestrator()
+# Singleton instance (lazy)
+get_orchestrator = lazy_singleton(BookOrchestrator)
+
+
+def __getattr__(name: str):
+    """Akses `orchestrator` tetap didukung, instance dibuat saat pertama dipakai."""
+    if name == "orchestrator":
+        return get_orchestrator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
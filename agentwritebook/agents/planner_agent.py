@@ -1,14 +1,157 @@
 """Planner agent untuk membuat outline buku."""
 
-import json
-from typing import Dict, List
+import math
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from pydantic import ValidationError, create_model
 from .base_agent import BaseAgent
-from ..config.settings import model_config
+from ..config.settings import AgentRole, model_config, outline_config, structured_config
+from ..utils.errors import OllamaCallError
+from ..utils.json_stream import IncrementalObjectParser
+from ..utils.structured_output import (
+    StructuredOutputError,
+    chapter_model,
+    chapters_schema,
+    outline_schema,
+    skeleton_model,
+    skeleton_schema,
+)
+
+# Callback planner: metadata buku dan setiap chapter yang sudah lengkap
+MetadataCallback = Callable[[Dict], None]
+ChapterCallback = Callable[[Dict], None]
+
+# Sentinel akhir chapter di OutlineStream
+_OUTLINE_DONE = object()
+
+
+def _part_ranges(num_chapters: int, chapters_per_part: int) -> List[Tuple[int, int]]:
+    """Bagi chapter 1..num_chapters ke part yang ukurannya hampir sama ([(first, last), ...])."""
+    num_parts = max(1, math.ceil(num_chapters / max(1, chapters_per_part)))
+    base, extra = divmod(num_chapters, num_parts)
+    ranges, first = [], 1
+    for index in range(num_parts):
+        size = base + (1 if index < extra else 0)
+        ranges.append((first, first + size - 1))
+        first += size
+    return ranges
+
+
+class _OutlineSink:
+    """
+    Sink chat_stream yang mem-parse outline selagi token datang.
+
+    Metadata dikirim saat array "chapters" mulai (field sebelum chapters
+    sudah lengkap), dilengkapi default untuk field yang belum ada. Setiap
+    chapter dikirim begitu objeknya lengkap dan valid terhadap schema.
+    """
+
+    def __init__(
+        self,
+        book_type: str,
+        defaults: Dict,
+        on_metadata: Optional[MetadataCallback],
+        on_chapter: Optional[ChapterCallback]
+    ):
+        self.chapter_model = chapter_model(book_type)
+        self.defaults = defaults
+        self.on_metadata = on_metadata
+        self.on_chapter = on_chapter
+        self.parser = IncrementalObjectParser("chapters")
+        self.metadata: Optional[Dict] = None
+        self.chapters: List[Dict] = []
+        self.invalid = 0
+        # Batas jumlah chapter (dipakai saat melengkapi chapter yang hilang)
+        self.limit: Optional[int] = None
+        # Elemen chapters yang sudah dilihat di call saat ini (untuk replay)
+        self._seen = 0
+
+    def write(self, text: str):
+        for kind, value in self.parser.feed(text):
+            if kind == "items_start":
+                self.emit_metadata(self.parser.fields)
+            elif kind == "item":
+                self._seen += 1
+                self.emit_chapter(value)
+
+    def restart(self):
+        """Mulai call baru (misal melengkapi chapter) dengan parser baru."""
+        self.invalid += self.parser.errors
+        self.parser = IncrementalObjectParser("chapters")
+        self._seen = 0
+
+    def emit_metadata(self, fields: Dict):
+        """Kirim metadata sekali (field yang belum ada diisi default)."""
+        if self.metadata is not None:
+            return
+        self.metadata = {
+            key: fields.get(key, value)
+            for key, value in self.defaults.items() if key != 'chapters'
+        }
+        self.metadata.update({k: v for k, v in fields.items() if k != 'chapters'})
+        if self.on_metadata:
+            self.on_metadata(dict(self.metadata))
+
+    def emit_chapter(self, chapter: Dict):
+        """
+        Validasi lalu kirim chapter.
+
+        Nomor dari model diabaikan: chapter selalu diberi nomor urut sesuai
+        urutan diterima, agar nomor yang hilang, dobel, atau di luar range
+        tidak bertabrakan di journal dan nama file chapter. Field opsional
+        yang tidak dibuat model diisi default agar writer tetap punya konteks.
+        """
+        if self.limit is not None and len(self.chapters) >= self.limit:
+            return
+        chapter['number'] = len(self.chapters) + 1
+        defaults = self.defaults['chapters']
+        if 1 <= chapter['number'] <= len(defaults):
+            for key, value in defaults[chapter['number'] - 1].items():
+                chapter.setdefault(key, value)
+        try:
+            self.chapter_model.model_validate(chapter)
+        except ValidationError:
+            self.invalid += 1
+            return
+        self.chapters.append(chapter)
+        if self.on_chapter:
+            self.on_chapter(chapter)
+
+    def replay(self, text: str):
+        """Parse ulang teks lengkap (fallback non-streaming), kirim hanya chapter baru."""
+        skip = self._seen
+        # Teks yang di-replay menggantikan stream yang gagal: error parser-nya tidak dihitung
+        self.parser = IncrementalObjectParser("chapters")
+        self._seen = 0
+        for kind, value in self.parser.feed(text):
+            if kind == "items_start":
+                self.emit_metadata(self.parser.fields)
+            elif kind == "item":
+                self._seen += 1
+                if self._seen > skip:
+                    self.emit_chapter(value)
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
 
 
 class PlannerAgent(BaseAgent):
     """Agent untuk membuat outline dan struktur buku."""
 
+    # Tidak di-cache: outline memakai temperature tinggi (lihat CacheConfig.max_temperature)
+    agent_role = AgentRole.PLANNER
+
+    # Perkiraan token output outline: metadata buku + per chapter
+    OUTLINE_BASE_TOKENS = 800
+    OUTLINE_TOKENS_PER_CHAPTER = 160
+    # Judul + ringkasan satu part (outline hierarkis)
+    PART_TOKENS = 200
+
     def __init__(self):
         """Initialize planner agent dengan model yang sesuai."""
         super().__init__(
@@ -23,17 +166,28 @@ class PlannerAgent(BaseAgent):
         book_type: str,
         num_chapters: int = 10,
         target_audience: str = "general",
-        additional_info: str = ""
+        additional_info: str = "",
+        on_metadata: Optional[MetadataCallback] = None,
+        on_chapter: Optional[ChapterCallback] = None
     ) -> Dict:
         """
         Buat outline buku.
 
+        Response di-stream dan di-parse bertahap: `on_metadata` dipanggil
+        sekali saat metadata buku lengkap, `on_chapter` untuk setiap chapter
+        begitu selesai di-generate (termasuk chapter pengganti di akhir
+        jika model berhenti sebelum semua chapter dibuat). Buku dengan
+        chapter lebih dari `outline_config.hierarchical_threshold`
+        direncanakan per part (lihat _create_hierarchical_outline).
+
         Args:
             topic: Topik atau judul buku
             book_type: Tipe buku (fiction/non_fiction)
             num_chapters: Jumlah chapter yang diinginkan
             target_audience: Target pembaca
             additional_info: Informasi tambahan
+            on_metadata: Callback metadata buku (tanpa chapters)
+            on_chapter: Callback setiap chapter
 
         Returns:
             Dictionary berisi outline lengkap
@@ -43,34 +197,250 @@ class PlannerAgent(BaseAgent):
             style="info"
         )
 
+        # Buku panjang: satu call outline akan melewati batas output model
+        if num_chapters > outline_config.hierarchical_threshold:
+            outline = self._create_hierarchical_outline(
+                topic, book_type, num_chapters, target_audience, additional_info,
+                on_metadata, on_chapter
+            )
         # Buat prompt sesuai tipe buku
-        if book_type == "fiction":
+        elif book_type == "fiction":
             outline = self._create_fiction_outline(
-                topic, num_chapters, target_audience, additional_info
+                topic, num_chapters, target_audience, additional_info,
+                on_metadata, on_chapter
             )
         else:
             outline = self._create_nonfiction_outline(
-                topic, num_chapters, target_audience, additional_info
+                topic, num_chapters, target_audience, additional_info,
+                on_metadata, on_chapter
             )
 
         self.display_status("Outline berhasil dibuat!", style="success")
         return outline
 
-    def _create_fiction_outline(
+    def _outline_system_prompt(self, book_type: str) -> str:
+        """System prompt planner sesuai tipe buku."""
+        if book_type == "fiction":
+            return self.create_system_prompt(
+                "Kamu adalah seorang penulis fiksi berpengalaman. "
+                "Tugasmu adalah membuat outline cerita yang menarik dengan "
+                "plot yang solid, karakter yang kuat, dan pacing yang baik."
+            )
+        return self.create_system_prompt(
+            "Kamu adalah seorang penulis non-fiksi berpengalaman. "
+            "Tugasmu adalah membuat outline buku yang terstruktur dengan baik, "
+            "informatif, dan mudah dipahami."
+        )
+
+    def _create_hierarchical_outline(
         self,
         topic: str,
+        book_type: str,
         num_chapters: int,
         target_audience: str,
-        additional_info: str
+        additional_info: str,
+        on_metadata: Optional[MetadataCallback] = None,
+        on_chapter: Optional[ChapterCallback] = None
     ) -> Dict:
-        """Buat outline untuk buku fiksi."""
-        system_prompt = self.create_system_prompt(
-            "Kamu adalah seorang penulis fiksi berpengalaman. "
-            "Tugasmu adalah membuat outline cerita yang menarik dengan "
-            "plot yang solid, karakter yang kuat, dan pacing yang baik."
+        """
+        Outline buku panjang: kerangka part dulu, lalu chapter setiap part.
+
+        Call pertama hanya membuat metadata buku dan judul/ringkasan setiap
+        part; chapter setiap part lalu dibuat dengan call terpisah yang
+        berjalan paralel (`outline_config.parallel_parts`). Setiap call
+        tetap kecil sehingga tidak melewati batas output model, dan chapter
+        dikirim ke `on_chapter` berurutan begitu part-nya selesai.
+
+        Returns:
+            Outline dengan format yang sama seperti outline biasa, ditambah
+            "parts" ({number, title, summary, chapters: [first, last]})
+        """
+        fiction = book_type == "fiction"
+        defaults = (
+            self._create_default_fiction_outline if fiction
+            else self._create_default_nonfiction_outline
+        )(topic, num_chapters, target_audience)
+        ranges = _part_ranges(num_chapters, outline_config.chapters_per_part)
+
+        skeleton = self._plan_parts(
+            topic, book_type, num_chapters, target_audience, additional_info, ranges, defaults
+        )
+        metadata = {k: v for k, v in skeleton.items() if k != 'parts'}
+        if on_metadata:
+            on_metadata(dict(metadata))
+
+        parts = [
+            {"number": index + 1, **part, "chapters": [first, last]}
+            for index, (part, (first, last)) in enumerate(zip(skeleton['parts'], ranges))
+        ]
+        self.display_status(
+            f"Kerangka {len(parts)} part selesai, membuat chapter per part...",
+            style="info"
         )
 
+        chapters = []
+        workers = max(1, min(outline_config.parallel_parts, len(parts)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="outline-part") as executor:
+            futures = [
+                executor.submit(self._expand_part, book_type, num_chapters, metadata, parts, part)
+                for part in parts
+            ]
+            # Part diproses berurutan agar chapter dikirim sesuai nomor
+            for part, future in zip(parts, futures):
+                first, last = part['chapters']
+                try:
+                    expanded = future.result()
+                except (OllamaCallError, StructuredOutputError) as e:
+                    self.display_status(
+                        f"Warning: Part {part['number']} gagal dibuat ({e}), "
+                        f"chapter {first}-{last} diisi default",
+                        style="warning"
+                    )
+                    expanded = []
+                expanded = expanded[:last - first + 1]
+                expanded += defaults['chapters'][first - 1 + len(expanded):last]
+                for offset, chapter in enumerate(expanded):
+                    chapter = dict(chapter, number=first + offset, part=part['number'])
+                    chapters.append(chapter)
+                    if on_chapter:
+                        on_chapter(chapter)
+
+        return {**metadata, "parts": parts, "chapters": chapters}
+
+    def _plan_parts(
+        self,
+        topic: str,
+        book_type: str,
+        num_chapters: int,
+        target_audience: str,
+        additional_info: str,
+        ranges: List[Tuple[int, int]],
+        defaults: Dict
+    ) -> Dict:
+        """Buat metadata buku dan judul/ringkasan setiap part."""
+        part_lines = "\n".join(
+            f"Part {index + 1}: chapter {first}-{last}" for index, (first, last) in enumerate(ranges)
+        )
+        if book_type == "fiction":
+            kind, flow = "novel fiksi", "alur cerita lengkap (beginning, conflict, climax, resolution)"
+            fields = "title, genre, target_audience, synopsis, main_characters, setting, themes"
+        else:
+            kind, flow = "buku non-fiksi", "struktur yang logis dari basic ke advanced"
+            fields = "title, genre, category, target_audience, synopsis, key_takeaways"
+
+        user_prompt = f"""
+Rencanakan kerangka sebuah {kind} panjang dengan detail berikut:
+
+Topik/Tema: {topic}
+Jumlah Chapter: {num_chapters}
+Target Pembaca: {target_audience}
+Informasi Tambahan: {additional_info}
+
+Buku dibagi menjadi {len(ranges)} part:
+{part_lines}
+
+Output dalam format JSON berisi metadata buku ({fields}) dan "parts": judul (title)
+dan ringkasan (summary) setiap part secara berurutan. Bersama-sama, parts harus
+membentuk {flow}. Jangan buat daftar chapter.
+"""
+        messages = [
+            {"role": "system", "content": self._outline_system_prompt(book_type)},
+            {"role": "user", "content": user_prompt}
+        ]
+        options = self.budget_options(
+            messages, self.OUTLINE_BASE_TOKENS + len(ranges) * self.PART_TOKENS
+        )
+        try:
+            skeleton = self.chat_structured(
+                messages, skeleton_model(book_type),
+                schema=skeleton_schema(book_type, len(ranges)), options=options
+            ).model_dump()
+        except StructuredOutputError as e:
+            self.display_status(
+                f"Warning: Kerangka part tidak valid ({e}), memakai kerangka default",
+                style="warning"
+            )
+            skeleton = {k: v for k, v in defaults.items() if k != 'chapters'}
+            skeleton['parts'] = []
+
+        # Tanpa `format`, jumlah part bisa meleset dari yang diminta
+        parts = skeleton['parts'][:len(ranges)]
+        parts += [
+            {"title": f"Part {index + 1}", "summary": ""} for index in range(len(parts), len(ranges))
+        ]
+        skeleton['parts'] = parts
+        return skeleton
+
+    def _expand_part(
+        self,
+        book_type: str,
+        num_chapters: int,
+        metadata: Dict,
+        parts: List[Dict],
+        part: Dict
+    ) -> List[Dict]:
+        """
+        Buat chapter untuk satu part.
+
+        Returns:
+            Chapter part ini (nomor dari model diabaikan, diberi nomor ulang saat merge)
+        """
+        first, last = part['chapters']
+        count = last - first + 1
+        part_lines = "\n".join(
+            f"Part {p['number']}: {p['title']} (chapter {p['chapters'][0]}-{p['chapters'][1]})"
+            f" - {p['summary']}"
+            for p in parts
+        )
+        if book_type == "fiction":
+            characters = ", ".join(
+                c.get('name', '') for c in metadata.get('main_characters', []) if isinstance(c, dict)
+            )
+            context = f"Karakter Utama: {characters or '-'}\nSetting: {metadata.get('setting', '')}"
+            chapter_fields = "number, title, description, key_events, character_development"
+        else:
+            context = f"Kategori: {metadata.get('category', '')}"
+            chapter_fields = "number, title, description, key_points, learning_objectives"
+
         user_prompt = f"""
+Judul Buku: {metadata.get('title', '')}
+Jumlah Chapter: {num_chapters}
+Synopsis: {metadata.get('synopsis', '')}
+{context}
+
+Kerangka buku:
+{part_lines}
+
+Buat outline detail untuk Part {part['number']}: {part['title']}, yaitu HANYA
+chapter {first} sampai {last} ({count} chapter). Chapter harus melanjutkan part
+sebelumnya dan mengarah ke part berikutnya sesuai kerangka.
+
+Output dalam format JSON {{"chapters": [...]}} dengan field {chapter_fields}.
+"""
+        messages = [
+            {"role": "system", "content": self._outline_system_prompt(book_type)},
+            {"role": "user", "content": user_prompt}
+        ]
+        options = self.budget_options(
+            messages, self.PART_TOKENS + count * self.OUTLINE_TOKENS_PER_CHAPTER
+        )
+        model = create_model("OutlineChapters", chapters=(List[chapter_model(book_type)], ...))
+        result = self.chat_structured(
+            messages, model, schema=chapters_schema(book_type, count), options=options
+        )
+        return [chapter.model_dump() for chapter in result.chapters]
+
+    def _outline_messages(
+        self,
+        book_type: str,
+        topic: str,
+        num_chapters: int,
+        target_audience: str,
+        additional_info: str
+    ) -> List[Dict[str, str]]:
+        """Prompt planner untuk outline lengkap sesuai tipe buku."""
+        if book_type == "fiction":
+            user_prompt = f"""
 Buat outline lengkap untuk sebuah novel fiksi dengan detail berikut:
 
 Topik/Tema: {topic}
@@ -107,52 +477,8 @@ Pastikan outline memiliki:
 4. Resolution yang satisfying
 5. Character arc yang jelas
 """
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-
-        response = self.chat(messages)
-        content = response['message']['content']
-
-        # Parse JSON dari response
-        try:
-            # Cari JSON dalam response
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx != -1 and end_idx != 0:
-                json_str = content[start_idx:end_idx]
-                outline = json.loads(json_str)
-            else:
-                raise ValueError("JSON tidak ditemukan dalam response")
-        except (json.JSONDecodeError, ValueError) as e:
-            # Jika parsing gagal, buat struktur default
-            self.display_status(
-                f"Warning: Gagal parse JSON ({e}), membuat struktur default",
-                style="warning"
-            )
-            outline = self._create_default_fiction_outline(
-                topic, num_chapters, target_audience
-            )
-
-        return outline
-
-    def _create_nonfiction_outline(
-        self,
-        topic: str,
-        num_chapters: int,
-        target_audience: str,
-        additional_info: str
-    ) -> Dict:
-        """Buat outline untuk buku non-fiksi."""
-        system_prompt = self.create_system_prompt(
-            "Kamu adalah seorang penulis non-fiksi berpengalaman. "
-            "Tugasmu adalah membuat outline buku yang terstruktur dengan baik, "
-            "informatif, dan mudah dipahami."
-        )
-
-        user_prompt = f"""
+        else:
+            user_prompt = f"""
 Buat outline lengkap untuk sebuah buku non-fiksi dengan detail berikut:
 
 Topik: {topic}
@@ -187,34 +513,246 @@ Pastikan outline:
 5. Conclusion yang merangkum semua
 """
 
-        messages = [
-            {"role": "system", "content": system_prompt},
+        return [
+            {"role": "system", "content": self._outline_system_prompt(book_type)},
             {"role": "user", "content": user_prompt}
         ]
 
-        response = self.chat(messages)
-        content = response['message']['content']
+    def _create_fiction_outline(
+        self,
+        topic: str,
+        num_chapters: int,
+        target_audience: str,
+        additional_info: str,
+        on_metadata: Optional[MetadataCallback] = None,
+        on_chapter: Optional[ChapterCallback] = None
+    ) -> Dict:
+        """Buat outline untuk buku fiksi."""
+        messages = self._outline_messages(
+            "fiction", topic, num_chapters, target_audience, additional_info
+        )
+        options = self.budget_options(
+            messages,
+            self.OUTLINE_BASE_TOKENS + num_chapters * self.OUTLINE_TOKENS_PER_CHAPTER
+        )
+        defaults = self._create_default_fiction_outline(topic, num_chapters, target_audience)
+        return self._stream_outline(
+            messages, options, "fiction", defaults, on_metadata, on_chapter
+        )
+
+    def _create_nonfiction_outline(
+        self,
+        topic: str,
+        num_chapters: int,
+        target_audience: str,
+        additional_info: str,
+        on_metadata: Optional[MetadataCallback] = None,
+        on_chapter: Optional[ChapterCallback] = None
+    ) -> Dict:
+        """Buat outline untuk buku non-fiksi."""
+        messages = self._outline_messages(
+            "non_fiction", topic, num_chapters, target_audience, additional_info
+        )
+        options = self.budget_options(
+            messages,
+            self.OUTLINE_BASE_TOKENS + num_chapters * self.OUTLINE_TOKENS_PER_CHAPTER
+        )
+        defaults = self._create_default_nonfiction_outline(topic, num_chapters, target_audience)
+        return self._stream_outline(
+            messages, options, "non_fiction", defaults, on_metadata, on_chapter
+        )
+
+    def _stream_outline(
+        self,
+        messages: List[Dict[str, str]],
+        options: Dict,
+        book_type: str,
+        defaults: Dict,
+        on_metadata: Optional[MetadataCallback],
+        on_chapter: Optional[ChapterCallback]
+    ) -> Dict:
+        """
+        Stream outline dengan JSON schema dan parse bertahap.
+
+        Chapter yang valid tetap dipakai walaupun JSON terpotong, ada elemen
+        yang rusak, atau stream putus di tengah. Chapter yang hilang diminta
+        ulang (maksimal `structured_config.max_repairs` call); baru setelah
+        itu sisa chapter/field diisi dari outline default.
+
+        Args:
+            messages: Prompt planner
+            options: Options Ollama
+            book_type: fiction/non_fiction (menentukan schema)
+            defaults: Outline default (_create_default_*_outline)
+            on_metadata: Callback metadata buku
+            on_chapter: Callback setiap chapter
 
-        # Parse JSON dari response
+        Returns:
+            Outline lengkap
+        """
+        num_chapters = len(defaults['chapters'])
+        schema = outline_schema(book_type, num_chapters) if structured_config.enabled else None
+        sink = _OutlineSink(book_type, defaults, on_metadata, on_chapter)
         try:
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx != -1 and end_idx != 0:
-                json_str = content[start_idx:end_idx]
-                outline = json.loads(json_str)
-            else:
-                raise ValueError("JSON tidak ditemukan dalam response")
-        except (json.JSONDecodeError, ValueError) as e:
+            content = self.chat_stream(
+                messages, display_live=False, options=options, sinks=[sink], format=schema
+            )
+            if content != sink.parser.text:
+                # Stream gagal dan chat_stream memakai fallback non-streaming
+                sink.replay(content)
+        except OllamaCallError as e:
+            if not sink.parser.fields and not sink.chapters:
+                raise
             self.display_status(
-                f"Warning: Gagal parse JSON ({e}), membuat struktur default",
+                f"Warning: Stream outline terputus ({e}), memakai bagian yang sudah diterima",
                 style="warning"
             )
-            outline = self._create_default_nonfiction_outline(
-                topic, num_chapters, target_audience
+
+        parsed = sink.parser.result()
+        if not parsed:
+            self.display_status(
+                "Warning: Gagal parse JSON outline, membuat chapter ulang",
+                style="warning"
             )
+        sink.emit_metadata(parsed)
+        if not sink.chapters:
+            # Parser tidak menemukan chapter saat streaming (misal format tidak terduga)
+            for chapter in parsed.get('chapters') or []:
+                if isinstance(chapter, dict):
+                    sink.emit_chapter(chapter)
+
+        self._fill_chapters(messages, options, book_type, sink, num_chapters)
 
+        outline = dict(sink.metadata)
+        outline.update({k: v for k, v in parsed.items() if k != 'chapters'})
+        outline['chapters'] = sink.chapters
         return outline
 
+    def _fill_chapters(
+        self,
+        messages: List[Dict[str, str]],
+        options: Dict,
+        book_type: str,
+        sink: _OutlineSink,
+        num_chapters: int
+    ):
+        """
+        Minta chapter yang hilang (maksimal `structured_config.max_repairs`
+        call), lalu isi sisanya dari outline default.
+        """
+        for _ in range(structured_config.max_repairs):
+            if len(sink.chapters) >= num_chapters:
+                break
+            try:
+                self._complete_chapters(messages, options, book_type, sink, num_chapters)
+            except OllamaCallError:
+                break
+
+        sink.limit = None
+        recovered = len(sink.chapters)
+        if recovered < num_chapters:
+            invalid = sink.parser.errors + sink.invalid
+            skipped = f" ({invalid} elemen rusak dilewati)" if invalid else ""
+            self.display_status(
+                f"Warning: Outline hanya berisi {recovered} dari {num_chapters} "
+                f"chapter valid{skipped}, sisanya diisi default",
+                style="warning"
+            )
+        for default in sink.defaults['chapters'][recovered:]:
+            sink.emit_chapter(dict(default, number=len(sink.chapters) + 1))
+
+    def complete_outline(
+        self,
+        outline: Dict,
+        book_type: str,
+        topic: str,
+        num_chapters: int,
+        target_audience: str = "general",
+        additional_info: str = "",
+        on_chapter: Optional[ChapterCallback] = None
+    ) -> Dict:
+        """
+        Lengkapi outline yang planning-nya terhenti (misal proses mati saat
+        outline masih di-stream).
+
+        Chapter yang sudah ada dipertahankan; hanya chapter yang belum
+        direncanakan yang diminta ke model (lihat _complete_chapters) dan
+        dikirim ke `on_chapter`.
+
+        Args:
+            outline: Outline parsial (metadata + chapter yang sudah ada)
+            book_type: fiction/non_fiction
+            topic: Topik buku
+            num_chapters: Jumlah chapter yang diminta saat create
+            target_audience: Target pembaca
+            additional_info: Informasi tambahan
+            on_chapter: Callback setiap chapter baru
+
+        Returns:
+            Outline lengkap
+        """
+        messages = self._outline_messages(
+            book_type, topic, num_chapters, target_audience, additional_info
+        )
+        options = self.budget_options(
+            messages,
+            self.OUTLINE_BASE_TOKENS + num_chapters * self.OUTLINE_TOKENS_PER_CHAPTER
+        )
+        defaults = (
+            self._create_default_fiction_outline if book_type == "fiction"
+            else self._create_default_nonfiction_outline
+        )(topic, num_chapters, target_audience)
+
+        sink = _OutlineSink(book_type, defaults, None, on_chapter)
+        # Metadata dan chapter lama sudah tersimpan, tidak dikirim ulang
+        sink.metadata = {k: v for k, v in outline.items() if k != 'chapters'}
+        sink.chapters = list(outline.get('chapters', []))
+        self._fill_chapters(messages, options, book_type, sink, num_chapters)
+        return {**outline, 'chapters': sink.chapters}
+
+    def _complete_chapters(
+        self,
+        messages: List[Dict[str, str]],
+        options: Dict,
+        book_type: str,
+        sink: _OutlineSink,
+        num_chapters: int
+    ):
+        """
+        Minta chapter yang belum ada (outline terpotong atau elemen tidak valid).
+
+        Hanya chapter yang hilang yang di-generate, dengan judul chapter yang
+        sudah ada sebagai konteks, sehingga call ini jauh lebih kecil dari
+        mengulang seluruh outline.
+        """
+        first = len(sink.chapters) + 1
+        count = num_chapters - len(sink.chapters)
+        existing = "\n".join(f"{c['number']}. {c['title']}" for c in sink.chapters) or "-"
+        self.display_status(
+            f"Melengkapi outline: chapter {first}-{num_chapters}",
+            style="info"
+        )
+        prompt = (
+            f"Outline sebelumnya terpotong. Chapter yang sudah ada:\n{existing}\n\n"
+            f"Buat HANYA chapter {first} sampai {num_chapters} ({count} chapter) yang "
+            f"melanjutkan cerita, dalam format JSON {{\"chapters\": [...]}} dengan struktur "
+            f"chapter yang sama seperti di atas."
+        )
+        schema = chapters_schema(book_type, count) if structured_config.enabled else None
+        repair_messages = list(messages) + [{"role": "user", "content": prompt}]
+        options = dict(
+            options,
+            **self.budget_options(repair_messages, count * self.OUTLINE_TOKENS_PER_CHAPTER)
+        )
+
+        sink.restart()
+        sink.limit = num_chapters
+        content = self.chat_stream(
+            repair_messages, display_live=False, options=options, sinks=[sink], format=schema
+        )
+        if content != sink.parser.text:
+            sink.replay(content)
+
     def _create_default_fiction_outline(
         self,
         topic: str,
@@ -269,3 +807,79 @@ Pastikan outline:
             "key_takeaways": [],
             "chapters": chapters
         }
+
+
+class OutlineStream:
+    """
+    Jalankan PlannerAgent di background thread.
+
+    Metadata buku bisa diambil begitu selesai di-generate dan chapter
+    bisa dikonsumsi satu per satu sementara chapter berikutnya masih
+    direncanakan, sehingga penulisan chapter 1 tidak menunggu seluruh
+    outline selesai.
+    """
+
+    def __init__(self, planner: PlannerAgent, **kwargs):
+        """
+        Mulai planning.
+
+        Args:
+            planner: PlannerAgent
+            **kwargs: Argumen PlannerAgent.execute (topic, book_type, dll)
+        """
+        self._chapters: queue.Queue = queue.Queue()
+        self._metadata_ready = threading.Event()
+        self._metadata: Optional[Dict] = None
+        self._outline: Optional[Dict] = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, args=(planner, kwargs), name="outline-stream", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, planner: PlannerAgent, kwargs: Dict):
+        try:
+            self._outline = planner.execute(
+                on_metadata=self._on_metadata, on_chapter=self._chapters.put, **kwargs
+            )
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._metadata_ready.set()
+            self._chapters.put(_OUTLINE_DONE)
+
+    def _on_metadata(self, metadata: Dict):
+        self._metadata = metadata
+        self._metadata_ready.set()
+
+    def metadata(self) -> Dict:
+        """
+        Tunggu metadata buku (title, genre, synopsis, dll tanpa chapters).
+
+        Raises:
+            Exception: Error planner jika planning gagal sebelum metadata ada
+        """
+        self._metadata_ready.wait()
+        if self._metadata is None:
+            raise self._error
+        return self._metadata
+
+    def chapters(self) -> Iterator[Dict]:
+        """Yield setiap chapter begitu selesai direncanakan."""
+        while True:
+            chapter = self._chapters.get()
+            if chapter is _OUTLINE_DONE:
+                return
+            yield chapter
+
+    def result(self) -> Dict:
+        """
+        Tunggu outline lengkap.
+
+        Raises:
+            Exception: Error planner jika planning gagal
+        """
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._outline
@@ -1,13 +1,28 @@
 """Reviewer agent untuk quality control dan feedback."""
 
-from typing import Dict, List
+import re
+from typing import Dict, List, Optional
+from pydantic import BaseModel
 from .base_agent import BaseAgent
-from ..config.settings import model_config
+from ..config.settings import AgentRole, model_config
+from ..utils.structured_output import StructuredOutputError, review_model
+
+# Score setelah nama kriteria, baik JSON ("overall_score": 8) maupun teks
+# bebas ("- Overall Score (1-10): 8/10", "**Pacing**: 7.5"); "_" dan spasi setara
+_SCORE_AFTER_KEY = r'{key}[^:\n]{{0,20}}?:[\s"*]*(\d+(?:[.,]\d+)?)'
 
 
 class ReviewerAgent(BaseAgent):
     """Agent untuk mereview dan memberikan feedback pada konten."""
 
+    # Review & quick_check memakai temperature rendah, aman di-reuse
+    cache_responses = True
+    agent_role = AgentRole.REVIEWER
+
+    # Perkiraan token output: review lengkap vs quick check
+    REVIEW_OUTPUT_TOKENS = 1024
+    QUICK_CHECK_OUTPUT_TOKENS = 512
+
     def __init__(self):
         """Initialize reviewer agent dengan judge model."""
         super().__init__(
@@ -67,13 +82,18 @@ class ReviewerAgent(BaseAgent):
             content, chapter_info, book_context, criteria
         )
 
-        overall_score = review_result.get('overall_score', 0)
-        status = "success" if overall_score >= 7 else "warning"
-
-        self.display_status(
-            f"Review selesai! Score: {overall_score}/10",
-            style=status
-        )
+        overall_score = review_result['overall_score']
+        if overall_score is None:
+            self.display_status(
+                "Warning: Review gagal, score tidak ditemukan di output reviewer",
+                style="warning"
+            )
+        else:
+            status = "success" if overall_score >= 7 else "warning"
+            self.display_status(
+                f"Review selesai! Score: {overall_score}/10",
+                style=status
+            )
 
         return review_result
 
@@ -115,30 +135,14 @@ KRITERIA REVIEW:
 {criteria_text}
 
 INSTRUKSI:
-Berikan review dalam format berikut:
-
-## Overall Assessment
-[Penilaian umum tentang chapter ini]
-
-## Scores (1-10)
-{chr(10).join([f'- {c.replace("_", " ").title()}: [score]/10' for c in criteria])}
-- Overall Score: [score]/10
-
-## Strengths
-- [Strength 1]
-- [Strength 2]
-- [Strength 3]
-
-## Areas for Improvement
-- [Area 1]: [Specific suggestion]
-- [Area 2]: [Specific suggestion]
-
-## Specific Feedback
-[Feedback detail dan constructive criticism]
-
-## Recommendations
-- [Actionable recommendation 1]
-- [Actionable recommendation 2]
+Berikan review dalam format JSON dengan field:
+- overall_assessment: penilaian umum tentang chapter ini
+- scores: score 1-10 untuk setiap kriteria ({", ".join(criteria)})
+- overall_score: score keseluruhan 1-10
+- strengths: kelebihan chapter
+- improvements: area yang perlu diperbaiki beserta saran spesifik
+- specific_feedback: feedback detail dan constructive criticism
+- recommendations: rekomendasi yang actionable
 
 Berikan penilaian yang objektif dan konstruktif!
 """
@@ -148,59 +152,74 @@ Berikan penilaian yang objektif dan konstruktif!
             {"role": "user", "content": user_prompt}
         ]
 
-        response = self.chat(messages, temperature=0.3)
-        feedback_text = response['message']['content']
-
-        # Parse scores dari feedback
-        scores = self._parse_scores(feedback_text, criteria)
-
+        options = self.budget_options(messages, self.REVIEW_OUTPUT_TOKENS)
+        try:
+            review = self.chat_structured(
+                messages, review_model(tuple(criteria)), temperature=0.3, options=options
+            )
+            scores = {
+                "overall_score": review.overall_score,
+                "criteria_scores": review.scores.model_dump()
+            }
+            feedback_text = self._format_feedback(review, criteria)
+        except StructuredOutputError as e:
+            # Output tetap tidak sesuai schema: ambil score dari JSON parsial/teks bebas
+            scores = self._parse_scores(e.text, criteria)
+            feedback_text = e.text
+
+        overall_score = scores['overall_score']
         return {
-            "overall_score": scores.get('overall_score', 7.0),
-            "criteria_scores": scores.get('criteria_scores', {}),
+            # None = review gagal (score tidak ditemukan), bukan score default
+            "overall_score": overall_score,
+            "criteria_scores": scores['criteria_scores'],
             "feedback": feedback_text,
-            "needs_revision": scores.get('overall_score', 7.0) < 7.0
+            "needs_revision": overall_score is not None and overall_score < 7.0
         }
 
+    def _format_feedback(self, review: BaseModel, criteria: List[str]) -> str:
+        """Render review terstruktur sebagai markdown (format review sebelumnya)."""
+        def bullets(items: List[str]) -> str:
+            return "\n".join(f"- {item}" for item in items) or "-"
+
+        scores = review.scores.model_dump()
+        score_lines = "\n".join(
+            f"- {c.replace('_', ' ').title()}: {scores[c]:g}/10" for c in criteria
+        )
+        return (
+            f"## Overall Assessment\n{review.overall_assessment}\n\n"
+            f"## Scores (1-10)\n{score_lines}\n- Overall Score: {review.overall_score:g}/10\n\n"
+            f"## Strengths\n{bullets(review.strengths)}\n\n"
+            f"## Areas for Improvement\n{bullets(review.improvements)}\n\n"
+            f"## Specific Feedback\n{review.specific_feedback or '-'}\n\n"
+            f"## Recommendations\n{bullets(review.recommendations)}"
+        )
+
     def _parse_scores(self, feedback_text: str, criteria: List[str]) -> Dict:
-        """Parse scores dari feedback text."""
+        """
+        Parse scores dari feedback text (fallback jika output tidak valid).
+
+        Teks bisa berupa JSON terpotong/tidak valid maupun markdown bebas.
+        `overall_score` None jika score keseluruhan tidak ditemukan.
+        """
         scores = {
             "criteria_scores": {},
-            "overall_score": 7.0
+            "overall_score": self._find_score(feedback_text, "overall_score")
         }
-
-        lines = feedback_text.split('\n')
-        for line in lines:
-            # Cari overall score
-            if 'overall score' in line.lower():
-                try:
-                    # Ekstrak angka dari line
-                    parts = line.split(':')
-                    if len(parts) > 1:
-                        score_part = parts[1].strip()
-                        score_str = ''.join(c for c in score_part if c.isdigit() or c == '.')
-                        if score_str:
-                            score = float(score_str.split('/')[0])
-                            scores['overall_score'] = min(10.0, max(1.0, score))
-                except (ValueError, IndexError):
-                    pass
-
-            # Cari criteria scores
-            for criterion in criteria:
-                criterion_name = criterion.replace('_', ' ').lower()
-                if criterion_name in line.lower():
-                    try:
-                        parts = line.split(':')
-                        if len(parts) > 1:
-                            score_part = parts[1].strip()
-                            score_str = ''.join(c for c in score_part if c.isdigit() or c == '.')
-                            if score_str:
-                                score = float(score_str.split('/')[0])
-                                scores['criteria_scores'][criterion] = min(10.0, max(1.0, score))
-                    except (ValueError, IndexError):
-                        pass
-
+        for criterion in criteria:
+            score = self._find_score(feedback_text, criterion)
+            if score is not None:
+                scores['criteria_scores'][criterion] = score
         return scores
 
+    @staticmethod
+    def _find_score(text: str, key: str) -> Optional[float]:
+        """Score 1-10 pertama setelah `key` ("8/10" -> 8.0), atau None."""
+        name = r"[\s_]+".join(re.escape(part) for part in key.split('_'))
+        match = re.search(_SCORE_AFTER_KEY.format(key=name), text, re.IGNORECASE)
+        if not match:
+            return None
+        return min(10.0, max(1.0, float(match.group(1).replace(',', '.'))))
+
     def quick_check(self, content: str, check_type: str = "grammar") -> Dict:
         """
         Quick check untuk aspek tertentu.
@@ -250,7 +269,8 @@ Format output:
             {"role": "user", "content": user_prompt}
         ]
 
-        response = self.chat(messages, temperature=0.2)
+        options = self.budget_options(messages, self.QUICK_CHECK_OUTPUT_TOKENS)
+        response = self.chat(messages, temperature=0.2, options=options)
 
         return {
             "check_type": check_type,
@@ -0,0 +1,124 @@
+"""Summarizer agent untuk memori kontinuitas antar chapter."""
+
+from typing import Dict, List, Optional
+from .base_agent import BaseAgent
+from ..config.settings import AgentRole, continuity_config, model_config
+from ..utils.continuity import ChapterSummary
+from ..utils.token_budget import words_to_tokens
+
+
+class SummarizerAgent(BaseAgent):
+    """
+    Agent untuk meringkas chapter yang sudah ditulis.
+
+    Memakai fast_model karena dipanggil sekali per chapter (dan setiap
+    kali digest dilipat); ringkasannya disimpan di ContinuityMemory dan
+    disisipkan ke prompt writer untuk chapter berikutnya.
+    """
+
+    # Ringkasan memakai temperature rendah, aman di-reuse (misal saat resume)
+    cache_responses = True
+    agent_role = AgentRole.SUMMARIZER
+
+    def __init__(self, model: Optional[str] = None):
+        """
+        Initialize summarizer agent.
+
+        Args:
+            model: Model yang digunakan (default: fast_model)
+        """
+        super().__init__(
+            model=model or model_config.fast_model,
+            role="Continuity Editor",
+            temperature=0.2
+        )
+
+    def execute(
+        self,
+        chapter_info: Dict,
+        content: str,
+        language: str = "indonesian"
+    ) -> str:
+        """
+        Ringkas satu chapter.
+
+        Args:
+            chapter_info: Info chapter dari outline
+            content: Teks chapter yang sudah ditulis
+            language: Bahasa penulisan buku
+
+        Returns:
+            Ringkasan (maksimal ContinuityConfig.summary_words kata)
+        """
+        max_chars = continuity_config.max_input_chars
+        if len(content) > max_chars:
+            # Awal dan akhir chapter paling menentukan kontinuitas
+            half = max_chars // 2
+            content = content[:half] + "\n\n[...]\n\n" + content[-half:]
+
+        words = continuity_config.summary_words
+        system_prompt = self.create_system_prompt(
+            "Tugasmu adalah meringkas chapter buku untuk catatan kontinuitas penulis: "
+            "apa yang terjadi, perubahan keadaan karakter, fakta dan detail yang harus "
+            "tetap konsisten, serta alur yang belum selesai."
+        )
+        user_prompt = f"""
+Ringkas Chapter {chapter_info.get('number', '')}: {chapter_info.get('title', '')} berikut
+dalam maksimal {words} kata, {self._language_name(language)}.
+
+Tulis ringkasan padat tanpa pembuka, tanpa heading, dan tanpa penilaian.
+Sebutkan nama, tempat, dan fakta secara eksplisit.
+
+CHAPTER:
+{content}
+"""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        options = self.budget_options(messages, words_to_tokens(words))
+        response = self.chat(messages, options=options)
+        return response['message']['content'].strip()
+
+    def compress(self, digest: str, summaries: List[ChapterSummary], max_words: int) -> str:
+        """
+        Lipat ringkasan chapter ke digest cerita sejauh ini.
+
+        Args:
+            digest: Digest sebelumnya (boleh kosong)
+            summaries: (number, title, summary) chapter yang dilipat
+            max_words: Panjang maksimal digest baru
+
+        Returns:
+            Digest baru yang mencakup digest lama dan semua summaries
+        """
+        chapters = "\n\n".join(
+            f"Chapter {number} ({title}):\n{summary}" for number, title, summary in summaries
+        )
+        user_prompt = f"""
+RINGKASAN SEJAUH INI:
+{digest or '-'}
+
+CHAPTER BERIKUTNYA:
+{chapters}
+
+Gabungkan semuanya menjadi satu ringkasan buku sejauh ini dalam maksimal {max_words} kata.
+Pertahankan fakta, nama, dan alur yang belum selesai; ringkas detail yang sudah tidak
+relevan. Tulis ringkasan saja, tanpa pembuka atau heading, dalam bahasa yang sama.
+"""
+        messages = [
+            {"role": "system", "content": self.create_system_prompt(
+                "Tugasmu adalah menjaga ringkasan kontinuitas buku tetap padat dan akurat."
+            )},
+            {"role": "user", "content": user_prompt}
+        ]
+        options = self.budget_options(messages, words_to_tokens(max_words))
+        response = self.chat(messages, options=options)
+        return response['message']['content'].strip()
+
+    @staticmethod
+    def _language_name(language: str) -> str:
+        """Instruksi bahasa ringkasan sesuai bahasa buku."""
+        if language.lower() in ["english", "en", "inggris"]:
+            return "dalam bahasa Inggris"
+        return "dalam bahasa Indonesia"
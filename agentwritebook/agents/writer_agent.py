@@ -1,12 +1,26 @@
 """Writer agent untuk menulis konten chapter."""
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from .base_agent import BaseAgent
-from ..config.settings import model_config
+from ..config.settings import AgentRole, model_config
+from ..utils.token_budget import words_to_tokens
 
 
 class WriterAgent(BaseAgent):
-    """Agent untuk menulis konten chapter."""
+    """
+    Agent untuk menulis konten chapter.
+
+    Prompt chapter disusun prefix-stable: system prompt, informasi buku,
+    dan instruksi penulisan identik byte-per-byte untuk semua chapter,
+    sedangkan ringkasan cerita sejauh ini dan info chapter diletakkan di
+    akhir. Dengan begitu Ollama bisa me-reuse KV cache prefix dari chapter
+    sebelumnya dan hanya perlu meng-evaluate bagian yang berubah.
+    """
+
+    agent_role = AgentRole.WRITER
+
+    # Perkiraan token output untuk expand_section
+    EXPAND_OUTPUT_TOKENS = 1536
 
     def __init__(self, model: Optional[str] = None):
         """
@@ -28,7 +42,10 @@ class WriterAgent(BaseAgent):
         writing_style: str = "engaging",
         min_words: int = 1500,
         enable_streaming: bool = False,
-        language: str = "indonesian"
+        language: str = "indonesian",
+        sinks: Optional[List] = None,
+        partial_content: str = "",
+        story_so_far: str = ""
     ) -> Dict:
         """
         Tulis konten chapter.
@@ -39,6 +56,10 @@ class WriterAgent(BaseAgent):
             writing_style: Style penulisan (engaging, formal, casual, dll)
             min_words: Minimum jumlah kata
             enable_streaming: Enable streaming output
+            sinks: Sink tambahan untuk output streaming (misal FileSink)
+            partial_content: Teks chapter dari stream yang terhenti; model
+                melanjutkan teks ini alih-alih mulai dari awal
+            story_so_far: Ringkasan chapter yang sudah ditulis (ContinuityMemory)
 
         Returns:
             Dictionary berisi konten chapter dan metadata
@@ -57,11 +78,13 @@ class WriterAgent(BaseAgent):
 
         if is_fiction:
             content = self._write_fiction_chapter(
-                chapter_info, book_context, writing_style, min_words, enable_streaming, language
+                chapter_info, book_context, writing_style, min_words, enable_streaming, language,
+                sinks, partial_content, story_so_far
             )
         else:
             content = self._write_nonfiction_chapter(
-                chapter_info, book_context, writing_style, min_words, enable_streaming, language
+                chapter_info, book_context, writing_style, min_words, enable_streaming, language,
+                sinks, partial_content, story_so_far
             )
 
         # Hitung statistik
@@ -88,7 +111,10 @@ class WriterAgent(BaseAgent):
         writing_style: str,
         min_words: int,
         enable_streaming: bool = False,
-        language: str = "indonesian"
+        language: str = "indonesian",
+        sinks: Optional[List] = None,
+        partial_content: str = "",
+        story_so_far: str = ""
     ) -> str:
         """Tulis chapter untuk buku fiksi."""
         
@@ -130,9 +156,22 @@ class WriterAgent(BaseAgent):
             for char in characters[:3]:  # Ambil 3 karakter utama
                 char_info += f"- {char.get('name', '')}: {char.get('description', '')}\n"
 
+        # Setelah bagian yang stabil agar prefix prompt tetap bisa di-reuse
+        story_block = ""
+        if story_so_far:
+            if language.lower() in ["english", "en", "inggris"]:
+                story_block = (
+                    f"\nSTORY SO FAR (stay consistent, do not retell):\n{story_so_far}\n"
+                )
+            else:
+                story_block = (
+                    f"\nCERITA SEJAUH INI (jaga konsistensi, jangan diceritakan ulang):\n"
+                    f"{story_so_far}\n"
+                )
+
         if language.lower() in ["english", "en", "inggris"]:
             user_prompt = f"""
-Write Chapter {chapter_num} of the following novel:
+You are writing chapters of the following novel.
 
 BOOK INFORMATION:
 Title: {title}
@@ -140,11 +179,6 @@ Synopsis: {synopsis}
 Setting: {setting}
 {char_info}
 
-CHAPTER INFO:
-Chapter Title: {chapter_title}
-Description: {description}
-Key Events: {', '.join(key_events) if key_events else 'Develop according to story flow'}
-
 WRITING INSTRUCTIONS:
 1. Write minimum {min_words} words
 2. Use {writing_style} style
@@ -169,10 +203,18 @@ QUALITY STANDARDS:
 
 Don't write "Chapter X:" or chapter title at the beginning - start the story directly.
 {lang_instruction}
+{story_block}
+CHAPTER INFO:
+Chapter: {chapter_num}
+Chapter Title: {chapter_title}
+Description: {description}
+Key Events: {', '.join(key_events) if key_events else 'Develop according to story flow'}
+
+Write Chapter {chapter_num} now.
 """
         else:
             user_prompt = f"""
-Tulis Chapter {chapter_num} dari novel berikut:
+Kamu sedang menulis chapter-chapter dari novel berikut.
 
 INFORMASI BUKU:
 Judul: {title}
@@ -180,11 +222,6 @@ Synopsis: {synopsis}
 Setting: {setting}
 {char_info}
 
-INFO CHAPTER:
-Judul Chapter: {chapter_title}
-Deskripsi: {description}
-Key Events: {', '.join(key_events) if key_events else 'Dikembangkan sesuai alur cerita'}
-
 INSTRUKSI PENULISAN:
 1. Tulis minimal {min_words} kata
 2. Gunakan {writing_style} style
@@ -209,6 +246,14 @@ STANDAR KUALITAS:
 
 Jangan menulis "Chapter X:" atau judul chapter di awal - langsung mulai cerita.
 {lang_instruction}
+{story_block}
+INFO CHAPTER:
+Chapter: {chapter_num}
+Judul Chapter: {chapter_title}
+Deskripsi: {description}
+Key Events: {', '.join(key_events) if key_events else 'Dikembangkan sesuai alur cerita'}
+
+Tulis Chapter {chapter_num} sekarang.
 """
 
         messages = [
@@ -216,13 +261,21 @@ Jangan menulis "Chapter X:" atau judul chapter di awal - langsung mulai cerita.
             {"role": "user", "content": user_prompt}
         ]
 
+        if partial_content:
+            # Pesan assistant terakhir dilanjutkan oleh model (prefill)
+            messages.append({"role": "assistant", "content": partial_content})
+
+        options = self.budget_options(messages, words_to_tokens(min_words))
+
         if enable_streaming:
-            content = self.chat_stream(messages, temperature=0.85, display_live=True)
+            content = self.chat_stream(
+                messages, temperature=0.85, display_live=True, options=options, sinks=sinks
+            )
         else:
-            response = self.chat(messages, temperature=0.85)
+            response = self.chat(messages, temperature=0.85, options=options)
             content = response['message']['content']
 
-        return content.strip()
+        return (partial_content + content).strip()
 
     def _write_nonfiction_chapter(
         self,
@@ -231,7 +284,10 @@ Jangan menulis "Chapter X:" atau judul chapter di awal - langsung mulai cerita.
         writing_style: str,
         min_words: int,
         enable_streaming: bool = False,
-        language: str = "indonesian"
+        language: str = "indonesian",
+        sinks: Optional[List] = None,
+        partial_content: str = "",
+        story_so_far: str = ""
     ) -> str:
         """Tulis chapter untuk buku non-fiksi."""
         
@@ -264,20 +320,21 @@ Jangan menulis "Chapter X:" atau judul chapter di awal - langsung mulai cerita.
         key_points = chapter_info.get('key_points', [])
         learning_objectives = chapter_info.get('learning_objectives', '')
 
+        # Setelah bagian yang stabil agar prefix prompt tetap bisa di-reuse
+        story_block = ""
+        if story_so_far:
+            story_block = (
+                f"\nRINGKASAN CHAPTER SEBELUMNYA (lanjutkan, jangan diulang):\n{story_so_far}\n"
+            )
+
         user_prompt = f"""
-Tulis Chapter {chapter_num} dari buku non-fiksi berikut:
+Kamu sedang menulis chapter-chapter dari buku non-fiksi berikut.
 
 INFORMASI BUKU:
 Judul: {title}
 Kategori: {category}
 Tentang: {synopsis}
 
-CHAPTER INFO:
-Judul Chapter: {chapter_title}
-Deskripsi: {description}
-Key Points: {', '.join(key_points) if key_points else 'Dikembangkan sesuai topik'}
-Learning Objectives: {learning_objectives}
-
 INSTRUKSI PENULISAN:
 1. Tulis minimal {min_words} kata
 2. Gunakan {writing_style} style
@@ -294,6 +351,15 @@ Format:
 - Tulis dalam bahasa Indonesia yang profesional namun mudah dipahami
 
 Tulis konten yang valuable dan implementable!
+{story_block}
+CHAPTER INFO:
+Chapter: {chapter_num}
+Judul Chapter: {chapter_title}
+Deskripsi: {description}
+Key Points: {', '.join(key_points) if key_points else 'Dikembangkan sesuai topik'}
+Learning Objectives: {learning_objectives}
+
+Tulis Chapter {chapter_num} sekarang.
 """
 
         messages = [
@@ -301,13 +367,21 @@ Tulis konten yang valuable dan implementable!
             {"role": "user", "content": user_prompt}
         ]
 
+        if partial_content:
+            # Pesan assistant terakhir dilanjutkan oleh model (prefill)
+            messages.append({"role": "assistant", "content": partial_content})
+
+        options = self.budget_options(messages, words_to_tokens(min_words))
+
         if enable_streaming:
-            content = self.chat_stream(messages, temperature=0.8, display_live=True)
+            content = self.chat_stream(
+                messages, temperature=0.8, display_live=True, options=options, sinks=sinks
+            )
         else:
-            response = self.chat(messages, temperature=0.8)
+            response = self.chat(messages, temperature=0.8, options=options)
             content = response['message']['content']
 
-        return content.strip()
+        return (partial_content + content).strip()
 
     def expand_section(
         self,
@@ -352,5 +426,6 @@ Jaga konsistensi tone dan style dengan konten original.
             {"role": "user", "content": user_prompt}
         ]
 
-        response = self.chat(messages)
+        options = self.budget_options(messages, self.EXPAND_OUTPUT_TOKENS)
+        response = self.chat(messages, options=options)
         return response['message']['content'].strip()
@@ -1,14 +1,151 @@
 """Konfigurasi untuk Ollama dan model yang digunakan."""
 
+import os
 from pydantic import BaseModel
-from typing import Literal
+from typing import Dict, List, Literal, Tuple
 
 
 class OllamaConfig(BaseModel):
     """Konfigurasi untuk Ollama client."""
 
-    base_url: str = "http://172.29.176.1:11434"
-    timeout: int = 300  # 5 menit timeout
+    base_url: str = os.getenv("AGENTWRITEBOOK_OLLAMA_URL", "http://172.29.176.1:11434")
+    # Beberapa server Ollama (dipisah koma); kosong = hanya base_url
+    endpoints: List[str] = [
+        url.strip() for url in os.getenv("AGENTWRITEBOOK_OLLAMA_URLS", "").split(",") if url.strip()
+    ]
+    health_interval: float = 30.0  # Interval refresh /api/tags dan /api/ps per endpoint
+    affinity_max_outstanding: int = 2  # Request aktif maksimal sebelum model affinity diabaikan
+    timeout: int = 300  # 5 menit timeout (deadline total per call)
+    stall_timeout: float = 60.0  # Stream dianggap macet jika tidak ada chunk selama ini
+    connect_timeout: float = 10.0
+    # Override per role agent (key: planner/writer/reviewer), misal writer butuh lebih lama
+    role_timeouts: Dict[str, float] = {"writer": 1200.0}
+    role_stall_timeouts: Dict[str, float] = {}
+    max_in_flight: int = 16  # Maksimal request async yang berjalan bersamaan
+    keepalive_connections: int = 16  # Koneksi HTTP yang dipertahankan di pool
+    pin_keep_alive: str = "30m"  # keep_alive untuk model yang sedang di-pin (schedule by-model)
+
+    def endpoint_urls(self) -> List[str]:
+        """Daftar server Ollama yang dipakai."""
+        return self.endpoints or [self.base_url]
+
+    def timeouts_for(self, role: str) -> Tuple[float, float]:
+        """Deadline dan stall timeout (detik) untuk role agent."""
+        return (
+            self.role_timeouts.get(role, self.timeout),
+            self.role_stall_timeouts.get(role, self.stall_timeout)
+        )
+
+
+class RetryConfig(BaseModel):
+    """Konfigurasi retry, backoff, dan circuit breaker untuk call ke Ollama."""
+
+    enabled: bool = True
+    max_attempts: int = 5  # Total percobaan per call (termasuk yang pertama)
+    base_delay: float = 1.0  # Backoff: base_delay * 2^attempt, dengan full jitter
+    max_delay: float = 30.0
+    rate_limit_delay: float = 10.0  # Delay minimal setelah 429 (model cloud)
+    breaker_threshold: int = 5  # Kegagalan beruntun sebelum breaker terbuka
+    breaker_cooldown: float = 30.0  # Detik breaker terbuka sebelum call percobaan
+    stage_retries: int = 2  # Berapa kali orchestrator mengulang stage (timeout/breaker terbuka)
+
+
+class FailoverConfig(BaseModel):
+    """Konfigurasi failover ke model cadangan saat model sebuah role gagal."""
+
+    enabled: bool = True
+    # Model cadangan per role, berurutan; nama field ModelConfig (misal "fast_model")
+    # diganti dengan nilainya
+    chains: Dict[str, List[str]] = {
+        "planner": ["creative_model", "fast_model"],
+        "writer": ["main_model", "fast_model"],
+        "reviewer": ["creative_model", "fast_model"],
+        "summarizer": ["fast_model", "main_model"],
+    }
+    suggest_alternatives: bool = True  # Coba ModelHelper.suggest_alternative jika chain habis
+    cooldown: float = 60.0  # Detik model yang gagal dilewati sebelum dicoba lagi
+    max_cooldown: float = 600.0  # Cooldown berlipat setiap gagal beruntun, sampai batas ini
+
+
+class RegistryConfig(BaseModel):
+    """Konfigurasi cache daftar model (/api/tags) dan detail model (/api/show)."""
+
+    ttl_seconds: float = 60.0  # Umur daftar model sebelum diambil ulang
+    refresh_interval: float = 0.0  # Refresh di background setiap N detik (0 = mati)
+    fetch_details: bool = True  # Ambil /api/show untuk context length dan capabilities
+
+
+class BenchConfig(BaseModel):
+    """Konfigurasi `writebook bench-models`."""
+
+    path: str = "~/.cache/agentwritebook/benchmarks.json"
+    num_predict: int = 256  # Token output per prompt benchmark
+    memory_poll_interval: float = 0.25  # Interval sampling /api/ps untuk peak memory
+
+
+class MemoryConfig(BaseModel):
+    """Konfigurasi budget memori model (VRAM/RAM) untuk call yang berjalan bersamaan."""
+
+    # Total memori untuk model yang aktif bersamaan (GB), 0 = tidak dibatasi
+    budget_gb: float = float(os.getenv("AGENTWRITEBOOK_MEMORY_BUDGET_GB", "0") or 0)
+    load_overhead: float = 1.2  # Ukuran file model -> perkiraan memori (KV cache, graph)
+    ps_refresh_seconds: float = 5.0  # Interval minimal membaca /api/ps untuk ukuran asli
+
+
+class CacheConfig(BaseModel):
+    """Konfigurasi cache respons di disk."""
+
+    enabled: bool = True
+    path: str = "~/.cache/agentwritebook/responses.sqlite"
+    max_size_mb: float = 256.0
+    ttl_seconds: int = 7 * 24 * 3600  # 1 minggu, 0 = tidak kadaluarsa
+    # Call dengan temperature lebih tinggi tidak di-cache (output-nya memang diharapkan beragam)
+    max_temperature: float = 0.5
+
+
+class ContextConfig(BaseModel):
+    """Konfigurasi sizing context window (num_ctx / num_predict) per call."""
+
+    enabled: bool = True
+    min_ctx: int = 2048
+    max_ctx: int = 16384
+    chars_per_token: float = 3.5  # Estimasi konservatif tanpa tokenizer
+    tokens_per_word: float = 1.6  # Token output per kata (Indonesia > Inggris)
+    output_headroom: float = 1.5  # Ruang ekstra di atas target minimal kata
+
+
+class OutlineConfig(BaseModel):
+    """Konfigurasi pembuatan outline."""
+
+    # Buku dengan chapter lebih banyak dari ini direncanakan per part (outline hierarkis)
+    hierarchical_threshold: int = 30
+    chapters_per_part: int = 10
+    parallel_parts: int = 4  # Part yang di-expand bersamaan (sesuaikan OLLAMA_NUM_PARALLEL)
+
+
+class ContinuityConfig(BaseModel):
+    """Konfigurasi memori kontinuitas (ringkasan chapter yang sudah ditulis) untuk writer."""
+
+    enabled: bool = True
+    budget_tokens: int = 1200  # Batas keras ringkasan yang disisipkan ke prompt writer
+    summary_words: int = 120  # Panjang ringkasan satu chapter
+    recent_chapters: int = 3  # Chapter terakhir yang ringkasannya disimpan utuh
+    max_input_chars: int = 24000  # Teks chapter yang dikirim ke summarizer (awal + akhir)
+
+
+class StructuredConfig(BaseModel):
+    """Konfigurasi output terstruktur (JSON schema lewat parameter `format` Ollama)."""
+
+    enabled: bool = True  # False = tanpa `format`, output tetap divalidasi
+    max_repairs: int = 2  # Call ulang maksimal jika output tidak valid terhadap schema
+
+
+class StreamConfig(BaseModel):
+    """Konfigurasi tampilan output streaming."""
+
+    render_fps: float = 15.0  # Maksimal flush ke terminal per detik
+    partial_flush_seconds: float = 2.0  # Interval flush file .partial chapter
+    partial_flush_chars: int = 4096  # Flush lebih awal jika buffer sudah sebesar ini
 
 
 class ModelConfig(BaseModel):
@@ -36,9 +173,21 @@ class AgentRole(str):
     PLANNER = "planner"  # Membuat outline
     WRITER = "writer"    # Menulis konten
     REVIEWER = "reviewer"  # Review kualitas
+    SUMMARIZER = "summarizer"  # Ringkasan chapter untuk kontinuitas
     EDITOR = "editor"    # Edit dan polish
 
 
 # Singleton instances
 ollama_config = OllamaConfig()
+retry_config = RetryConfig()
+failover_config = FailoverConfig()
+registry_config = RegistryConfig()
+bench_config = BenchConfig()
+memory_config = MemoryConfig()
+cache_config = CacheConfig()
+context_config = ContextConfig()
+outline_config = OutlineConfig()
+continuity_config = ContinuityConfig()
+structured_config = StructuredConfig()
+stream_config = StreamConfig()
 model_config = ModelConfig()
@@ -1,15 +1,10 @@
 """Main CLI interface untuk Book Writing Agent."""
 
 import typer
-from typing import Optional
+from typing import List, Optional
 from rich.console import Console
 from rich import print as rprint
 
-from .agents.orchestrator import orchestrator
-from .config.settings import model_config
-from .utils.interactive_wizard import interactive_wizard
-from .utils.model_helper import model_helper
-
 app = typer.Typer(
     name="writebook",
     help="AI Agent untuk menulis buku fiksi dan non-fiksi menggunakan Ollama",
@@ -19,14 +14,35 @@ app = typer.Typer(
 console = Console()
 
 
+# Modul agent, client Ollama, dan singleton-nya baru di-import saat command
+# membutuhkannya, sehingga --help, info, dan completion tetap cepat.
+
+def _orchestrator():
+    """BookOrchestrator singleton (import agent stack saat dibutuhkan)."""
+    from .agents.orchestrator import get_orchestrator
+    return get_orchestrator()
+
+
+def _model_helper():
+    """ModelHelper singleton (import client Ollama saat dibutuhkan)."""
+    from .utils.model_helper import get_model_helper
+    return get_model_helper()
+
+
+def _interactive_wizard():
+    """InteractiveWizard singleton."""
+    from .utils.interactive_wizard import get_interactive_wizard
+    return get_interactive_wizard()
+
+
 @app.command("create")
 def create_book(
-    topic: str = typer.Argument(..., help="Topik atau judul buku"),
-    book_type: str = typer.Option(
-        "fiction",
+    topic: Optional[str] = typer.Argument(None, help="Topik atau judul buku"),
+    book_type: Optional[str] = typer.Option(
+        None,
         "--type",
         "-t",
-        help="Tipe buku: fiction atau non_fiction"
+        help="Tipe buku: fiction atau non_fiction (default: fiction, atau ditebak dari --from-outline)"
     ),
     chapters: int = typer.Option(
         10,
@@ -68,11 +84,34 @@ def create_book(
         "-l",
         help="Bahasa penulisan: indonesian atau english"
     ),
+    parallel: int = typer.Option(
+        1,
+        "--parallel",
+        "-p",
+        min=1,
+        help="Jumlah chapter yang ditulis bersamaan (sesuaikan dengan OLLAMA_NUM_PARALLEL)"
+    ),
+    pipeline: bool = typer.Option(
+        False,
+        "--pipeline",
+        help="Review chapter sebelumnya sambil menulis chapter berikutnya"
+    ),
+    schedule: str = typer.Option(
+        "chapter",
+        "--schedule",
+        help="chapter (tulis→review per chapter) atau by-model (kelompokkan call per model)"
+    ),
     additional_info: Optional[str] = typer.Option(
         None,
         "--info",
         "-i",
         help="Informasi tambahan tentang buku"
+    ),
+    from_outline: Optional[str] = typer.Option(
+        None,
+        "--from-outline",
+        "-o",
+        help="Tulis dari outline JSON (atau directory buku) hasil 'writebook outline', tanpa planning"
     )
 ):
     """
@@ -82,24 +121,92 @@ def create_book(
         writebook create "Petualangan di Dunia Fantasi" --type fiction --chapters 12
 
         writebook create "Panduan Python untuk Pemula" --type non_fiction --chapters 15 --min-words 2000
+
+        writebook create "Saga Nusantara" --chapters 20 --parallel 4
+
+        writebook create --from-outline output/Misteri_di_Kota_Tua_20250101_120000/00_outline.json
     """
+    if topic is None and from_outline is None:
+        console.print("[red]Error: isi topik buku atau --from-outline[/red]")
+        raise typer.Exit(1)
+
     # Validasi book type
-    if book_type not in ["fiction", "non_fiction"]:
+    if book_type is not None and book_type not in ["fiction", "non_fiction"]:
         console.print("[red]Error: book_type harus 'fiction' atau 'non_fiction'[/red]")
         raise typer.Exit(1)
 
+    if schedule not in ["chapter", "by-model"]:
+        console.print("[red]Error: schedule harus 'chapter' atau 'by-model'[/red]")
+        raise typer.Exit(1)
+
+    options = dict(
+        additional_info=additional_info or "",
+        min_words_per_chapter=min_words,
+        enable_review=enable_review,
+        auto_revise=auto_revise,
+        enable_streaming=enable_streaming,
+        language=language,
+        parallel=parallel,
+        pipeline=pipeline,
+        schedule=schedule
+    )
     try:
-        result = orchestrator.create_book(
-            topic=topic,
-            book_type=book_type,
-            num_chapters=chapters,
-            target_audience=audience,
-            additional_info=additional_info or "",
-            min_words_per_chapter=min_words,
-            enable_review=enable_review,
-            auto_revise=auto_revise,
+        if from_outline:
+            # Judul, jumlah chapter, dan audience dibaca dari outline
+            result = _orchestrator().create_book_from_outline(
+                from_outline, book_type=book_type, topic=topic, **options
+            )
+        else:
+            result = _orchestrator().create_book(
+                topic=topic,
+                book_type=book_type or "fiction",
+                num_chapters=chapters,
+                target_audience=audience,
+                **options
+            )
+
+        if result['success']:
+            console.print("\n[bold green]Sukses![/bold green]")
+            console.print(f"Buku tersimpan di: [cyan]{result['book_dir']}[/cyan]")
+            console.print(f"File lengkap: [cyan]{result['full_book_path']}[/cyan]")
+        else:
+            console.print("[red]Gagal membuat buku.[/red]")
+            raise typer.Exit(1)
+
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
+
+@app.command("resume")
+def resume_book(
+    book_dir: str = typer.Argument(..., help="Directory buku yang akan dilanjutkan"),
+    enable_streaming: Optional[bool] = typer.Option(
+        None,
+        "--stream/--no-stream",
+        help="Override setting streaming dari run sebelumnya"
+    ),
+    parallel: Optional[int] = typer.Option(
+        None,
+        "--parallel",
+        "-p",
+        min=1,
+        help="Override jumlah chapter yang ditulis bersamaan"
+    )
+):
+    """
+    Lanjutkan penulisan buku yang terhenti (crash, Ctrl-C, Ollama restart).
+
+    Outline dan setting dibaca dari job.json; chapter yang sudah selesai dilewati.
+
+    Contoh:
+        writebook resume output/Petualangan_di_Dunia_Fantasi_20250101_120000
+    """
+    try:
+        result = _orchestrator().resume_book(
+            book_dir=book_dir,
             enable_streaming=enable_streaming,
-            language=language
+            parallel=parallel
         )
 
         if result['success']:
@@ -107,9 +214,12 @@ def create_book(
             console.print(f"Buku tersimpan di: [cyan]{result['book_dir']}[/cyan]")
             console.print(f"File lengkap: [cyan]{result['full_book_path']}[/cyan]")
         else:
-            console.print("[red]Gagal membuat buku.[/red]")
+            console.print("[red]Gagal melanjutkan buku.[/red]")
             raise typer.Exit(1)
 
+    except FileNotFoundError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
         raise typer.Exit(1)
@@ -154,7 +264,7 @@ def create_outline(
         raise typer.Exit(1)
 
     try:
-        result = orchestrator.create_outline_only(
+        result = _orchestrator().create_outline_only(
             topic=topic,
             book_type=book_type,
             num_chapters=chapters,
@@ -165,6 +275,10 @@ def create_outline(
         if result['success']:
             console.print("\n[bold green]Outline berhasil dibuat![/bold green]")
             console.print(f"Tersimpan di: [cyan]{result['outline_path']}[/cyan]")
+            console.print(
+                f"Tulis bukunya: [cyan]writebook create --from-outline "
+                f"{result['outline_json_path']}[/cyan]"
+            )
         else:
             console.print("[red]Gagal membuat outline.[/red]")
             raise typer.Exit(1)
@@ -202,14 +316,16 @@ def show_models(
         writebook models --recommended
     """
     if show_available:
-        model_helper.list_all_models_with_info()
+        _model_helper().list_all_models_with_info()
         return
     
     if show_recommended:
         console.print("\n[bold cyan]Model yang Direkomendasikan:[/bold cyan]")
-        model_helper.show_recommended_models()
+        _model_helper().show_recommended_models()
         return
     
+    from .config.settings import model_config
+
     # Default: tampilkan konfigurasi saat ini
     console.print("\n[bold]Model Configuration (Current):[/bold]\n")
     console.print(f"Main Model (Planner): [cyan]{model_config.main_model}[/cyan]")
@@ -261,7 +377,7 @@ def add_model(
         writebook add-model deepseek-v3.1:671b-cloud --role writer --size "~400GB" --speed "Very Slow" --quality Exceptional
     """
     try:
-        success = model_helper.add_custom_model(
+        success = _model_helper().add_custom_model(
             model_name=model_name,
             role=role,
             size=size,
@@ -302,7 +418,7 @@ def select_model_command(
             console.print("[red]Error: Role harus 'planner', 'writer', atau 'reviewer'[/red]")
             raise typer.Exit(1)
         
-        selected = model_helper.select_model_interactive(role)
+        selected = _model_helper().select_model_interactive(role)
         
         if selected:
             console.print(f"\n[bold green]Model terpilih untuk {role}: {selected}[/bold green]")
@@ -318,6 +434,172 @@ def select_model_command(
         raise typer.Exit(1)
 
 
+@app.command("bench-models")
+def bench_models_command(
+    models: Optional[List[str]] = typer.Argument(
+        None, help="Model yang diukur (default: semua model lokal yang terinstall)"
+    ),
+    role: Optional[List[str]] = typer.Option(
+        None, "--role", "-r", help="Prompt role yang dijalankan (planner/writer/reviewer, bisa berulang)"
+    ),
+    num_predict: Optional[int] = typer.Option(
+        None, "--num-predict", help="Token output per prompt (default dari BenchConfig)"
+    ),
+    include_cloud: bool = typer.Option(
+        False, "--include-cloud", help="Ikutkan model cloud (tidak memakai memori lokal)"
+    )
+):
+    """
+    Ukur cold load, TTFT, token/detik, dan peak memory setiap model.
+
+    Setiap model di-unload dulu lalu menjalankan prompt standar per role.
+    Hasil disimpan di ~/.cache/agentwritebook/benchmarks.json dan tampil
+    di `writebook models --recommended`.
+
+    Contoh:
+        writebook bench-models
+        writebook bench-models qwen2.5:3b gemma3:latest --role writer
+    """
+    from rich.table import Table
+    from .config.settings import bench_config
+    from .utils.model_bench import BENCH_PROMPTS, ModelBenchmark
+    from .utils.model_registry import format_size
+
+    roles = role or list(BENCH_PROMPTS)
+    invalid = [r for r in roles if r not in BENCH_PROMPTS]
+    if invalid:
+        console.print(f"[red]Error: Role tidak dikenal: {', '.join(invalid)}[/red]")
+        raise typer.Exit(1)
+    if num_predict:
+        bench_config.num_predict = num_predict
+
+    helper = _model_helper()
+    if not models:
+        models = []
+        for name in helper.get_available_models():
+            info = helper.registry.get(name) or {}
+            if "cloud" in info.get('size_label', '') and not include_cloud:
+                continue
+            if info.get('capabilities') and "completion" not in info['capabilities']:
+                # Model embedding tidak bisa chat
+                continue
+            models.append(name)
+    if not models:
+        console.print("[yellow]Tidak ada model untuk di-benchmark.[/yellow]")
+        raise typer.Exit(1)
+
+    console.print(f"\n[bold]Benchmark {len(models)} model[/bold] [dim](role: {', '.join(roles)})[/dim]\n")
+
+    def report(model, result, error):
+        if error is not None:
+            console.print(f"[red]✗[/red] {model}: {error}")
+        else:
+            console.print(
+                f"[green]✓[/green] {model}: {result['tokens_per_sec']} tok/s, "
+                f"TTFT {result['ttft']}s, load {result['cold_load_time']}s"
+            )
+
+    with console.status("[cyan]Menjalankan benchmark...[/cyan]"):
+        results = ModelBenchmark(helper.client).run(models, roles, on_result=report)
+
+    if not results:
+        raise typer.Exit(1)
+
+    table = Table(show_header=True, header_style="bold cyan")
+    table.add_column("Model", style="green")
+    table.add_column("Cold Load (s)", justify="right")
+    table.add_column("TTFT (s)", justify="right")
+    table.add_column("Prompt tok/s", justify="right")
+    table.add_column("Gen tok/s", justify="right")
+    table.add_column("Peak Memory", justify="right")
+    for name, result in sorted(results.items(), key=lambda item: -item[1]['tokens_per_sec']):
+        table.add_row(
+            name,
+            f"{result['cold_load_time']:.2f}",
+            f"{result['ttft']:.2f}",
+            f"{result['prompt_tokens_per_sec']:.0f}",
+            f"{result['tokens_per_sec']:.1f}",
+            format_size(result['peak_memory'])
+        )
+    console.print()
+    console.print(table)
+
+
+@app.command("cache")
+def cache_command(
+    clear: bool = typer.Option(
+        False,
+        "--clear",
+        help="Hapus semua respons yang tersimpan di cache"
+    )
+):
+    """
+    Tampilkan statistik response cache atau kosongkan cache.
+
+    Contoh:
+        writebook cache
+        writebook cache --clear
+    """
+    from .utils.response_cache import response_cache
+
+    if clear:
+        removed = response_cache.clear()
+        console.print(f"[green]✓[/green] {removed} entry dihapus dari cache")
+        return
+
+    stats = response_cache.stats()
+    console.print("\n[bold]Response Cache:[/bold]\n")
+    console.print(f"Lokasi: [cyan]{stats['path']}[/cyan]")
+    console.print(f"Entries: [cyan]{stats['entries']}[/cyan] ({stats['size_mb']} MB)")
+
+
+@app.command("mock-server")
+def mock_server_command(
+    port: int = typer.Option(11435, "--port", help="Port server"),
+    host: str = typer.Option("127.0.0.1", "--host", help="Host/interface"),
+    ttft: float = typer.Option(0.05, "--ttft", help="Detik sebelum token pertama"),
+    tokens_per_sec: float = typer.Option(200.0, "--tps", help="Token per detik (0 = instan)"),
+    load_time: float = typer.Option(0.0, "--load-time", help="Simulasi load model saat model berganti"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Probabilitas request gagal (0.0-1.0)"),
+    stall_rate: float = typer.Option(0.0, "--stall-rate", help="Probabilitas stream macet di tengah jalan (0.0-1.0)"),
+    stall_time: float = typer.Option(30.0, "--stall-time", help="Lama stream macet (detik)"),
+    review_score: float = typer.Option(8.0, "--review-score", help="Score yang dikembalikan reviewer"),
+    structured_error_rate: float = typer.Option(
+        0.0, "--structured-error-rate",
+        help="Probabilitas output JSON schema terpotong (uji repair, 0.0-1.0)"
+    )
+):
+    """
+    Jalankan mock Ollama server untuk benchmark dan test offline.
+
+    Contoh:
+        writebook mock-server --port 11435 --tps 50 --ttft 0.5
+
+        AGENTWRITEBOOK_OLLAMA_URL=http://127.0.0.1:11435 writebook create "Uji" --chapters 3
+    """
+    from .utils.mock_server import MockOllamaServer, MockServerConfig
+
+    server = MockOllamaServer(MockServerConfig(
+        host=host,
+        port=port,
+        ttft=ttft,
+        tokens_per_sec=tokens_per_sec,
+        load_time=load_time,
+        error_rate=error_rate,
+        stall_rate=stall_rate,
+        stall_time=stall_time,
+        review_score=review_score,
+        structured_error_rate=structured_error_rate
+    ))
+
+    console.print(f"[green]✓[/green] Mock Ollama server berjalan di [cyan]http://{host}:{port}[/cyan]")
+    console.print("[dim]Tekan Ctrl-C untuk berhenti[/dim]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Server dihentikan[/yellow]")
+
+
 @app.command("interactive")
 def interactive_mode():
     """
@@ -336,14 +618,14 @@ def interactive_mode():
     
     try:
         # Jalankan wizard
-        config = interactive_wizard.run()
+        config = _interactive_wizard().run()
         
         if not config:
             console.print("[yellow]Proses dibatalkan.[/yellow]")
             return
         
         # Jalankan pembuatan buku dengan config dari wizard
-        result = orchestrator.create_book(
+        result = _orchestrator().create_book(
             topic=config['topic'],
             book_type=config['book_type'],
             num_chapters=config['num_chapters'],
@@ -400,8 +682,11 @@ AI Agent untuk menulis buku fiksi dan non-fiksi menggunakan Ollama.
 [bold]Commands:[/bold]
 • interactive - Mode interaktif dengan wizard (RECOMMENDED)
 • create      - Buat buku lengkap
+• resume      - Lanjutkan buku yang terhenti
 • outline     - Buat outline saja
 • models      - Lihat konfigurasi model
+• bench-models - Ukur kecepatan dan memori model
+• cache       - Statistik / hapus response cache
 • info        - Tampilkan info ini
 
 [bold]Contoh Penggunaan:[/bold]
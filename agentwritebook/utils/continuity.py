@@ -0,0 +1,241 @@
+"""Memori kontinuitas: ringkasan bergulir dari chapter yang sudah ditulis."""
+
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..config.settings import context_config, continuity_config
+from .token_budget import estimate_tokens
+
+# (number, title, summary) chapter yang sudah ditulis
+ChapterSummary = Tuple[int, str, str]
+
+# compress(digest, summaries, max_words) -> digest baru
+CompressFn = Callable[[str, List[ChapterSummary], int], str]
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Potong teks agar perkiraan tokennya tidak melebihi max_tokens.
+
+    Dipotong di batas kalimat/kata terakhir yang muat, lalu diberi "...".
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max(0, int(max_tokens * context_config.chars_per_token) - 3)
+    cut = text[:limit]
+    end = max(cut.rfind(". "), cut.rfind("\n"))
+    if end < limit // 2:
+        end = cut.rfind(" ")
+    return (cut[:end + 1] if end > 0 else cut).rstrip() + "..."
+
+
+class ContinuityMemory:
+    """
+    Ringkasan buku sejauh ini dengan ukuran prompt yang dibatasi.
+
+    Dua tingkat: ringkasan `recent_chapters` chapter terakhir disimpan
+    utuh, sedangkan chapter yang lebih lama dilipat (compress) menjadi
+    satu digest "cerita sejauh ini". Hasil render() tidak pernah melebihi
+    `budget_tokens`, sehingga biaya prompt-eval writer tetap datar
+    berapa pun jumlah chapter buku.
+
+    Aman dipakai dari beberapa thread (mode parallel/pipeline): chapter
+    yang selesai tidak berurutan tetap disusun menurut nomor. Digest
+    selalu mencakup prefix berurutan 1..digest_through; chapter setelah
+    celah (chapter sebelumnya belum selesai) tetap disimpan utuh sampai
+    celahnya terisi. Hanya satu thread yang melipat digest pada satu waktu.
+
+    render(before=N) tidak pernah menyertakan chapter >= N: jika digest
+    terbaru sudah mencakup N (revisi atau chapter yang selesai lebih dulu),
+    dipakai digest lama yang masih sebelum N (`recent_chapters` digest
+    terakhir disimpan), atau tanpa digest jika tidak ada.
+    """
+
+    def __init__(
+        self,
+        compress: CompressFn,
+        budget_tokens: Optional[int] = None,
+        recent_chapters: Optional[int] = None,
+        state: Optional[Dict] = None
+    ):
+        """
+        Initialize memori.
+
+        Args:
+            compress: Fungsi yang melipat digest + ringkasan chapter menjadi
+                digest baru (lihat SummarizerAgent.compress)
+            budget_tokens: Batas token hasil render (default dari ContinuityConfig)
+            recent_chapters: Jumlah ringkasan chapter terakhir yang disimpan utuh
+            state: Hasil to_dict() dari run sebelumnya (resume)
+        """
+        self.compress = compress
+        self.budget_tokens = budget_tokens or continuity_config.budget_tokens
+        self.recent_chapters = max(1, recent_chapters or continuity_config.recent_chapters)
+        self.digest = ""
+        self.digest_through = 0  # Chapter terakhir yang sudah masuk digest
+        self.summaries: Dict[int, Tuple[str, str]] = {}
+        # digest_through -> digest saat itu, untuk render chapter sebelum digest terbaru
+        self.snapshots: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._fold_lock = threading.Lock()
+        if state:
+            self.digest = state.get("digest", "")
+            self.digest_through = state.get("digest_through", 0)
+            self.summaries = {
+                int(number): (item["title"], item["summary"])
+                for number, item in state.get("summaries", {}).items()
+            }
+            self.snapshots = {
+                int(through): digest for through, digest in state.get("snapshots", {}).items()
+            }
+            if self.digest:
+                self.snapshots[self.digest_through] = self.digest
+
+    @property
+    def summary_tokens(self) -> int:
+        """Perkiraan token satu ringkasan chapter."""
+        return math.ceil(continuity_config.summary_words * context_config.tokens_per_word)
+
+    @property
+    def digest_tokens(self) -> int:
+        """Batas token digest: sisa budget setelah ringkasan chapter terakhir."""
+        return max(
+            self.summary_tokens,
+            self.budget_tokens - self.recent_chapters * self.summary_tokens
+        )
+
+    def record(self, number: int, title: str, summary: str):
+        """
+        Simpan ringkasan chapter (menimpa ringkasan lama, misal setelah revisi).
+
+        Ringkasan chapter lama dilipat ke digest jika jumlahnya melebihi
+        `recent_chapters` atau render melebihi budget.
+        """
+        with self._lock:
+            if number <= self.digest_through:
+                # Chapter sudah ada di digest (revisi setelah dilipat);
+                # prefix selalu berurutan sehingga tidak ada chapter yang hilang
+                return
+            # Ringkasan yang kepanjangan dipotong agar tidak menghabiskan budget
+            self.summaries[number] = (
+                title, truncate_to_tokens(summary.strip(), 2 * self.summary_tokens)
+            )
+        self._fold()
+
+    def _fold(self):
+        """Lipat ringkasan tertua ke digest sampai jumlah dan ukurannya di bawah batas."""
+        # Thread lain yang sedang melipat akan melanjutkan sampai di bawah batas
+        if not self._fold_lock.acquire(blocking=False):
+            return
+        try:
+            while True:
+                with self._lock:
+                    excess = len(self.summaries) - self.recent_chapters
+                    if excess <= 0 and estimate_tokens(self._render(None)) <= self.budget_tokens:
+                        return
+                    # Hanya prefix berurutan setelah digest yang boleh dilipat
+                    prefix = []
+                    while self.digest_through + len(prefix) + 1 in self.summaries:
+                        prefix.append(self.digest_through + len(prefix) + 1)
+                    if not prefix:
+                        # Menunggu chapter yang belum selesai; render() tetap dibatasi budget
+                        return
+                    folded = [(n, *self.summaries[n]) for n in prefix[:max(1, excess)]]
+                    digest = self.digest
+                try:
+                    new_digest = self.compress(
+                        digest, folded, int(self.digest_tokens / context_config.tokens_per_word)
+                    )
+                except Exception:
+                    # Summarizer gagal: ringkasan lama tetap digabung apa adanya
+                    new_digest = "\n".join([digest] + [s for _, _, s in folded]).strip()
+                with self._lock:
+                    self.digest = truncate_to_tokens(new_digest.strip(), self.digest_tokens)
+                    self.digest_through = folded[-1][0]
+                    for n, _, _ in folded:
+                        self.summaries.pop(n, None)
+                    self.snapshots[self.digest_through] = self.digest
+                    for through in sorted(self.snapshots)[:-self.recent_chapters]:
+                        del self.snapshots[through]
+        finally:
+            self._fold_lock.release()
+
+    def render(self, before: Optional[int] = None) -> str:
+        """
+        Ringkasan buku sejauh ini untuk prompt writer.
+
+        Jika melebihi `budget_tokens`, digest yang dipotong lebih dulu;
+        ringkasan chapter terbaru (paling relevan) dipertahankan.
+
+        Args:
+            before: Nomor chapter yang akan ditulis; hanya chapter sebelumnya
+                yang disertakan
+
+        Returns:
+            Teks ringkasan (maksimal `budget_tokens`), kosong jika belum ada
+        """
+        with self._lock:
+            digest, recent = self._sections(before)
+
+        kept: List[str] = []
+        for section in reversed(recent):
+            if estimate_tokens("\n\n".join([section] + kept)) > self.budget_tokens:
+                break
+            kept.insert(0, section)
+        if not kept and recent:
+            # Satu ringkasan saja sudah melebihi budget
+            return truncate_to_tokens(recent[-1], self.budget_tokens)
+
+        if digest:
+            through, text = digest
+            header = f"Chapter 1-{through}:\n"
+            used = estimate_tokens("\n\n".join(kept)) + 1 if kept else 0
+            room = self.budget_tokens - used - estimate_tokens(header)
+            if room > 0:
+                kept.insert(0, header + truncate_to_tokens(text, room))
+        return truncate_to_tokens("\n\n".join(kept), self.budget_tokens)
+
+    def _render(self, before: Optional[int]) -> str:
+        """Render tanpa lock dan tanpa batas token."""
+        digest, recent = self._sections(before)
+        if digest:
+            recent = [f"Chapter 1-{digest[0]}:\n{digest[1]}"] + recent
+        return "\n\n".join(recent)
+
+    def _sections(self, before: Optional[int]) -> Tuple[Optional[Tuple[int, str]], List[str]]:
+        """
+        Digest (through, teks) yang hanya mencakup chapter < before, dan
+        ringkasan chapter < before yang belum dilipat (berurutan).
+        """
+        digest = None
+        if before is None or self.digest_through < before:
+            if self.digest:
+                digest = (self.digest_through, self.digest)
+        else:
+            earlier = [through for through in self.snapshots if through < before]
+            if earlier:
+                through = max(earlier)
+                digest = (through, self.snapshots[through])
+
+        recent = [
+            f"Chapter {number} ({title}):\n{summary}"
+            for number, (title, summary) in sorted(self.summaries.items())
+            if before is None or number < before
+        ]
+        return digest, recent
+
+    def to_dict(self) -> Dict:
+        """State untuk disimpan di journal (lihat JobJournal.save_continuity)."""
+        with self._lock:
+            return {
+                "digest": self.digest,
+                "digest_through": self.digest_through,
+                "summaries": {
+                    str(number): {"title": title, "summary": summary}
+                    for number, (title, summary) in sorted(self.summaries.items())
+                },
+                "snapshots": {
+                    str(through): digest for through, digest in sorted(self.snapshots.items())
+                }
+            }
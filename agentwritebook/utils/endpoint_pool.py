@@ -0,0 +1,221 @@
+"""Routing request ke beberapa server Ollama."""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set
+
+import httpx
+
+from ..config.settings import ollama_config
+from .lazy import lazy_singleton
+from .retry import retry_manager
+
+
+class Endpoint:
+    """State routing untuk satu server Ollama."""
+
+    def __init__(self, url: str):
+        """
+        Initialize endpoint.
+
+        Args:
+            url: Base URL server
+        """
+        self.url = url
+        self.outstanding = 0
+        self.healthy = True
+        self.models: Optional[Set[str]] = None  # None = inventory belum diketahui
+        self.loaded: Set[str] = set()
+        self.last_check = 0.0
+
+    def has_model(self, model: str) -> bool:
+        """Apakah model tersedia di server ini (True jika inventory belum diketahui)."""
+        return self.models is None or model in self.models
+
+    def to_dict(self) -> Dict:
+        """Snapshot state untuk ditampilkan."""
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "models": sorted(self.models) if self.models is not None else None,
+            "loaded": sorted(self.loaded),
+        }
+
+
+class EndpointPool:
+    """
+    Pool server Ollama dengan health check dan routing per model.
+
+    Setiap endpoint punya inventory model (/api/tags) dan daftar model yang
+    sedang di-load (/api/ps), di-refresh di background setiap
+    health_interval. Request dikirim ke endpoint sehat yang punya model,
+    dengan prioritas:
+
+    1. model affinity: endpoint yang sudah me-load model (selama request
+       aktifnya < affinity_max_outstanding), agar tidak ada load ulang
+    2. least outstanding requests
+    """
+
+    def __init__(self, urls: List[str], health_interval: Optional[float] = None):
+        """
+        Initialize pool.
+
+        Args:
+            urls: Base URL setiap server
+            health_interval: Interval health check (default dari config, 0 = mati)
+        """
+        self.endpoints = [Endpoint(url.rstrip("/")) for url in urls]
+        self.health_interval = (
+            ollama_config.health_interval if health_interval is None else health_interval
+        )
+        self._lock = threading.Lock()
+        self._health_thread = None
+
+    @property
+    def urls(self) -> List[str]:
+        """Base URL semua endpoint."""
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def _get(self, url: str) -> Endpoint:
+        for endpoint in self.endpoints:
+            if endpoint.url == url:
+                return endpoint
+        raise KeyError(url)
+
+    def select(self, model: str) -> str:
+        """
+        Pilih endpoint untuk request ke model.
+
+        Args:
+            model: Nama model
+
+        Returns:
+            Base URL endpoint
+        """
+        if len(self.endpoints) == 1:
+            return self.endpoints[0].url
+
+        self._ensure_health_checks()
+        with self._lock:
+            candidates = [
+                e for e in self.endpoints
+                if e.healthy and e.has_model(model)
+                and retry_manager.breaker(e.url, model).available()
+            ]
+            if not candidates:
+                # Semua endpoint bermasalah: pilih yang punya model, biarkan
+                # retry/circuit breaker yang menentukan gagal atau menunggu
+                candidates = [e for e in self.endpoints if e.has_model(model)] or self.endpoints
+
+            def score(endpoint: Endpoint):
+                affinity = (
+                    model in endpoint.loaded
+                    and endpoint.outstanding < ollama_config.affinity_max_outstanding
+                )
+                return (0 if affinity else 1, endpoint.outstanding)
+
+            return min(candidates, key=score).url
+
+    @contextmanager
+    def track(self, url: str, model: str):
+        """
+        Hitung request aktif di endpoint selama blok berjalan.
+
+        Jika request berhasil, model dicatat sebagai loaded di endpoint
+        tersebut (untuk model affinity).
+        """
+        endpoint = self._get(url)
+        with self._lock:
+            endpoint.outstanding += 1
+        try:
+            yield
+            with self._lock:
+                endpoint.loaded.add(model)
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+
+    def loaded_on(self, model: str) -> List[str]:
+        """Endpoint yang sedang me-load model."""
+        with self._lock:
+            return [e.url for e in self.endpoints if model in e.loaded]
+
+    def mark_unhealthy(self, url: str):
+        """Tandai endpoint tidak sehat sampai health check berikutnya berhasil."""
+        with self._lock:
+            self._get(url).healthy = False
+
+    def mark_unloaded(self, url: str, model: str):
+        """Catat bahwa model sudah di-unload dari endpoint."""
+        with self._lock:
+            self._get(url).loaded.discard(model)
+
+    def refresh(self, endpoint: Endpoint):
+        """Health check satu endpoint: ambil /api/tags dan /api/ps."""
+        try:
+            with httpx.Client(base_url=endpoint.url, timeout=ollama_config.connect_timeout) as http:
+                tags = http.get("/api/tags")
+                tags.raise_for_status()
+                models = {m.get("model") or m.get("name") for m in tags.json().get("models", [])}
+                loaded = None
+                ps = http.get("/api/ps")
+                if ps.status_code == 200:
+                    loaded = {m.get("model") or m.get("name") for m in ps.json().get("models", [])}
+        except (httpx.HTTPError, ValueError):
+            with self._lock:
+                endpoint.healthy = False
+                endpoint.last_check = time.monotonic()
+            return
+
+        with self._lock:
+            endpoint.healthy = True
+            endpoint.models = models
+            if loaded is not None:
+                endpoint.loaded = loaded
+            endpoint.last_check = time.monotonic()
+
+    def refresh_all(self):
+        """Health check semua endpoint secara paralel."""
+        threads = [
+            threading.Thread(target=self.refresh, args=(endpoint,), daemon=True)
+            for endpoint in self.endpoints
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _ensure_health_checks(self):
+        """
+        Mulai thread health check (sekali).
+
+        Tidak memblokir: sampai health check pertama selesai, inventory
+        dianggap belum diketahui dan routing memakai least outstanding.
+        """
+        if self._health_thread is not None:
+            return
+        with self._lock:
+            if self._health_thread is not None:
+                return
+            self._health_thread = threading.Thread(
+                target=self._health_loop, name="ollama-health", daemon=True
+            )
+            self._health_thread.start()
+
+    def _health_loop(self):
+        while True:
+            self.refresh_all()
+            if not self.health_interval:
+                return
+            time.sleep(self.health_interval)
+
+    def status(self) -> List[Dict]:
+        """State semua endpoint."""
+        with self._lock:
+            return [endpoint.to_dict() for endpoint in self.endpoints]
+
+
+# Singleton instance (lazy) untuk endpoint dari config
+get_endpoint_pool = lazy_singleton(lambda: EndpointPool(ollama_config.endpoint_urls()))
@@ -0,0 +1,137 @@
+"""Exception untuk kegagalan call ke Ollama."""
+
+from typing import Optional
+
+import httpx
+
+
+class OllamaCallError(Exception):
+    """
+    Base class untuk error call ke Ollama yang sudah diklasifikasi.
+
+    Attributes:
+        model: Model yang dipanggil
+        kind: Jenis error (connection, server, loading, rate_limit, request, ...)
+        retryable: Apakah call layak diulang setelah backoff
+    """
+
+    kind = "unknown"
+    retryable = False
+
+    def __init__(self, model: str, message: str):
+        self.model = model
+        super().__init__(message)
+
+
+class OllamaConnectionError(OllamaCallError):
+    """Server tidak bisa dihubungi (connection refused/reset, Ollama restart)."""
+
+    kind = "connection"
+    retryable = True
+
+
+class OllamaServerError(OllamaCallError):
+    """Server mengembalikan status 5xx."""
+
+    kind = "server"
+    retryable = True
+
+
+class OllamaModelLoadingError(OllamaCallError):
+    """Model masih di-load atau server sedang sibuk (503)."""
+
+    kind = "loading"
+    retryable = True
+
+
+class OllamaRateLimitError(OllamaCallError):
+    """Rate limit (429), biasanya dari model cloud."""
+
+    kind = "rate_limit"
+    retryable = True
+
+
+class OllamaRequestError(OllamaCallError):
+    """Request ditolak (4xx, misal model tidak ada); tidak diulang."""
+
+    kind = "request"
+
+
+class CircuitOpenError(OllamaCallError):
+    """
+    Circuit breaker untuk model/host sedang terbuka; call langsung gagal.
+
+    Attributes:
+        retry_after: Detik sampai breaker mengizinkan call percobaan
+    """
+
+    kind = "circuit_open"
+
+    def __init__(self, model: str, host: str, retry_after: float):
+        self.host = host
+        self.retry_after = retry_after
+        super().__init__(
+            model,
+            f"Circuit breaker terbuka untuk {model} @ {host}; coba lagi dalam {retry_after:.0f} detik"
+        )
+
+
+class OllamaTimeoutError(OllamaCallError, TimeoutError):
+    """
+    Call ke Ollama melewati batas waktu.
+
+    Attributes:
+        kind: "deadline" (total durasi call) atau "stall" (tidak ada chunk
+            baru selama stall_timeout saat streaming)
+        timeout: Batas waktu yang terlewati (detik)
+    """
+
+    def __init__(self, model: str, kind: str, timeout: float, detail: Optional[str] = None):
+        self.kind = kind
+        self.timeout = timeout
+        if kind == "stall":
+            message = f"Stream {model} macet: tidak ada token selama {timeout:g} detik"
+        elif not timeout:
+            message = f"Call {model} timeout"
+        else:
+            message = f"Call {model} melewati batas waktu {timeout:g} detik"
+        if detail:
+            message += f" ({detail})"
+        super().__init__(model, message)
+
+
+def classify_error(error: BaseException, model: str) -> BaseException:
+    """
+    Ubah exception dari ollama/httpx menjadi OllamaCallError yang sesuai.
+
+    Args:
+        error: Exception asli
+        model: Model yang dipanggil
+
+    Returns:
+        OllamaCallError (atau exception asli jika tidak dikenali)
+    """
+    if isinstance(error, OllamaCallError):
+        return error
+
+    # Import lokal: ollama cukup berat dan hanya dibutuhkan saat ada error
+    from ollama import ResponseError
+
+    if isinstance(error, ResponseError):
+        status = error.status_code
+        message = str(error)
+        if status == 429:
+            return OllamaRateLimitError(model, message)
+        if status == 503 or "loading model" in message.lower():
+            return OllamaModelLoadingError(model, message)
+        if status >= 500 or status == -1:
+            # -1: error yang dikirim di tengah stream
+            return OllamaServerError(model, message)
+        return OllamaRequestError(model, message)
+
+    if isinstance(error, (ConnectionError, httpx.TransportError)):
+        if isinstance(error, httpx.TimeoutException):
+            return OllamaTimeoutError(model, "deadline", 0, detail=str(error) or type(error).__name__)
+        return OllamaConnectionError(model, str(error) or type(error).__name__)
+
+    return error
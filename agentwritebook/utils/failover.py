@@ -0,0 +1,247 @@
+"""Failover ke model cadangan per role dengan health tracking per model."""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from rich.console import Console
+
+from ..config.settings import failover_config, model_config
+from .errors import OllamaCallError
+
+console = Console()
+
+
+class ModelHealth:
+    """Status satu model: kegagalan beruntun dan kapan boleh dicoba lagi."""
+
+    def __init__(self):
+        """Initialize status sehat."""
+        self.failures = 0
+        self.down_until = 0.0
+        self.last_error = ""
+        self.calls = 0
+
+    def available(self, now: float) -> bool:
+        """Apakah model boleh dipakai (sehat, atau cooldown sudah lewat)."""
+        return now >= self.down_until
+
+
+class ModelFailover:
+    """
+    Jalankan call dengan model utama role, lalu model cadangan jika gagal.
+
+    Chain per role: model agent, model dari FailoverConfig.chains, lalu
+    (opsional) ModelHelper.suggest_alternative. Model yang gagal setelah
+    retry transport habis ditandai down selama cooldown (berlipat setiap
+    gagal beruntun) dan dilewati; setelah cooldown lewat, call berikutnya
+    mencoba model itu lagi lebih dulu (recovery probe). Jika berhasil,
+    model kembali dipakai seperti biasa.
+    """
+
+    def __init__(self):
+        """Initialize tanpa riwayat."""
+        self._health: Dict[str, ModelHealth] = {}
+        self._suggested: Dict[Tuple[str, str], Optional[str]] = {}
+        self._lock = threading.Lock()
+        self.switches: List[Dict] = []
+
+    def reset_metrics(self):
+        """Mulai pencatatan switch baru (health model tetap diingat)."""
+        with self._lock:
+            self.switches = []
+            for health in self._health.values():
+                health.calls = 0
+
+    def _get(self, model: str) -> ModelHealth:
+        with self._lock:
+            return self._health.setdefault(model, ModelHealth())
+
+    def chain(self, role: str, primary: str) -> List[str]:
+        """
+        Urutan model untuk role (tanpa duplikat).
+
+        Args:
+            role: Key AgentRole (planner/writer/reviewer)
+            primary: Model yang dikonfigurasi untuk agent
+
+        Returns:
+            List model, dimulai dari primary
+        """
+        models = [primary]
+        for name in failover_config.chains.get(role, []):
+            model = getattr(model_config, name, name) if name.endswith("_model") else name
+            if model not in models:
+                models.append(model)
+        return models
+
+    def candidates(self, role: str, primary: str) -> List[str]:
+        """
+        Model yang dicoba, berurutan: yang sehat dulu, lalu yang masih cooldown.
+
+        Model yang sedang cooldown tetap dicoba paling akhir (yang paling
+        cepat pulih lebih dulu) agar call tidak gagal tanpa mencoba apa pun.
+        """
+        now = time.monotonic()
+        models = self.chain(role, primary)
+        healthy = [m for m in models if self._get(m).available(now)]
+        down = sorted(
+            (m for m in models if m not in healthy),
+            key=lambda m: self._get(m).down_until
+        )
+        return healthy + down
+
+    def _suggestion(self, role: str, primary: str, tried: List[str]) -> Optional[str]:
+        """Model dari ModelHelper.suggest_alternative (dihitung sekali per role/model)."""
+        if not failover_config.suggest_alternatives:
+            return None
+        key = (role, primary)
+        if key not in self._suggested:
+            # Import lokal: model_helper meng-import client Ollama
+            from .model_helper import get_model_helper
+            self._suggested[key] = get_model_helper().suggest_alternative(primary, role)
+        suggestion = self._suggested[key]
+        return suggestion if suggestion and suggestion not in tried else None
+
+    def record_success(self, model: str) -> bool:
+        """
+        Call berhasil: model sehat lagi.
+
+        Returns:
+            True jika model sebelumnya ditandai gagal (baru pulih)
+        """
+        health = self._get(model)
+        with self._lock:
+            recovered = health.failures > 0
+            health.failures = 0
+            health.down_until = 0.0
+            health.calls += 1
+        return recovered
+
+    def record_failure(self, model: str, error: BaseException):
+        """Call gagal: tandai model down selama cooldown."""
+        health = self._get(model)
+        with self._lock:
+            health.failures += 1
+            cooldown = min(
+                failover_config.cooldown * 2 ** (health.failures - 1),
+                failover_config.max_cooldown
+            )
+            health.down_until = time.monotonic() + cooldown
+            health.last_error = str(error)
+
+    def _record_switch(self, role: str, primary: str, model: str, error: Optional[BaseException]):
+        with self._lock:
+            previous = next((e for e in reversed(self.switches) if e["role"] == role), None)
+            self.switches.append({
+                "role": role,
+                "from": primary,
+                "to": model,
+                "error": str(error) if error else None,
+            })
+        if previous is None or previous["to"] != model:
+            console.print(f"[yellow]⚠ {role}: {primary} tidak tersedia, memakai {model}[/yellow]")
+
+    def run(self, role: str, primary: str, fn: Callable[[str], Any]) -> Tuple[Any, str]:
+        """
+        Jalankan fn(model) dengan failover.
+
+        Args:
+            role: Key AgentRole
+            primary: Model utama agent
+            fn: Call ke Ollama untuk satu model
+
+        Returns:
+            (hasil fn, model yang berhasil)
+        """
+        if not failover_config.enabled or not role:
+            return fn(primary), primary
+
+        tried = []
+        models = self.candidates(role, primary)
+        last_error = None
+        while models:
+            model = models.pop(0)
+            tried.append(model)
+            try:
+                result = fn(model)
+            except OllamaCallError as e:
+                self.record_failure(model, e)
+                last_error = e
+                if not models:
+                    suggestion = self._suggestion(role, primary, tried)
+                    if suggestion:
+                        models.append(suggestion)
+                continue
+            recovered = self.record_success(model)
+            if model != primary:
+                self._record_switch(role, primary, model, last_error)
+            elif recovered:
+                console.print(f"[green]✓[/green] {role}: {model} kembali dipakai")
+            return result, model
+        raise last_error
+
+    async def arun(
+        self,
+        role: str,
+        primary: str,
+        fn: Callable[[str], Awaitable[Any]]
+    ) -> Tuple[Any, str]:
+        """Versi async dari run."""
+        if not failover_config.enabled or not role:
+            return await fn(primary), primary
+
+        tried = []
+        models = self.candidates(role, primary)
+        last_error = None
+        while models:
+            model = models.pop(0)
+            tried.append(model)
+            try:
+                result = await fn(model)
+            except OllamaCallError as e:
+                self.record_failure(model, e)
+                last_error = e
+                if not models:
+                    suggestion = await asyncio.to_thread(self._suggestion, role, primary, tried)
+                    if suggestion:
+                        models.append(suggestion)
+                continue
+            recovered = self.record_success(model)
+            if model != primary:
+                self._record_switch(role, primary, model, last_error)
+            elif recovered:
+                console.print(f"[green]✓[/green] {role}: {model} kembali dipakai")
+            return result, model
+        raise last_error
+
+    def summary(self) -> Dict:
+        """
+        Ringkasan switch dan status model.
+
+        Returns:
+            Dictionary {fallback_calls, fallback_by_role, calls_by_model, down, events}
+        """
+        now = time.monotonic()
+        with self._lock:
+            switches = list(self.switches)
+            calls = {m: h.calls for m, h in self._health.items() if h.calls}
+            down = {
+                m: {"retry_in": round(h.down_until - now, 1), "error": h.last_error}
+                for m, h in self._health.items() if h.down_until > now
+            }
+        by_role = {}
+        for switch in switches:
+            by_role[switch["role"]] = by_role.get(switch["role"], 0) + 1
+        return {
+            "fallback_calls": len(switches),
+            "fallback_by_role": by_role,
+            "calls_by_model": calls,
+            "down": down,
+            "events": switches,
+        }
+
+
+# Singleton instance
+model_failover = ModelFailover()
@@ -1,10 +1,18 @@
 """File manager untuk menyimpan output buku dalam markdown."""
 
+import json
 import os
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Optional, Union
 from datetime import datetime
 
+from .lazy import lazy_singleton
+from .stream_renderer import partial_path
+
+OUTLINE_MARKDOWN_FILENAME = "00_outline.md"
+# Outline lengkap (semua field planner) untuk dipakai ulang dengan --from-outline
+OUTLINE_JSON_FILENAME = "00_outline.json"
+
 
 class FileManager:
     """Manager untuk menyimpan dan mengorganisir file output."""
@@ -17,7 +25,6 @@ class FileManager:
             output_dir: Directory untuk menyimpan output
         """
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
 
     def create_book_directory(self, book_title: str) -> Path:
         """
@@ -36,7 +43,7 @@ class FileManager:
         # Tambahkan timestamp untuk uniqueness
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         book_dir = self.output_dir / f"{safe_title}_{timestamp}"
-        book_dir.mkdir(exist_ok=True)
+        book_dir.mkdir(parents=True, exist_ok=True)
 
         return book_dir
 
@@ -44,14 +51,21 @@ class FileManager:
         """
         Simpan outline buku.
 
+        Markdown hanya berisi ringkasan untuk dibaca; outline lengkap
+        (karakter, key_events, key_points, parts, dll) disimpan sebagai
+        JSON di sebelahnya (lihat load_outline).
+
         Args:
             book_dir: Directory buku
             outline: Dictionary berisi outline
 
         Returns:
-            Path ke file outline
+            Path ke file outline (markdown)
         """
-        outline_path = book_dir / "00_outline.md"
+        outline_path = book_dir / OUTLINE_MARKDOWN_FILENAME
+
+        with open(book_dir / OUTLINE_JSON_FILENAME, 'w', encoding='utf-8') as f:
+            json.dump(outline, f, ensure_ascii=False, indent=2)
 
         content = f"# Outline: {outline.get('title', 'Untitled')}\n\n"
         content += f"**Genre:** {outline.get('genre', 'N/A')}\n\n"
@@ -71,6 +85,38 @@ class FileManager:
 
         return outline_path
 
+    def load_outline(self, path: Union[str, Path]) -> Dict:
+        """
+        Baca outline lengkap yang disimpan oleh save_outline.
+
+        Args:
+            path: File JSON outline, file 00_outline.md, atau directory buku
+
+        Returns:
+            Dictionary outline
+
+        Raises:
+            FileNotFoundError: Jika outline JSON tidak ditemukan
+            ValueError: Jika isi file bukan outline
+        """
+        path = Path(path)
+        if path.is_dir():
+            path = path / OUTLINE_JSON_FILENAME
+        elif path.suffix.lower() == ".md":
+            path = path.with_name(OUTLINE_JSON_FILENAME)
+        if not path.exists():
+            raise FileNotFoundError(f"Outline tidak ditemukan: {path}")
+
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                outline = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Outline bukan JSON yang valid ({path}): {e}")
+
+        if not isinstance(outline, dict) or not outline.get('chapters'):
+            raise ValueError(f"Outline tidak berisi chapters: {path}")
+        return outline
+
     def save_chapter(
         self,
         book_dir: Path,
@@ -92,10 +138,9 @@ class FileManager:
         Returns:
             Path ke file chapter
         """
-        filename = f"{chapter_number:02d}_{chapter_title.replace(' ', '_')}.md"
-        chapter_path = book_dir / filename
+        chapter_path = self.chapter_path(book_dir, chapter_number, chapter_title)
 
-        markdown_content = f"# Chapter {chapter_number}: {chapter_title}\n\n"
+        markdown_content = self.chapter_header(chapter_number, chapter_title)
 
         if metadata:
             markdown_content += "---\n"
@@ -105,26 +150,73 @@ class FileManager:
 
         markdown_content += content
 
-        with open(chapter_path, 'w', encoding='utf-8') as f:
+        # Tulis ke file sementara lalu rename agar chapter tidak pernah setengah jadi
+        tmp_path = chapter_path.with_name(chapter_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             f.write(markdown_content)
+        os.replace(tmp_path, chapter_path)
+
+        # Sisa streaming yang gagal (jika ada) sudah tidak relevan
+        partial_path(chapter_path).unlink(missing_ok=True)
 
         return chapter_path
 
-    def save_full_book(self, book_dir: Path, book_title: str) -> Path:
+    def chapter_path(self, book_dir: Path, chapter_number: int, chapter_title: str) -> Path:
+        """Path file chapter (NN_Judul_Chapter.md)."""
+        filename = f"{chapter_number:02d}_{chapter_title.replace(' ', '_')}.md"
+        return book_dir / filename
+
+    def chapter_header(self, chapter_number: int, chapter_title: str) -> str:
+        """Heading markdown di awal file chapter."""
+        return f"# Chapter {chapter_number}: {chapter_title}\n\n"
+
+    def load_partial_chapter(self, book_dir: Path, chapter_number: int, chapter_title: str) -> str:
+        """
+        Baca teks chapter yang streaming-nya terhenti di tengah jalan.
+
+        Args:
+            book_dir: Directory buku
+            chapter_number: Nomor chapter
+            chapter_title: Judul chapter
+
+        Returns:
+            Teks chapter tanpa heading, atau string kosong jika tidak ada
+        """
+        path = partial_path(self.chapter_path(book_dir, chapter_number, chapter_title))
+        if not path.exists():
+            return ""
+
+        content = path.read_text(encoding='utf-8')
+        header = self.chapter_header(chapter_number, chapter_title)
+        if content.startswith(header):
+            content = content[len(header):]
+        return content
+
+    def save_full_book(
+        self,
+        book_dir: Path,
+        book_title: str,
+        chapter_paths: Optional[Iterable[Path]] = None
+    ) -> Path:
         """
         Gabungkan semua chapter menjadi satu file lengkap.
 
         Args:
             book_dir: Directory buku
             book_title: Judul buku
+            chapter_paths: File chapter yang sudah selesai, berurutan (default:
+                semua file chapter di directory buku)
 
         Returns:
             Path ke file buku lengkap
         """
         full_book_path = book_dir / f"{book_title.replace(' ', '_')}_full.md"
 
-        # Baca semua file chapter (yang dimulai dengan angka)
-        chapters = sorted([f for f in book_dir.glob("[0-9]*.md")])
+        if chapter_paths is not None:
+            chapters = [Path(path) for path in chapter_paths]
+        else:
+            # Baca semua file chapter (yang dimulai dengan angka)
+            chapters = sorted([f for f in book_dir.glob("[0-9]*.md")])
 
         with open(full_book_path, 'w', encoding='utf-8') as full_file:
             full_file.write(f"# {book_title}\n\n")
@@ -139,13 +231,21 @@ class FileManager:
 
         return full_book_path
 
-    def save_metadata(self, book_dir: Path, metadata: Dict) -> Path:
+    def save_metadata(
+        self,
+        book_dir: Path,
+        metadata: Dict,
+        telemetry_summary: Dict = None,
+        chapter_models: Dict[int, Dict[str, str]] = None
+    ) -> Path:
         """
         Simpan metadata buku.
 
         Args:
             book_dir: Directory buku
             metadata: Dictionary metadata
+            telemetry_summary: Ringkasan inference per role (optional)
+            chapter_models: Chapter -> {role: model yang dipakai} (optional)
 
         Returns:
             Path ke file metadata
@@ -156,11 +256,60 @@ class FileManager:
         for key, value in metadata.items():
             content += f"**{key.replace('_', ' ').title()}:** {value}\n\n"
 
+        if telemetry_summary:
+            content += "## Inference Telemetry\n\n"
+            content += "| Role | Model | Calls | Prompt Tokens | Gen Tokens | Prompt tok/s | Gen tok/s | Avg TTFT (s) | Load (s) | Prompt Reused |\n"
+            content += "|---|---|---|---|---|---|---|---|---|---|\n"
+            for role, stats in telemetry_summary.items():
+                content += (
+                    f"| {role} | {', '.join(stats['models'])} | {stats['calls']} "
+                    f"| {stats['prompt_tokens']} | {stats['eval_tokens']} "
+                    f"| {stats['prompt_tokens_per_sec']} | {stats['tokens_per_sec']} "
+                    f"| {stats['avg_ttft']} | {stats['load_time']} "
+                    f"| {stats.get('prompt_tokens_reused', 0)} ({stats.get('prompt_reuse_rate', 0.0):.0%}) |\n"
+                )
+            content += "\n"
+
+        if chapter_models and any(chapter_models.values()):
+            roles = sorted({role for models in chapter_models.values() for role in models})
+            content += "## Models per Chapter\n\n"
+            content += "| Chapter | " + " | ".join(roles) + " |\n"
+            content += "|---|" + "---|" * len(roles) + "\n"
+            for number in sorted(chapter_models):
+                models = chapter_models[number]
+                content += f"| {number} | " + " | ".join(models.get(role, '-') for role in roles) + " |\n"
+            content += "\n"
+
         with open(metadata_path, 'w', encoding='utf-8') as f:
             f.write(content)
 
         return metadata_path
 
+    def save_telemetry(self, book_dir: Path, telemetry: Dict) -> Path:
+        """
+        Simpan telemetry inference per call sebagai JSON sidecar.
+
+        Args:
+            book_dir: Directory buku
+            telemetry: Dictionary berisi summary dan calls
+
+        Returns:
+            Path ke file telemetry
+        """
+        telemetry_path = book_dir / "telemetry.json"
+
+        with open(telemetry_path, 'w', encoding='utf-8') as f:
+            json.dump(telemetry, f, ensure_ascii=False, indent=2)
+
+        return telemetry_path
+
+
+# Singleton instance (lazy)
+get_file_manager = lazy_singleton(FileManager)
+
 
-# Singleton instance
-file_manager = FileManager()
+def __getattr__(name: str):
+    """Akses `file_manager` tetap didukung, instance dibuat saat pertama dipakai."""
+    if name == "file_manager":
+        return get_file_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
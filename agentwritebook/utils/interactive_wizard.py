@@ -7,6 +7,8 @@ from rich.table import Table
 from rich.panel import Panel
 from rich import print as rprint
 
+from .lazy import lazy_singleton
+
 console = Console()
 
 
@@ -252,7 +254,8 @@ class InteractiveWizard:
     
     def _choose_models(self):
         """Pilih models untuk setiap agent."""
-        from ..utils.model_helper import model_helper
+        from .model_helper import get_model_helper
+        model_helper = get_model_helper()
         
         console.print("\n[bold]6. Pilih Models[/bold]")
         
@@ -356,6 +359,13 @@ class InteractiveWizard:
         console.print(table)
 
 
-# Singleton instance
-interactive_wizard = InteractiveWizard()
+# Singleton instance (lazy)
+get_interactive_wizard = lazy_singleton(InteractiveWizard)
+
+
+def __getattr__(name: str):
+    """Akses `interactive_wizard` tetap didukung, instance dibuat saat pertama dipakai."""
+    if name == "interactive_wizard":
+        return get_interactive_wizard()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
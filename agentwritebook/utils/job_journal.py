@@ -0,0 +1,236 @@
+"""Job journal untuk checkpoint dan resume proses penulisan buku."""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from datetime import datetime
+
+JOURNAL_FILENAME = "job.json"
+JOURNAL_VERSION = 1
+
+
+class JobJournal:
+    """
+    Journal per buku yang disimpan di book directory.
+
+    Menyimpan outline, setting run, model yang dipakai, dan status setiap
+    chapter. Setiap perubahan langsung ditulis ke disk secara atomic
+    (tulis ke file sementara lalu rename) sehingga journal tetap valid
+    walaupun proses mati di tengah jalan.
+    """
+
+    def __init__(self, book_dir: Path, data: Dict):
+        """
+        Initialize journal.
+
+        Args:
+            book_dir: Directory buku
+            data: Isi journal
+        """
+        self.book_dir = Path(book_dir)
+        self.path = self.book_dir / JOURNAL_FILENAME
+        self.data = data
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(
+        cls,
+        book_dir: Path,
+        outline: Dict,
+        settings: Dict,
+        models: Dict[str, str]
+    ) -> "JobJournal":
+        """
+        Buat journal baru untuk buku.
+
+        Args:
+            book_dir: Directory buku (dari FileManager.create_book_directory)
+            outline: Outline dari planner (chapters boleh masih kosong, lihat add_chapter)
+            settings: Parameter run (book_type, min_words, language, dll)
+            models: Model per role (planner/writer/reviewer)
+
+        Returns:
+            JobJournal yang sudah tersimpan di disk
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        journal = cls(book_dir, {
+            "version": JOURNAL_VERSION,
+            "status": "running",
+            "created_at": now,
+            "updated_at": now,
+            "settings": settings,
+            "models": models,
+            "outline": outline,
+            "outline_complete": bool(outline.get('chapters')),
+            "chapters": {
+                str(chapter.get('number', 0)): {
+                    "title": chapter.get('title', 'Untitled'),
+                    "status": "pending"
+                }
+                for chapter in outline.get('chapters', [])
+            }
+        })
+        journal.save()
+        return journal
+
+    @classmethod
+    def load(cls, book_dir: Path) -> "JobJournal":
+        """
+        Baca journal dari book directory.
+
+        Raises:
+            FileNotFoundError: Jika book directory tidak punya journal
+        """
+        path = Path(book_dir) / JOURNAL_FILENAME
+        if not path.exists():
+            raise FileNotFoundError(f"Journal tidak ditemukan: {path}")
+
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(book_dir, json.load(f))
+
+    @property
+    def outline(self) -> Dict:
+        """Outline yang tersimpan."""
+        return self.data["outline"]
+
+    @property
+    def settings(self) -> Dict:
+        """Parameter run yang tersimpan."""
+        return self.data["settings"]
+
+    @property
+    def models(self) -> Dict[str, str]:
+        """Model per role yang tersimpan."""
+        return self.data["models"]
+
+    @property
+    def outline_complete(self) -> bool:
+        """Apakah planner sudah selesai membuat semua chapter."""
+        return self.data.get("outline_complete", True)
+
+    @property
+    def continuity(self) -> Optional[Dict]:
+        """State ContinuityMemory dari run sebelumnya (None jika belum ada)."""
+        return self.data.get("continuity")
+
+    def save(self):
+        """Tulis journal ke disk secara atomic."""
+        with self._lock:
+            self._write()
+
+    def _write(self):
+        """Tulis journal (lock harus sudah dipegang)."""
+        self.data["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def add_chapter(self, chapter: Dict):
+        """
+        Tambahkan chapter yang baru selesai direncanakan (outline di-stream).
+
+        Args:
+            chapter: Chapter dari planner
+        """
+        with self._lock:
+            self.outline.setdefault('chapters', []).append(chapter)
+            self.data["chapters"].setdefault(str(chapter.get('number', 0)), {
+                "title": chapter.get('title', 'Untitled'),
+                "status": "pending"
+            })
+            self._write()
+
+    def complete_outline(self, fields: Dict):
+        """
+        Tandai planning selesai dan simpan field yang datang setelah chapters.
+
+        Args:
+            fields: Field outline final (chapters dan title diabaikan)
+        """
+        with self._lock:
+            self.outline.update({
+                k: v for k, v in fields.items() if k not in ('chapters', 'title')
+            })
+            self.data["outline_complete"] = True
+            self._write()
+
+    def completed_chapters(self) -> List[Dict]:
+        """
+        Chapter yang sudah selesai dan file-nya masih ada.
+
+        Returns:
+            List entry dengan format yang sama seperti chapter_results
+        """
+        results = []
+        for number, chapter in self.data["chapters"].items():
+            if chapter.get("status") != "completed":
+                continue
+            filename = chapter.get("file")
+            if not filename or not (self.book_dir / filename).exists():
+                continue
+            results.append({
+                'number': int(number),
+                'title': chapter.get('title', 'Untitled'),
+                'path': self.book_dir / filename,
+                'word_count': chapter.get('word_count', 0),
+                'score': chapter.get('score'),
+                'models': chapter.get('models', {})
+            })
+        return sorted(results, key=lambda r: r['number'])
+
+    def mark_completed(self, entry: Dict, review: Optional[Dict] = None):
+        """
+        Tandai chapter selesai.
+
+        Args:
+            entry: Entry chapter_results (number, title, path, word_count, score, models)
+            review: Hasil ReviewerAgent (optional)
+        """
+        with self._lock:
+            self.data["chapters"][str(entry['number'])] = {
+                "title": entry['title'],
+                "status": "completed",
+                "file": Path(entry['path']).name,
+                "word_count": entry['word_count'],
+                "score": entry['score'],
+                "models": entry.get('models', {}),
+                "review": review,
+                "completed_at": datetime.now().isoformat(timespec="seconds")
+            }
+            self._write()
+
+    def mark_failed(self, failed: Dict):
+        """
+        Tandai chapter gagal.
+
+        Args:
+            failed: Entry failed_chapters (number, title, error)
+        """
+        with self._lock:
+            self.data["chapters"][str(failed['number'])] = {
+                "title": failed['title'],
+                "status": "failed",
+                "error": failed['error']
+            }
+            self._write()
+
+    def save_continuity(self, state: Dict):
+        """
+        Simpan ringkasan kontinuitas agar resume tidak perlu meringkas ulang.
+
+        Args:
+            state: Hasil ContinuityMemory.to_dict()
+        """
+        with self._lock:
+            self.data["continuity"] = state
+            self._write()
+
+    def finish(self, failed_count: int):
+        """Tandai seluruh job selesai (atau selesai dengan chapter gagal)."""
+        self.data["status"] = "completed" if failed_count == 0 else "incomplete"
+        self.save()
@@ -0,0 +1,236 @@
+"""Parser JSON bertahap untuk output model yang di-stream."""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Koma sebelum } atau ] (kesalahan yang sering dibuat model)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def lenient_loads(text: str) -> Any:
+    """
+    json.loads yang mentoleransi trailing comma.
+
+    Raises:
+        json.JSONDecodeError: Jika teks tetap tidak valid
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", text))
+
+
+class IncrementalObjectParser:
+    """
+    Parse objek JSON top-level dari potongan teks yang datang bertahap.
+
+    Setiap field top-level dikeluarkan begitu nilainya lengkap, dan setiap
+    elemen objek di array `item_key` (misal "chapters") dikeluarkan begitu
+    kurung tutupnya datang, tanpa menunggu seluruh JSON selesai. Teks
+    sebelum "{" pertama (misal ```json) diabaikan. Elemen yang rusak
+    dilewati (dihitung di `errors`) tanpa membuang elemen lain.
+
+    Event dari feed():
+        ("field", (key, value)) - field top-level selesai
+        ("items_start", None)   - array item_key mulai (field sebelumnya sudah lengkap)
+        ("item", dict)          - satu elemen item_key selesai
+    """
+
+    def __init__(self, item_key: str = "chapters"):
+        """
+        Initialize parser.
+
+        Args:
+            item_key: Field top-level berisi array objek yang di-emit per elemen
+        """
+        self.item_key = item_key
+        self.fields: Dict[str, Any] = {}
+        self.items: List[Dict] = []
+        self.errors = 0
+        self.done = False
+        # Semua chunk (untuk `text`), dan buffer kerja yang hanya menyimpan
+        # teks mulai dari nilai/elemen yang belum selesai; `_base` adalah
+        # offset absolut karakter pertama `_buf`
+        self._chunks: List[str] = []
+        self._buf = ""
+        self._base = 0
+        self._pos = 0
+        self._started = False
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect = "key"
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self._in_items = False
+        self._item_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Semua teks yang sudah diterima."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def _slice(self, start: int, end: int) -> str:
+        """Teks antara offset absolut start dan end (harus masih di buffer)."""
+        return self._buf[start - self._base:end - self._base]
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Tambahkan potongan teks.
+
+        Args:
+            chunk: Potongan output model
+
+        Returns:
+            Event yang selesai karena potongan ini
+        """
+        self._chunks.append(chunk)
+        self._buf += chunk
+        events = []
+        text, base = self._buf, self._base
+        i = self._pos
+        end = base + len(text)
+        while i < end and not self.done:
+            c = text[i - base]
+            if not self._started:
+                if c == "{":
+                    self._started = True
+                    self._stack = ["{"]
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._expect == "key":
+                        try:
+                            self._key = json.loads(self._slice(self._string_start, i + 1))
+                        except json.JSONDecodeError:
+                            self._key = None
+                        self._expect = "colon"
+            else:
+                self._scan(c, i, events)
+            i += 1
+        self._pos = i
+        self._discard_consumed()
+        return events
+
+    def _discard_consumed(self):
+        """
+        Buang teks yang sudah selesai diproses dari buffer kerja.
+
+        Buffer hanya menyimpan string/nilai/elemen yang belum selesai,
+        sehingga biaya setiap feed() sebanding dengan satu elemen, bukan
+        seluruh output (array item_key tidak perlu disimpan utuh karena
+        elemennya sudah dikumpulkan di `items`).
+        """
+        keep = self._pos
+        if self._in_string:
+            keep = min(keep, self._string_start)
+        if self._value_start is not None and not self._in_items:
+            keep = min(keep, self._value_start)
+        if self._item_start is not None:
+            keep = min(keep, self._item_start)
+        if keep > self._base:
+            self._buf = self._buf[keep - self._base:]
+            self._base = keep
+
+    def _scan(self, c: str, i: int, events: List):
+        """Proses satu karakter di luar string."""
+        depth = len(self._stack)
+        if c == '"':
+            self._in_string = True
+            self._string_start = i
+            if depth == 1 and self._expect == "value" and self._value_start is None:
+                self._value_start = i
+        elif c == ":" and depth == 1 and self._expect == "colon":
+            self._expect = "value"
+            self._value_start = None
+        elif c in "{[":
+            if depth == 1 and self._expect == "value" and self._value_start is None:
+                self._value_start = i
+                if c == "[" and self._key == self.item_key:
+                    self._in_items = True
+                    events.append(("items_start", None))
+            elif self._in_items and depth == 2 and c == "{":
+                self._item_start = i
+            self._stack.append(c)
+        elif c in "}]":
+            if depth == 1:
+                # Penutup objek top-level
+                self._finish_value(i, events)
+                self._stack.pop()
+                self.done = True
+                return
+            self._stack.pop()
+            if self._in_items and depth == 3 and c == "}" and self._item_start is not None:
+                self._emit_item(self._slice(self._item_start, i + 1), events)
+                self._item_start = None
+            if depth == 2:
+                self._finish_value(i + 1, events)
+        elif c == "," and depth == 1:
+            self._finish_value(i, events)
+            self._expect = "key"
+        elif depth == 1 and self._expect == "value" and self._value_start is None and not c.isspace():
+            # Angka, true/false/null
+            self._value_start = i
+
+    def _finish_value(self, end: int, events: List):
+        """Selesaikan nilai field top-level yang sedang dibaca."""
+        if self._value_start is None or self._key is None:
+            return
+        raw = self._slice(self._value_start, end).strip()
+        key, self._value_start = self._key, None
+        self._expect = "after"
+        if key == self.item_key and self._in_items:
+            self._in_items = False
+            self.fields[key] = list(self.items)
+            return
+        try:
+            value = lenient_loads(raw)
+        except json.JSONDecodeError:
+            self.errors += 1
+            return
+        self.fields[key] = value
+        events.append(("field", (key, value)))
+
+    def _emit_item(self, raw: str, events: List):
+        try:
+            item = lenient_loads(raw)
+        except json.JSONDecodeError:
+            self.errors += 1
+            return
+        if isinstance(item, dict):
+            self.items.append(item)
+            events.append(("item", item))
+
+    def result(self) -> Dict:
+        """
+        Objek yang berhasil dipulihkan sejauh ini.
+
+        Jika parser tidak menemukan apa pun (misal JSON dibungkus dengan cara
+        yang tidak terduga), coba json.loads dari "{" pertama sampai "}"
+        terakhir seperti parser lama.
+
+        Returns:
+            Dictionary field top-level, dengan item_key berisi semua elemen valid
+        """
+        if not self.fields and not self.items:
+            text = self.text
+            start, end = text.find("{"), text.rfind("}") + 1
+            if start != -1 and end > start:
+                try:
+                    value = lenient_loads(text[start:end])
+                    if isinstance(value, dict):
+                        return value
+                except json.JSONDecodeError:
+                    pass
+        result = dict(self.fields)
+        if self.items or self.item_key in result:
+            result[self.item_key] = list(self.items)
+        return result
@@ -0,0 +1,33 @@
+"""Helper untuk singleton yang dibuat saat pertama kali dipakai."""
+
+import threading
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def lazy_singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Bungkus factory menjadi getter singleton yang thread-safe.
+
+    Dipakai agar import modul tidak langsung membuat client HTTP,
+    agent, atau directory output; objek baru dibuat saat getter
+    pertama kali dipanggil.
+
+    Args:
+        factory: Callable tanpa argumen yang membuat instance
+
+    Returns:
+        Getter yang selalu mengembalikan instance yang sama
+    """
+    instance = []
+    lock = threading.Lock()
+
+    def get() -> T:
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return get
@@ -0,0 +1,226 @@
+"""Gating call agar model yang aktif bersamaan muat di budget memori."""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from ..config.settings import memory_config
+
+
+class MemoryLease:
+    """Izin memakai satu model; lepas dengan release() (boleh dipanggil berulang)."""
+
+    def __init__(self, scheduler: "MemoryScheduler", model: str):
+        self._scheduler = scheduler
+        self.model = model
+        self._released = False
+
+    def release(self):
+        """Kembalikan izin ke scheduler."""
+        if not self._released:
+            self._released = True
+            self._scheduler._release(self.model)
+
+
+class MemoryScheduler:
+    """
+    Batasi model yang dipakai bersamaan agar muat di `budget_gb`.
+
+    Model yang sedang dipakai call lain bisa langsung dipakai lagi (satu
+    salinan di memori). Model lain harus menunggu sampai total ukuran
+    model aktif + model itu muat di budget; model yang lebih besar dari
+    budget tetap boleh jalan jika tidak ada model lain yang aktif. Model
+    yang idle (keep_alive) tidak dihitung karena Ollama mengeluarkannya
+    sendiri saat butuh tempat.
+
+    Ukuran model: /api/ps (memori asli setelah load) jika pernah terlihat,
+    lalu peak memory dari `writebook bench-models`, lalu ukuran file
+    /api/tags dikali `load_overhead`. Model cloud dihitung 0.
+    """
+
+    def __init__(self, budget_gb: Optional[float] = None):
+        """
+        Initialize scheduler.
+
+        Args:
+            budget_gb: Budget memori dalam GB (default dari config, 0 = tidak dibatasi)
+        """
+        self.budget_gb = memory_config.budget_gb if budget_gb is None else budget_gb
+        self._active: Dict[str, int] = {}
+        self._sizes: Dict[str, int] = {}
+        self._bench: Optional[Dict[str, Dict]] = None
+        self._ps_checked = 0.0
+        self._cond = threading.Condition()
+        self.waits = 0
+        self.wait_time = 0.0
+        self.wait_by_model: Dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Apakah budget memori aktif."""
+        return self.budget_gb > 0
+
+    @property
+    def budget(self) -> int:
+        """Budget dalam byte."""
+        return int(self.budget_gb * 1e9)
+
+    def reset_metrics(self):
+        """Mulai pencatatan waktu tunggu baru."""
+        with self._cond:
+            self.waits = 0
+            self.wait_time = 0.0
+            self.wait_by_model = {}
+
+    def _refresh_resident_sizes(self):
+        """Pelajari ukuran asli model yang sedang di-load dari /api/ps (dibatasi interval)."""
+        now = time.monotonic()
+        if now - self._ps_checked < memory_config.ps_refresh_seconds:
+            return
+        self._ps_checked = now
+        # Import lokal: client Ollama tidak dibutuhkan jika budget mati
+        from .ollama_client import get_ollama_client
+        for entry in get_ollama_client().running_models():
+            size = entry.get('size') or 0
+            if size:
+                self._sizes[entry['model']] = max(size, self._sizes.get(entry['model'], 0))
+
+    def size_of(self, model: str) -> int:
+        """
+        Perkiraan memori model saat di-load (byte).
+
+        Args:
+            model: Nama model
+
+        Returns:
+            Ukuran dalam byte (0 jika model cloud atau tidak diketahui)
+        """
+        try:
+            self._refresh_resident_sizes()
+        except Exception:
+            pass
+        if model in self._sizes:
+            return self._sizes[model]
+
+        if self._bench is None:
+            from .model_bench import ModelBenchmark
+            try:
+                self._bench = ModelBenchmark().load_results()
+            except Exception:
+                self._bench = {}
+        peak = (self._bench.get(model) or {}).get('peak_memory')
+        if peak:
+            return peak
+
+        from .model_registry import get_model_registry
+        try:
+            info = get_model_registry().get(model, details=False)
+        except Exception:
+            info = None
+        if not info or info['size_label'] == "cloud":
+            return 0
+        return int(info['size'] * memory_config.load_overhead)
+
+    def _fits(self, model: str, size: int) -> bool:
+        if model in self._active or not self._active:
+            return True
+        used = sum(self._sizes.get(m, 0) for m in self._active)
+        return used + size <= self.budget
+
+    def acquire(self, model: str) -> MemoryLease:
+        """
+        Tunggu sampai model boleh dipakai.
+
+        Args:
+            model: Nama model
+
+        Returns:
+            MemoryLease yang harus di-release setelah call selesai
+        """
+        if not self.enabled:
+            return MemoryLease(self, model)
+
+        size = self.size_of(model)
+        started = time.monotonic()
+        waited = False
+        with self._cond:
+            self._sizes.setdefault(model, size)
+            while not self._fits(model, size):
+                waited = True
+                self._cond.wait()
+            self._active[model] = self._active.get(model, 0) + 1
+            if waited:
+                elapsed = time.monotonic() - started
+                self.waits += 1
+                self.wait_time += elapsed
+                self.wait_by_model[model] = self.wait_by_model.get(model, 0.0) + elapsed
+        return MemoryLease(self, model)
+
+    async def aacquire(self, model: str) -> MemoryLease:
+        """Versi async dari acquire (menunggu di thread agar event loop tetap jalan)."""
+        if not self.enabled:
+            return MemoryLease(self, model)
+        return await asyncio.to_thread(self.acquire, model)
+
+    def _release(self, model: str):
+        if not self.enabled:
+            return
+        with self._cond:
+            remaining = self._active.get(model, 0) - 1
+            if remaining > 0:
+                self._active[model] = remaining
+            else:
+                self._active.pop(model, None)
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserve(self, model: str):
+        """Context manager untuk acquire/release."""
+        lease = self.acquire(model)
+        try:
+            yield lease
+        finally:
+            lease.release()
+
+    def conflicts(self, models: List[str]) -> List[List[str]]:
+        """
+        Pasangan model yang tidak muat di budget jika aktif bersamaan.
+
+        Args:
+            models: Model yang akan dipakai satu run (misal planner/writer/reviewer)
+
+        Returns:
+            List pasangan [model_a, model_b]
+        """
+        if not self.enabled:
+            return []
+        unique = list(dict.fromkeys(models))
+        sizes = {model: self.size_of(model) for model in unique}
+        return [
+            [a, b]
+            for i, a in enumerate(unique)
+            for b in unique[i + 1:]
+            if sizes[a] and sizes[b] and sizes[a] + sizes[b] > self.budget
+        ]
+
+    def summary(self) -> Dict:
+        """
+        Waktu tunggu memori selama run.
+
+        Returns:
+            Dictionary {budget_gb, waits, wait_time, wait_by_model, sizes}
+        """
+        with self._cond:
+            return {
+                "budget_gb": self.budget_gb,
+                "waits": self.waits,
+                "wait_time": round(self.wait_time, 2),
+                "wait_by_model": {m: round(t, 2) for m, t in self.wait_by_model.items()},
+                "sizes": dict(self._sizes),
+            }
+
+
+# Singleton instance
+memory_scheduler = MemoryScheduler()
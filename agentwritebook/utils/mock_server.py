@@ -0,0 +1,437 @@
+"""Mock Ollama server untuk benchmark dan test offline."""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class MockServerConfig(BaseModel):
+    """Konfigurasi perilaku mock server."""
+
+    host: str = "127.0.0.1"
+    port: int = 11435
+    ttft: float = 0.05  # Detik sebelum token pertama
+    tokens_per_sec: float = 200.0  # Kecepatan generasi (0 = instan)
+    load_time: float = 0.0  # Simulasi load model saat model berganti
+    error_rate: float = 0.0  # Probabilitas request gagal (0.0-1.0)
+    error_status: int = 500
+    stall_rate: float = 0.0  # Probabilitas request macet di tengah jalan (0.0-1.0)
+    stall_after: int = 5  # Token yang dikirim sebelum stream macet
+    stall_time: float = 30.0  # Lama macet (detik)
+    models: List[str] = [
+        "gemma3:latest",
+        "gemma3:1b",
+        "qwen2.5:3b",
+        "qwen3:1.7b",
+        "kimi-k2:1t-cloud",
+    ]
+    review_score: float = 8.0
+    # Probabilitas request dengan `format` mendapat JSON terpotong (uji repair)
+    structured_error_rate: float = 0.0
+    default_words: int = 300  # Panjang teks jika prompt tidak menyebut minimal kata
+
+
+class MockOllamaServer:
+    """
+    Stand-in Ollama server (/api/chat, /api/generate, /api/tags, /api/ps, /api/show).
+
+    Respons dipilih berdasarkan isi prompt: prompt yang meminta JSON
+    mendapat outline, prompt review mendapat teks dengan score, dan
+    sisanya mendapat teks chapter sepanjang "minimal N kata".
+
+    Contoh sebagai pytest fixture:
+
+        @pytest.fixture
+        def ollama_server():
+            with MockOllamaServer(MockServerConfig(port=0)) as server:
+                yield server.url
+    """
+
+    def __init__(self, config: Optional[MockServerConfig] = None):
+        """
+        Initialize mock server.
+
+        Args:
+            config: Konfigurasi server (default: MockServerConfig())
+        """
+        self.config = config or MockServerConfig()
+        self.request_count = 0
+        self.load_count = 0
+        self.loaded_model = None
+        self.cached_prompt = ""
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL server yang sedang berjalan."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _bind(self):
+        """Buat HTTP server yang terikat ke host/port dari config."""
+        handler = type("MockHandler", (_MockHandler,), {"server_state": self})
+        self._httpd = ThreadingHTTPServer((self.config.host, self.config.port), handler)
+        self._httpd.daemon_threads = True
+
+    def start(self) -> str:
+        """
+        Jalankan server di background thread.
+
+        Returns:
+            Base URL server
+        """
+        self._bind()
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="mock-ollama", daemon=True
+        )
+        self._thread.start()
+        return self.url
+
+    def serve_forever(self):
+        """Jalankan server di thread ini (untuk CLI)."""
+        self._bind()
+        self._httpd.serve_forever()
+
+    def stop(self):
+        """Hentikan server."""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "MockOllamaServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def switch_model(self, model: str) -> float:
+        """
+        Catat model yang dipakai dan kembalikan simulasi load time (detik).
+
+        Seperti Ollama dengan satu slot VRAM: load time hanya dibayar
+        ketika model berbeda dari model yang terakhir dipakai.
+        """
+        with self._lock:
+            self.request_count += 1
+            if self.loaded_model == model:
+                return 0.0
+            self.loaded_model = model
+            self.cached_prompt = ""
+            self.load_count += 1
+            return self.config.load_time
+
+    def unload_model(self, model: str):
+        """Keluarkan model dari slot (request dengan keep_alive=0)."""
+        with self._lock:
+            if self.loaded_model == model:
+                self.loaded_model = None
+                self.cached_prompt = ""
+
+    def evaluate_prompt(self, prompt: str) -> int:
+        """
+        Hitung token prompt yang perlu di-evaluate (simulasi prefix cache).
+
+        Seperti KV cache Ollama, prefix yang sama dengan prompt sebelumnya
+        pada model yang sedang di-load tidak dihitung ulang.
+        """
+        with self._lock:
+            shared = len(os.path.commonprefix([self.cached_prompt, prompt]))
+            self.cached_prompt = prompt
+        return max(1, (len(prompt) - shared) // 4)
+
+    def build_response_text(self, prompt: str, fmt=None) -> str:
+        """Pilih teks respons berdasarkan jenis prompt (dan schema `format` jika ada)."""
+        if isinstance(fmt, dict):
+            text = json.dumps(self._structured(prompt, fmt), ensure_ascii=False)
+            if self.config.structured_error_rate and random.random() < self.config.structured_error_rate:
+                return text[:len(text) // 2]
+            return text
+        if "JSON" in prompt:
+            return json.dumps(self._outline(prompt), ensure_ascii=False)
+        if "Review chapter" in prompt or "KRITERIA REVIEW" in prompt:
+            return self._review(prompt)
+        return self._chapter_text(prompt)
+
+    def _structured(self, prompt: str, schema: Dict) -> Dict:
+        """Respons JSON yang sesuai schema `format`."""
+        properties = schema.get("properties", {})
+        if "parts" in properties:
+            # Kerangka outline hierarkis: metadata + parts tanpa chapters
+            outline = self._outline(prompt)
+            outline.pop("chapters")
+            outline["parts"] = [
+                {"title": f"Part {i}", "summary": f"Ringkasan part {i} dari {outline['title']}"}
+                for i in range(1, properties["parts"].get("minItems", 3) + 1)
+            ]
+            return outline
+        if "chapters" not in properties:
+            return _sample_schema(schema, schema, self.config.review_score)
+        outline = self._outline(prompt)
+        count = properties["chapters"].get("minItems")
+        span = re.search(r"chapter\s+(\d+)\s+sampai\s+(\d+)", prompt)
+        if span:
+            # Chapter satu part (outline hierarkis)
+            outline["chapters"] = outline["chapters"][int(span.group(1)) - 1:int(span.group(2))]
+        elif count:
+            # Permintaan melengkapi chapter: chapter terakhir sebanyak yang diminta
+            outline["chapters"] = outline["chapters"][-count:]
+        if "title" not in properties:
+            return {"chapters": outline["chapters"]}
+        return outline
+
+    def _outline(self, prompt: str) -> Dict:
+        """Outline palsu dengan jumlah chapter dari prompt."""
+        match = re.search(r"Jumlah Chapter:\s*(\d+)", prompt)
+        num_chapters = int(match.group(1)) if match else 5
+        topic_match = re.search(r"Topik(?:/Tema)?:\s*(.+)", prompt)
+        topic = topic_match.group(1).strip() if topic_match else "Mock Book"
+        non_fiction = "non-fiksi" in prompt
+
+        chapters = []
+        for i in range(1, num_chapters + 1):
+            chapter = {
+                "number": i,
+                "title": f"Bagian {i}",
+                "description": f"Apa yang terjadi di bagian {i} dari {topic}",
+            }
+            if non_fiction:
+                chapter["key_points"] = [f"poin {i}.1", f"poin {i}.2"]
+                chapter["learning_objectives"] = f"Memahami bagian {i}"
+            else:
+                chapter["key_events"] = [f"event {i}.1", f"event {i}.2"]
+                chapter["character_development"] = "Karakter berkembang"
+            chapters.append(chapter)
+
+        outline = {
+            "title": topic,
+            "genre": "non-fiction" if non_fiction else "fiction",
+            "target_audience": "general",
+            "synopsis": f"Sebuah buku tentang {topic}.",
+            "chapters": chapters,
+        }
+        if not non_fiction:
+            outline["main_characters"] = [
+                {"name": "Rani", "role": "Protagonis", "description": "Penjelajah muda"}
+            ]
+            outline["setting"] = "Kota tua"
+            outline["themes"] = ["keberanian"]
+        return outline
+
+    def _review(self, prompt: str) -> str:
+        """Teks review dengan format yang dipahami ReviewerAgent."""
+        score = self.config.review_score
+        criteria = re.findall(r"^- ([A-Za-z ]+)$", prompt, flags=re.MULTILINE)
+        lines = ["## Overall Assessment", "Chapter ini cukup baik.", "", "## Scores (1-10)"]
+        lines += [f"- {c.strip()}: {score:g}/10" for c in criteria]
+        lines += [
+            f"- Overall Score: {score:g}/10",
+            "",
+            "## Strengths",
+            "- Alur jelas",
+            "",
+            "## Recommendations",
+            "- Perdalam dialog",
+        ]
+        return "\n".join(lines)
+
+    def _chapter_text(self, prompt: str) -> str:
+        """Teks chapter sepanjang minimal kata yang diminta."""
+        match = re.search(r"(?:minimal|minimum)\s+(\d+)\s+(?:kata|words)", prompt)
+        words = int(match.group(1)) if match else self.config.default_words
+        vocabulary = ["angin", "malam", "itu", "membawa", "kabar", "dari", "kota", "tua", "dan"]
+        return " ".join(vocabulary[i % len(vocabulary)] for i in range(words))
+
+
+def _sample_schema(node: Dict, root: Dict, number: float):
+    """Contoh nilai yang valid untuk JSON schema (subset yang dipakai pydantic)."""
+    if "$ref" in node:
+        return _sample_schema(root["$defs"][node["$ref"].rpartition("/")[2]], root, number)
+    kind = node.get("type")
+    if kind == "object":
+        return {
+            key: _sample_schema(value, root, number)
+            for key, value in node.get("properties", {}).items()
+        }
+    if kind == "array":
+        count = max(node.get("minItems", 0), 1)
+        return [_sample_schema(node.get("items", {}), root, number) for _ in range(count)]
+    if kind in ("number", "integer"):
+        value = min(max(number, node.get("minimum", number)), node.get("maximum", number))
+        return int(value) if kind == "integer" else value
+    if kind == "boolean":
+        return True
+    return "Chapter ini cukup baik."
+
+
+def _mock_parameters(model: str) -> float:
+    """Jumlah parameter (miliar) dari tag model, misal "qwen2.5:3b" -> 3.0."""
+    match = re.match(r"(\d+(?:\.\d+)?)b$", model.rpartition(":")[2])
+    return float(match.group(1)) if match else 4.0
+
+
+def _mock_size(model: str) -> int:
+    """Ukuran file model mock (~0.6 byte per parameter, seperti Q4_K_M)."""
+    return 0 if "cloud" in model else int(_mock_parameters(model) * 0.6e9)
+
+
+def _mock_details(model: str) -> Dict:
+    """Field details /api/tags dan /api/show untuk model mock."""
+    return {"format": "gguf", "family": "mock", "families": ["mock"],
+            "parameter_size": f"{_mock_parameters(model):g}B", "quantization_level": "Q4_K_M"}
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """HTTP handler untuk MockOllamaServer."""
+
+    server_state: MockOllamaServer = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        """Jangan tulis access log ke stderr."""
+        pass
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [
+                {"name": m, "model": m, "size": _mock_size(m), "digest": "", "details": _mock_details(m)}
+                for m in self.server_state.config.models
+            ]})
+        elif self.path == "/api/ps":
+            loaded = self.server_state.loaded_model
+            self._send_json(200, {"models": [
+                {"name": loaded, "model": loaded, "size": int(_mock_size(loaded) * 1.2),
+                 "size_vram": int(_mock_size(loaded) * 1.2), "digest": "", "details": _mock_details(loaded)}
+            ] if loaded else []})
+        elif self.path == "/api/version":
+            self._send_json(200, {"version": "0.0.0-mock"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path == "/api/show":
+            model = self._read_json().get("model", "")
+            if model not in self.server_state.config.models:
+                self._send_json(404, {"error": f"model '{model}' not found"})
+                return
+            self._send_json(200, {
+                "details": _mock_details(model),
+                "model_info": {"general.architecture": "mock", "mock.context_length": 8192},
+                "capabilities": ["completion"],
+            })
+            return
+        if self.path not in ("/api/chat", "/api/generate"):
+            self._send_json(404, {"error": "not found"})
+            return
+
+        request = self._read_json()
+        state = self.server_state
+        config = state.config
+        model = request.get("model", "")
+
+        if model not in config.models:
+            self._send_json(404, {"error": f"model '{model}' not found"})
+            return
+        if config.error_rate and random.random() < config.error_rate:
+            self._send_json(config.error_status, {"error": "mock injected error"})
+            return
+
+        is_chat = self.path == "/api/chat"
+        if is_chat:
+            messages = request.get("messages", [])
+            prompt = "\n".join(m.get("content", "") for m in messages)
+        else:
+            prompt = request.get("prompt", "")
+
+        if not prompt and request.get("keep_alive") == 0:
+            # Request unload (keep_alive=0) seperti di Ollama asli
+            state.unload_model(model)
+            self._send_json(200, {"model": model, "done": True, "done_reason": "unload"})
+            return
+
+        started = time.perf_counter()
+        load_time = state.switch_model(model)
+        time.sleep(load_time + config.ttft)
+
+        stall = config.stall_rate and random.random() < config.stall_rate
+        text = state.build_response_text(prompt, request.get("format"))
+        tokens = re.findall(r"\S+\s*", text) or [""]
+        delay = 1.0 / config.tokens_per_sec if config.tokens_per_sec > 0 else 0.0
+        prompt_tokens = state.evaluate_prompt(prompt)
+
+        def chunk(content: str, done: bool, **extra) -> Dict:
+            payload = {
+                "model": model,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "done": done,
+                **extra,
+            }
+            if is_chat:
+                payload["message"] = {"role": "assistant", "content": content}
+            else:
+                payload["response"] = content
+            return payload
+
+        def final_stats() -> Dict:
+            total = time.perf_counter() - started
+            eval_time = len(tokens) * delay
+            return {
+                "done_reason": "stop",
+                "total_duration": int(total * 1e9),
+                "load_duration": int(load_time * 1e9),
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(config.ttft * 1e9),
+                "eval_count": len(tokens),
+                "eval_duration": int(eval_time * 1e9),
+            }
+
+        if not request.get("stream", True):
+            time.sleep(delay * len(tokens) + (config.stall_time if stall else 0.0))
+            self._send_json(200, chunk(text, True, **final_stats()))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_line(payload: Dict):
+            data = (json.dumps(payload) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        try:
+            for i, token in enumerate(tokens):
+                if stall and i == config.stall_after:
+                    time.sleep(config.stall_time)
+                if delay:
+                    time.sleep(delay)
+                write_line(chunk(token, False))
+            write_line(chunk("", True, **final_stats()))
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
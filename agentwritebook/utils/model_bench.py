@@ -0,0 +1,198 @@
+"""Benchmark throughput model Ollama per role."""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from ..config.settings import bench_config, ollama_config
+from .ollama_client import get_ollama_client
+
+# Prompt standar per role: panjang dan bentuknya mirip call agent asli
+BENCH_PROMPTS = {
+    "planner": (
+        "Buat outline buku fiksi dalam format JSON.\n"
+        "Topik: Penjaga mercusuar terakhir\nJumlah Chapter: 5\n"
+        "Setiap chapter punya number, title, description, key_events."
+    ),
+    "writer": (
+        "Kamu sedang menulis chapter-chapter dari novel berjudul \"Penjaga Mercusuar\".\n"
+        "Tulis Chapter 1: Badai Pertama, minimal 150 kata, dengan dialog dan deskripsi "
+        "suasana pulau yang hidup."
+    ),
+    "reviewer": (
+        "Review chapter berikut dan berikan score 1-10 untuk setiap kriteria.\n\n"
+        "KRITERIA REVIEW: alur, karakter, gaya bahasa, konsistensi.\n\n"
+        "Angin menghantam jendela mercusuar ketika Raka menyalakan lampu untuk terakhir "
+        "kalinya. Di bawah sana, laut menelan dermaga kayu yang dulu dibangun ayahnya."
+    ),
+}
+
+
+def _ns_to_s(value: Optional[int]) -> float:
+    return (value or 0) / 1e9
+
+
+def _rate(tokens: int, duration_ns: int) -> float:
+    seconds = _ns_to_s(duration_ns)
+    return round(tokens / seconds, 2) if seconds else 0.0
+
+
+class ModelBenchmark:
+    """
+    Ukur load time, TTFT, token/detik, dan peak memory model.
+
+    Untuk setiap model: model di-unload dulu agar call pertama mengukur
+    cold load, lalu setiap prompt role dijalankan dengan streaming
+    (temperature 0, num_predict tetap). Selama benchmark /api/ps di-poll
+    untuk mencatat memori terbesar yang dipakai model. Hasil disimpan di
+    `bench_config.path` dan dibaca ModelHelper untuk tabel model.
+    """
+
+    def __init__(self, client=None, path: Optional[str] = None):
+        """
+        Initialize benchmark.
+
+        Args:
+            client: OllamaClient (default: singleton)
+            path: Lokasi file hasil (default dari config)
+        """
+        self.client = client or get_ollama_client()
+        self.path = Path(path or bench_config.path).expanduser()
+
+    def load_results(self) -> Dict[str, Dict]:
+        """Hasil benchmark yang tersimpan (model -> hasil)."""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_result(self, result: Dict):
+        """Simpan hasil satu model (menimpa hasil sebelumnya untuk model itu)."""
+        results = self.load_results()
+        results[result['model']] = result
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _run_prompt(self, model: str, prompt: str) -> Dict:
+        """Jalankan satu prompt dengan streaming dan ukur hasilnya."""
+        started = time.perf_counter()
+        ttft = None
+        final = {}
+        for chunk in self.client.chat(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            temperature=0.0,
+            options={"num_predict": bench_config.num_predict, "seed": 42},
+            timeout=ollama_config.timeout,
+        ):
+            if ttft is None and chunk.get('message', {}).get('content'):
+                ttft = time.perf_counter() - started
+            if chunk.get('done'):
+                final = chunk
+
+        return {
+            "ttft": round(ttft if ttft is not None else time.perf_counter() - started, 3),
+            "load_time": round(_ns_to_s(final.get('load_duration')), 3),
+            "prompt_tokens": final.get('prompt_eval_count') or 0,
+            "eval_tokens": final.get('eval_count') or 0,
+            "prompt_tokens_per_sec": _rate(
+                final.get('prompt_eval_count') or 0, final.get('prompt_eval_duration') or 0
+            ),
+            "tokens_per_sec": _rate(final.get('eval_count') or 0, final.get('eval_duration') or 0),
+            "wall_time": round(time.perf_counter() - started, 3),
+        }
+
+    def _sample_memory(self, model: str, stop: threading.Event, peak: Dict):
+        """Poll /api/ps sampai stop di-set, simpan size/size_vram terbesar."""
+        while not stop.is_set():
+            for entry in self.client.running_models():
+                if entry.get('model') == model:
+                    peak['size'] = max(peak['size'], entry.get('size') or 0)
+                    peak['size_vram'] = max(peak['size_vram'], entry.get('size_vram') or 0)
+            stop.wait(bench_config.memory_poll_interval)
+
+    def run_model(self, model: str, roles: Optional[List[str]] = None) -> Dict:
+        """
+        Benchmark satu model untuk prompt setiap role.
+
+        Args:
+            model: Nama model
+            roles: Role yang dijalankan (default: semua di BENCH_PROMPTS)
+
+        Returns:
+            Hasil benchmark (juga disimpan ke disk)
+        """
+        roles = roles or list(BENCH_PROMPTS)
+        self.client.unload_model(model)
+
+        peak = {"size": 0, "size_vram": 0}
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample_memory, args=(model, stop, peak), daemon=True
+        )
+        sampler.start()
+        try:
+            per_role = {role: self._run_prompt(model, BENCH_PROMPTS[role]) for role in roles}
+        finally:
+            stop.set()
+            sampler.join()
+            # Bebaskan memori untuk model berikutnya
+            self.client.unload_model(model)
+
+        first = per_role[roles[0]]
+        generated = [r for r in per_role.values() if r['tokens_per_sec']]
+        prompted = [r for r in per_role.values() if r['prompt_tokens_per_sec']]
+        result = {
+            "model": model,
+            "measured_at": datetime.now().isoformat(timespec="seconds"),
+            "cold_load_time": first['load_time'],
+            "ttft": round(sum(r['ttft'] for r in per_role.values()) / len(per_role), 3),
+            "tokens_per_sec": round(
+                sum(r['tokens_per_sec'] for r in generated) / len(generated), 2
+            ) if generated else 0.0,
+            "prompt_tokens_per_sec": round(
+                sum(r['prompt_tokens_per_sec'] for r in prompted) / len(prompted), 2
+            ) if prompted else 0.0,
+            "peak_memory": peak['size'],
+            "peak_vram": peak['size_vram'],
+            "roles": per_role,
+        }
+        self.save_result(result)
+        return result
+
+    def run(
+        self,
+        models: List[str],
+        roles: Optional[List[str]] = None,
+        on_result: Optional[Callable[[str, Optional[Dict], Optional[Exception]], None]] = None
+    ) -> Dict[str, Dict]:
+        """
+        Benchmark beberapa model berurutan (satu per satu agar memori tidak bersaing).
+
+        Args:
+            models: Nama model
+            roles: Role yang dijalankan
+            on_result: Callback (model, hasil, error) setelah setiap model
+
+        Returns:
+            Dictionary model -> hasil untuk model yang berhasil
+        """
+        results = {}
+        for model in models:
+            try:
+                results[model] = self.run_model(model, roles)
+                error = None
+            except Exception as e:
+                error = e
+            if on_result:
+                on_result(model, results.get(model), error)
+        return results
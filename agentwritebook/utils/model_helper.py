@@ -3,13 +3,23 @@
 from typing import List, Dict, Optional
 from rich.console import Console
 from rich.table import Table
-from ..utils.ollama_client import ollama_client
+from .lazy import lazy_singleton
+from .model_bench import ModelBenchmark
+from .model_registry import format_size, get_model_registry
+from .ollama_client import get_ollama_client
 
 console = Console()
 
 
 class ModelHelper:
-    """Helper class untuk model operations."""
+    """
+    Helper class untuk model operations.
+
+    Ketersediaan dan ukuran model dibaca dari ModelRegistry (cache
+    /api/tags dan /api/show); "size" di RECOMMENDED_MODELS hanya perkiraan
+    untuk model yang belum terinstall. Hasil `writebook bench-models`
+    menggantikan perkiraan "speed" di tabel.
+    """
     
     RECOMMENDED_MODELS = {
         "planner": [
@@ -45,7 +55,8 @@ class ModelHelper:
     
     def __init__(self):
         """Initialize model helper."""
-        self.client = ollama_client
+        self.client = get_ollama_client()
+        self.registry = get_model_registry()
     
     def get_available_models(self) -> List[str]:
         """
@@ -55,7 +66,7 @@ class ModelHelper:
             List model names
         """
         try:
-            return self.client.list_models()
+            return self.registry.names()
         except Exception as e:
             console.print(f"[yellow]Warning: Gagal mendapatkan list model: {e}[/yellow]")
             return []
@@ -70,8 +81,35 @@ class ModelHelper:
         Returns:
             True jika tersedia
         """
-        available = self.get_available_models()
-        return model_name in available
+        try:
+            return self.registry.has(model_name)
+        except Exception as e:
+            console.print(f"[yellow]Warning: Gagal mendapatkan list model: {e}[/yellow]")
+            return False
+
+    def _installed_info(self, model_name: str, details: bool = False) -> Optional[Dict]:
+        """Info registry untuk model yang terinstall (None jika tidak ada/Ollama mati)."""
+        try:
+            return self.registry.get(model_name, details=details)
+        except Exception:
+            return None
+
+    def _size_label(self, model: Dict) -> str:
+        """Ukuran asli jika model terinstall, selain itu perkiraan dari rekomendasi."""
+        info = self._installed_info(model['name'])
+        if info:
+            return info['size_label']
+        return f"[dim]{model['size']}[/dim]"
+
+    @staticmethod
+    def _details_label(info: Optional[Dict]) -> str:
+        """Parameter, quantization, dan context length dalam satu kolom."""
+        if not info:
+            return "-"
+        parts = [info.get('parameter_size'), info.get('quantization')]
+        if info.get('context_length'):
+            parts.append(f"{info['context_length'] // 1024}k ctx")
+        return " • ".join(p for p in parts if p) or "-"
     
     def show_recommended_models(self, role: str = None):
         """
@@ -95,26 +133,61 @@ class ModelHelper:
         table = Table(show_header=True, header_style="bold cyan")
         table.add_column("Model", style="green")
         table.add_column("Size")
+        table.add_column("Details", style="dim")
         table.add_column("Speed")
+        table.add_column("Benchmark", style="dim")
         table.add_column("Quality")
         table.add_column("Available", style="dim")
         
-        available_models = self.get_available_models()
+        self._prefetch(model['name'] for model in models)
+        bench = self.benchmark_results()
         
         for model in models:
-            is_available = model['name'] in available_models
-            status = "✓" if is_available else "✗"
+            info = self._installed_info(model['name'], details=True)
+            status = "✓" if info else "✗"
+            result = bench.get(info['name'] if info else model['name'])
             
             table.add_row(
                 model['name'],
-                model['size'],
-                model['speed'],
+                self._size_label(model),
+                self._details_label(info),
+                self._speed_label(model, role, result),
+                self._bench_label(result),
                 model['quality'],
                 status
             )
         
         console.print(table)
     
+    def benchmark_results(self) -> Dict[str, Dict]:
+        """Hasil `writebook bench-models` yang tersimpan (model -> hasil)."""
+        return ModelBenchmark(self.client).load_results()
+
+    @staticmethod
+    def _speed_label(model: Dict, role: str, result: Optional[Dict]) -> str:
+        """Token/detik hasil benchmark untuk role ini, atau perkiraan jika belum diukur."""
+        if not result:
+            return f"[dim]{model['speed']}[/dim]"
+        measured = result.get('roles', {}).get(role) or result
+        return f"{measured['tokens_per_sec']:.0f} tok/s"
+
+    @staticmethod
+    def _bench_label(result: Optional[Dict]) -> str:
+        """TTFT, cold load, dan peak memory dari benchmark."""
+        if not result:
+            return "-"
+        parts = [f"TTFT {result['ttft']:.2f}s", f"load {result['cold_load_time']:.1f}s"]
+        if result.get('peak_memory'):
+            parts.append(format_size(result['peak_memory']))
+        return " • ".join(parts)
+
+    def _prefetch(self, model_names):
+        """Ambil detail /api/show model-model ini sekaligus."""
+        try:
+            self.registry.prefetch(list(model_names))
+        except Exception:
+            pass
+
     def validate_models(self, models: Dict[str, str]) -> Dict[str, bool]:
         """
         Validasi ketersediaan models.
@@ -147,7 +220,7 @@ class ModelHelper:
         
         # Cari model yang tersedia dari rekomendasi
         for model in recommended:
-            if model['name'] in available_models and model['name'] != model_name:
+            if model['name'] != model_name and self.check_model_availability(model['name']):
                 return model['name']
         
         # Jika tidak ada dari rekomendasi, ambil model pertama yang tersedia
@@ -166,23 +239,27 @@ class ModelHelper:
         Returns:
             Dict berisi info model atau None
         """
+        installed = self._installed_info(model_name, details=True)
+        
         # Cari di rekomendasi
         for role, models in self.RECOMMENDED_MODELS.items():
             for model in models:
                 if model['name'] == model_name:
                     return {
                         **model,
+                        **(installed or {}),
+                        'size': installed['size_label'] if installed else model['size'],
                         'role': role,
-                        'available': self.check_model_availability(model_name)
+                        'available': installed is not None
                     }
         
-        # Jika tidak di rekomendasi, cek availability saja
-        if self.check_model_availability(model_name):
+        # Jika tidak di rekomendasi, pakai info dari Ollama saja
+        if installed:
             return {
-                'name': model_name,
+                **installed,
                 'available': True,
                 'role': 'unknown',
-                'size': 'Unknown',
+                'size': installed['size_label'],
                 'speed': 'Unknown',
                 'quality': 'Unknown'
             }
@@ -203,8 +280,12 @@ class ModelHelper:
         table = Table(show_header=True, header_style="bold cyan")
         table.add_column("#", style="cyan", width=3)
         table.add_column("Model Name", style="green")
+        table.add_column("Size")
+        table.add_column("Details", style="dim")
         table.add_column("Recommended For", style="dim")
         
+        self._prefetch(available)
+        
         for idx, model_name in enumerate(available, 1):
             # Cari role yang merekomendasikan model ini
             roles = []
@@ -213,7 +294,14 @@ class ModelHelper:
                     roles.append(role.capitalize())
             
             role_str = ", ".join(roles) if roles else "-"
-            table.add_row(str(idx), model_name, role_str)
+            info = self._installed_info(model_name, details=True)
+            table.add_row(
+                str(idx),
+                model_name,
+                info['size_label'] if info else "-",
+                self._details_label(info),
+                role_str
+            )
         
         console.print(table)
     
@@ -287,7 +375,6 @@ class ModelHelper:
         from rich.prompt import Prompt, IntPrompt
         
         models = self.get_all_models_for_role(role)
-        available = self.get_available_models()
         
         console.print(f"\n[bold cyan]Pilih Model untuk {role.upper()}:[/bold cyan]\n")
         
@@ -299,16 +386,18 @@ class ModelHelper:
         table.add_column("Quality")
         table.add_column("Status", style="dim")
         
+        bench = self.benchmark_results()
+        
         for idx, model in enumerate(models, 1):
-            is_available = model['name'] in available
+            is_available = self.check_model_availability(model['name'])
             status = "✓ Ready" if is_available else "✗ Not installed"
             status_style = "green" if is_available else "yellow"
             
             table.add_row(
                 str(idx),
                 model['name'],
-                model['size'],
-                model['speed'],
+                self._size_label(model),
+                self._speed_label(model, role, bench.get(model['name'])),
                 model['quality'],
                 f"[{status_style}]{status}[/{status_style}]"
             )
@@ -327,7 +416,7 @@ class ModelHelper:
             selected = models[choice - 1]
             
             # Check availability
-            if selected['name'] not in available:
+            if not self.check_model_availability(selected['name']):
                 console.print(f"\n[yellow]Warning: Model {selected['name']} belum terinstall[/yellow]")
                 console.print(f"[dim]Jalankan: ollama pull {selected['name']}[/dim]")
                 
@@ -341,6 +430,13 @@ class ModelHelper:
         return None
 
 
-# Singleton instance
-model_helper = ModelHelper()
+# Singleton instance (lazy)
+get_model_helper = lazy_singleton(ModelHelper)
+
+
+def __getattr__(name: str):
+    """Akses `model_helper` tetap didukung, instance dibuat saat pertama dipakai."""
+    if name == "model_helper":
+        return get_model_helper()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
@@ -0,0 +1,207 @@
+"""Cache daftar model Ollama dan detailnya."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from ..config.settings import registry_config
+from .lazy import lazy_singleton
+from .ollama_client import get_ollama_client
+
+
+def normalize_model_name(name: str) -> str:
+    """Nama model dengan tag eksplisit ("gemma3" -> "gemma3:latest")."""
+    return name if ":" in name else f"{name}:latest"
+
+
+def format_size(size_bytes: Optional[int]) -> str:
+    """Ukuran model dalam bentuk singkat (misal "3.3GB")."""
+    if not size_bytes:
+        return "-"
+    if size_bytes >= 1e9:
+        return f"{size_bytes / 1e9:.1f}GB"
+    for unit, factor in (("MB", 1e6), ("KB", 1e3)):
+        if size_bytes >= factor:
+            return f"{size_bytes / factor:.0f}{unit}"
+    return f"{size_bytes}B"
+
+
+def _context_length(model_info: Dict) -> Optional[int]:
+    """Ambil "<arsitektur>.context_length" dari model_info /api/show."""
+    for key, value in model_info.items():
+        if key.endswith(".context_length"):
+            return value
+    return None
+
+
+class ModelRegistry:
+    """
+    Daftar model Ollama yang di-cache dengan TTL.
+
+    /api/tags diambil sekali per `ttl_seconds` (atau di-refresh di
+    background), sehingga pengecekan ketersediaan model tidak memicu
+    request HTTP setiap kali. Detail /api/show di-cache per digest: detail
+    model hanya berubah jika model di-pull ulang.
+    """
+
+    def __init__(self, client=None, ttl: Optional[float] = None):
+        """
+        Initialize registry.
+
+        Args:
+            client: OllamaClient (default: singleton)
+            ttl: Umur daftar model dalam detik (default dari config)
+        """
+        self.client = client or get_ollama_client()
+        self.ttl = registry_config.ttl_seconds if ttl is None else ttl
+        self._entries: Dict[str, Dict] = {}
+        self._details: Dict[str, Dict] = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    def _stale(self) -> bool:
+        return not self._fetched_at or time.monotonic() - self._fetched_at > self.ttl
+
+    def refresh(self) -> Dict[str, Dict]:
+        """
+        Ambil ulang /api/tags.
+
+        Raises:
+            ConnectionError: Jika Ollama tidak bisa dihubungi dan belum ada cache
+        """
+        entries = {entry['model']: entry for entry in self.client.list_model_entries()}
+        with self._lock:
+            self._entries = entries
+            self._fetched_at = time.monotonic()
+        return entries
+
+    def _current(self) -> Dict[str, Dict]:
+        """Entry model, di-refresh jika sudah melewati TTL."""
+        if self._stale():
+            try:
+                return self.refresh()
+            except ConnectionError:
+                if not self._fetched_at:
+                    raise
+                # Ollama sedang tidak bisa dihubungi: pakai daftar terakhir
+        return self._entries
+
+    def invalidate(self):
+        """Paksa refresh pada akses berikutnya (misal setelah pull model)."""
+        with self._lock:
+            self._fetched_at = 0.0
+
+    def names(self) -> List[str]:
+        """Nama semua model yang tersedia."""
+        return list(self._current())
+
+    def has(self, model: str) -> bool:
+        """Apakah model tersedia (nama tanpa tag dianggap :latest)."""
+        entries = self._current()
+        return model in entries or normalize_model_name(model) in entries
+
+    def get(self, model: str, details: bool = True) -> Optional[Dict]:
+        """
+        Info model yang tersedia.
+
+        Args:
+            model: Nama model
+            details: Ambil juga /api/show (context length, capabilities)
+
+        Returns:
+            Dictionary {name, size, size_label, digest, family, families,
+            parameter_size, quantization, context_length, capabilities},
+            atau None jika model tidak ada
+        """
+        entries = self._current()
+        entry = entries.get(model) or entries.get(normalize_model_name(model))
+        if entry is None:
+            return None
+
+        details = entry.get('details') or {}
+        info = {
+            'name': entry['model'],
+            'size': entry.get('size') or 0,
+            'size_label': self.size_label(entry),
+            'digest': entry.get('digest', ''),
+            'family': details.get('family'),
+            'families': details.get('families') or [],
+            'parameter_size': details.get('parameter_size'),
+            'quantization': details.get('quantization_level'),
+            'context_length': None,
+            'capabilities': [],
+        }
+        show = self._show(entry) if details and registry_config.fetch_details else None
+        if show:
+            info['context_length'] = _context_length(show.get('model_info') or {})
+            info['capabilities'] = show.get('capabilities') or []
+            info['families'] = (show.get('details') or {}).get('families') or info['families']
+        return info
+
+    @staticmethod
+    def size_label(entry: Dict) -> str:
+        """Ukuran model dari entry /api/tags ("cloud" untuk model cloud)."""
+        if "cloud" in entry['model'] or entry.get('remote_host'):
+            return "cloud"
+        return format_size(entry.get('size'))
+
+    def _show(self, entry: Dict) -> Optional[Dict]:
+        """Detail /api/show, di-cache per digest."""
+        key = entry.get('digest') or entry['model']
+        if key in self._details:
+            return self._details[key]
+        try:
+            show = self.client.show_model(entry['model'])
+        except Exception:
+            return None
+        with self._lock:
+            self._details[key] = show
+        return show
+
+    def prefetch(self, models: Iterable[str]):
+        """Ambil detail beberapa model sekaligus (paralel) untuk tabel model."""
+        if not registry_config.fetch_details:
+            return
+        entries = self._current()
+        names = {model if model in entries else normalize_model_name(model) for model in models}
+        pending = [
+            entries[name] for name in names
+            if name in entries and (entries[name].get('digest') or name) not in self._details
+        ]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(8, len(pending))) as executor:
+                list(executor.map(self._show, pending))
+
+    def start_background_refresh(self, interval: Optional[float] = None):
+        """
+        Refresh daftar model di background thread.
+
+        Args:
+            interval: Detik antar refresh (default: registry_config.refresh_interval)
+        """
+        interval = registry_config.refresh_interval if interval is None else interval
+        if not interval or self._refresh_thread is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.refresh()
+                except ConnectionError:
+                    pass
+                time.sleep(interval)
+
+        self._refresh_thread = threading.Thread(target=loop, name="model-registry", daemon=True)
+        self._refresh_thread.start()
+
+
+def _create_registry() -> ModelRegistry:
+    registry = ModelRegistry()
+    registry.start_background_refresh()
+    return registry
+
+
+# Singleton instance (lazy)
+get_model_registry = lazy_singleton(_create_registry)
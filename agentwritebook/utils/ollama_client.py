@@ -1,16 +1,267 @@
 """Wrapper untuk Ollama client dengan konfigurasi custom."""
 
-from ollama import Client
-from typing import Dict, List, Optional, Generator
-from ..config.settings import ollama_config
+import asyncio
+import queue
+import threading
+import time
+from contextlib import contextmanager
+import httpx
+from ollama import AsyncClient, Client
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Generator
+from ..config.settings import cache_config, ollama_config
+from .endpoint_pool import EndpointPool, get_endpoint_pool
+from .errors import OllamaTimeoutError
+from .lazy import lazy_singleton
+from .response_cache import response_cache
+from .retry import retry_manager
+
+# Penanda akhir stream dari thread pembaca
+_STREAM_END = object()
+
+
+class _StreamFailure:
+    """Exception dari thread pembaca stream, diteruskan ke consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _http_timeout() -> httpx.Timeout:
+    """
+    Timeout httpx sebagai batas terakhir untuk thread yang menunggu server.
+
+    Deadline per call ditegakkan oleh watchdog; read timeout di sini hanya
+    memastikan koneksi yang menggantung akhirnya ditutup.
+    """
+    longest = max([ollama_config.timeout, *ollama_config.role_timeouts.values()])
+    return httpx.Timeout(longest, connect=ollama_config.connect_timeout)
+
+
+def _call_with_deadline(
+    fn: Callable,
+    model: str,
+    timeout: Optional[float],
+    on_timeout: Optional[Callable] = None
+):
+    """
+    Jalankan call non-streaming dengan deadline.
+
+    Call dijalankan di thread daemon; jika belum selesai setelah `timeout`
+    detik, OllamaTimeoutError di-raise dan thread dibiarkan selesai sendiri
+    (dibatasi oleh timeout httpx).
+    """
+    if not timeout:
+        return fn()
+
+    result = queue.Queue(maxsize=1)
+
+    def run():
+        try:
+            result.put((True, fn()))
+        except BaseException as e:
+            result.put((False, e))
+
+    threading.Thread(target=run, name="ollama-call", daemon=True).start()
+    try:
+        ok, value = result.get(timeout=timeout)
+    except queue.Empty:
+        if on_timeout:
+            on_timeout()
+        raise OllamaTimeoutError(model, "deadline", timeout) from None
+    if not ok:
+        raise value
+    return value
+
+
+def _watch_stream(
+    start: Callable,
+    model: str,
+    timeout: Optional[float],
+    stall_timeout: Optional[float],
+    on_timeout: Optional[Callable] = None
+) -> Generator:
+    """
+    Baca stream di thread terpisah dengan deadline dan stall watchdog.
+
+    Sebelum chunk pertama hanya deadline yang berlaku (model mungkin masih
+    di-load); setelah itu stream dibatalkan jika tidak ada chunk baru
+    selama `stall_timeout` detik.
+    """
+    chunks = queue.Queue()
+    stop = threading.Event()
+
+    def pump():
+        try:
+            stream = start()
+            for chunk in stream:
+                if stop.is_set():
+                    stream.close()
+                    return
+                chunks.put(chunk)
+            chunks.put(_STREAM_END)
+        except BaseException as e:
+            chunks.put(_StreamFailure(e))
+
+    threading.Thread(target=pump, name="ollama-stream", daemon=True).start()
+
+    started = time.monotonic()
+    received = False
+    try:
+        while True:
+            remaining = timeout - (time.monotonic() - started) if timeout else None
+            stalling = received and stall_timeout and (remaining is None or stall_timeout < remaining)
+            wait = stall_timeout if stalling else remaining
+            if wait is not None and wait <= 0:
+                raise OllamaTimeoutError(model, "deadline", timeout)
+            try:
+                item = chunks.get(timeout=wait)
+            except queue.Empty:
+                if stalling:
+                    raise OllamaTimeoutError(model, "stall", stall_timeout) from None
+                raise OllamaTimeoutError(model, "deadline", timeout) from None
+
+            if item is _STREAM_END:
+                return
+            if isinstance(item, _StreamFailure):
+                raise item.error
+            received = True
+            yield item
+    except OllamaTimeoutError:
+        if on_timeout:
+            on_timeout()
+        raise
+    finally:
+        stop.set()
+
+
+async def _awatch_stream(
+    stream: AsyncIterator,
+    model: str,
+    timeout: Optional[float],
+    stall_timeout: Optional[float],
+    on_timeout: Optional[Callable] = None
+) -> AsyncIterator[Dict]:
+    """Versi async dari _watch_stream."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    received = False
+    while True:
+        remaining = timeout - (loop.time() - started) if timeout else None
+        stalling = received and stall_timeout and (remaining is None or stall_timeout < remaining)
+        wait = stall_timeout if stalling else remaining
+        if wait is not None and wait <= 0:
+            raise OllamaTimeoutError(model, "deadline", timeout)
+        try:
+            chunk = await asyncio.wait_for(stream.__anext__(), wait)
+        except StopAsyncIteration:
+            return
+        except asyncio.TimeoutError:
+            if on_timeout:
+                on_timeout()
+            if stalling:
+                raise OllamaTimeoutError(model, "stall", stall_timeout) from None
+            raise OllamaTimeoutError(model, "deadline", timeout) from None
+        received = True
+        yield chunk
 
 
 class OllamaClient:
-    """Custom Ollama client dengan konfigurasi."""
+    """
+    Custom Ollama client dengan konfigurasi.
+
+    Request dirutekan lewat EndpointPool: dengan satu server perilakunya
+    sama seperti client biasa, dengan beberapa server (OllamaConfig.endpoints)
+    setiap call dikirim ke server sehat yang punya model, mengutamakan
+    server yang sudah me-load model lalu yang request aktifnya paling sedikit.
+    """
+
+    def __init__(self, host: Optional[str] = None, hosts: Optional[List[str]] = None):
+        """
+        Initialize Ollama client.
+
+        Args:
+            host: Override base URL (satu server)
+            hosts: Override daftar server (default: ollama_config.endpoint_urls())
+        """
+        if host or hosts:
+            self.pool = EndpointPool(hosts or [host])
+        else:
+            self.pool = get_endpoint_pool()
+        self._clients = {
+            url: Client(host=url, timeout=_http_timeout()) for url in self.pool.urls
+        }
+
+    @property
+    def host(self) -> str:
+        """Base URL server pertama."""
+        return self.pool.urls[0]
+
+    @contextmanager
+    def _on_endpoint(self, url: str, model: str):
+        """Hitung request aktif di endpoint dan tandai tidak sehat jika koneksi gagal."""
+        try:
+            with self.pool.track(url, model):
+                yield
+        except (ConnectionError, httpx.TransportError):
+            self.pool.mark_unhealthy(url)
+            raise
+
+    def _request(
+        self,
+        method: str,
+        model: str,
+        stream: bool,
+        timeout: Optional[float],
+        stall_timeout: Optional[float],
+        **payload
+    ) -> Dict | Generator:
+        """
+        Kirim request chat/generate dengan routing, retry, dan deadline.
+
+        Args:
+            method: "chat" atau "generate"
+            model: Nama model
+            stream: Apakah menggunakan streaming
+            timeout: Deadline total call (default: ollama_config.timeout)
+            stall_timeout: Batas detik tanpa chunk baru saat streaming
+            **payload: Argumen request (messages/prompt, options, keep_alive)
+
+        Returns:
+            Response atau Generator chunk
+        """
+        timeout = ollama_config.timeout if timeout is None else timeout
+        stall_timeout = ollama_config.stall_timeout if stall_timeout is None else stall_timeout
+        chosen = []
+
+        def pick() -> str:
+            chosen.append(self.pool.select(model))
+            return chosen[-1]
+
+        def on_timeout():
+            if chosen:
+                retry_manager.record_failure(chosen[-1], model)
+
+        def send(url: str):
+            return getattr(self._clients[url], method)(model=model, stream=stream, **payload)
+
+        if stream:
+            def start(url: str):
+                with self._on_endpoint(url, model):
+                    yield from send(url)
+
+            return _watch_stream(
+                lambda: retry_manager.stream(pick, model, start),
+                model, timeout, stall_timeout, on_timeout
+            )
+
+        def call(url: str):
+            with self._on_endpoint(url, model):
+                return send(url)
 
-    def __init__(self):
-        """Initialize Ollama client."""
-        self.client = Client(host=ollama_config.base_url)
+        return _call_with_deadline(
+            lambda: retry_manager.call(pick, model, call),
+            model, timeout, on_timeout
+        )
 
     def chat(
         self,
@@ -18,6 +269,9 @@ class OllamaClient:
         messages: List[Dict[str, str]],
         stream: bool = False,
         temperature: float = 0.7,
+        cache: bool = False,
+        timeout: Optional[float] = None,
+        stall_timeout: Optional[float] = None,
         **kwargs
     ) -> Dict | Generator:
         """
@@ -28,7 +282,11 @@ class OllamaClient:
             messages: List of messages (role, content)
             stream: Apakah menggunakan streaming
             temperature: Temperature untuk generasi (0.0-1.0)
-            **kwargs: Parameter tambahan untuk Ollama
+            cache: Gunakan response cache (stream disimpan setelah selesai)
+            timeout: Deadline total call dalam detik (default: ollama_config.timeout)
+            stall_timeout: Batas detik tanpa chunk baru saat streaming
+            **kwargs: Parameter tambahan untuk Ollama (options, keep_alive,
+                format: "json" atau JSON schema untuk structured output)
 
         Returns:
             Response dari Ollama atau Generator jika streaming
@@ -38,13 +296,27 @@ class OllamaClient:
             **kwargs.get("options", {})
         }
 
+        use_cache = _use_cache(cache, temperature)
+        if use_cache:
+            key = response_cache.make_key("chat", model, messages, _cache_options(options, kwargs))
+            cached = response_cache.get(key)
+            if cached is not None:
+                cached['cached'] = True
+                # Stream dari cache: satu chunk final berisi seluruh teks
+                return iter([cached]) if stream else cached
+
         try:
-            response = self.client.chat(
-                model=model,
+            response = self._request(
+                "chat", model, stream, timeout, stall_timeout,
                 messages=messages,
-                stream=stream,
-                options=options
+                options=options,
+                keep_alive=kwargs.get("keep_alive"),
+                format=kwargs.get("format")
             )
+            if use_cache:
+                if stream:
+                    return _caching_stream(response, key, model)
+                response_cache.put(key, model, response)
             return response
         except Exception as e:
             print(f"Error dalam chat: {e}")
@@ -56,6 +328,9 @@ class OllamaClient:
         prompt: str,
         stream: bool = False,
         temperature: float = 0.7,
+        cache: bool = False,
+        timeout: Optional[float] = None,
+        stall_timeout: Optional[float] = None,
         **kwargs
     ) -> Dict | Generator:
         """
@@ -66,7 +341,11 @@ class OllamaClient:
             prompt: Prompt untuk generate
             stream: Apakah menggunakan streaming
             temperature: Temperature untuk generasi (0.0-1.0)
-            **kwargs: Parameter tambahan untuk Ollama
+            cache: Gunakan response cache (hanya untuk non-streaming)
+            timeout: Deadline total call dalam detik (default: ollama_config.timeout)
+            stall_timeout: Batas detik tanpa chunk baru saat streaming
+            **kwargs: Parameter tambahan untuk Ollama (options, keep_alive,
+                format: "json" atau JSON schema untuk structured output)
 
         Returns:
             Response dari Ollama atau Generator jika streaming
@@ -76,27 +355,463 @@ class OllamaClient:
             **kwargs.get("options", {})
         }
 
+        use_cache = not stream and _use_cache(cache, temperature)
+        if use_cache:
+            key = response_cache.make_key("generate", model, prompt, _cache_options(options, kwargs))
+            cached = response_cache.get(key)
+            if cached is not None:
+                cached['cached'] = True
+                return cached
+
         try:
-            response = self.client.generate(
-                model=model,
+            response = self._request(
+                "generate", model, stream, timeout, stall_timeout,
                 prompt=prompt,
-                stream=stream,
-                options=options
+                options=options,
+                keep_alive=kwargs.get("keep_alive"),
+                format=kwargs.get("format")
             )
+            if use_cache:
+                response_cache.put(key, model, response)
             return response
         except Exception as e:
             print(f"Error dalam generate: {e}")
             raise
 
+    def unload_model(self, model: str):
+        """
+        Keluarkan model dari memori Ollama (keep_alive=0) di server yang me-load-nya.
+
+        Args:
+            model: Nama model
+        """
+        urls = self.pool.urls
+        if len(urls) > 1:
+            # Request unload ke server yang belum me-load model justru memicu load
+            urls = self.pool.loaded_on(model)
+
+        for url in urls:
+            try:
+                self._clients[url].generate(model=model, keep_alive=0)
+                self.pool.mark_unloaded(url, model)
+            except Exception as e:
+                print(f"Error unloading model {model} @ {url}: {e}")
+
+    def list_model_entries(self) -> List[Dict]:
+        """
+        Entry /api/tags semua server (name, size, digest, details).
+
+        Model yang ada di beberapa server hanya muncul sekali; key
+        'endpoints' berisi server yang punya model tersebut.
+
+        Raises:
+            ConnectionError: Jika tidak ada server yang bisa dihubungi
+        """
+        entries: Dict[str, Dict] = {}
+        errors = []
+        for url, client in self._clients.items():
+            try:
+                models = client.list()
+            except Exception as e:
+                errors.append(f"{url}: {e}")
+                continue
+            for model in models.get('models', []):
+                entry = _as_dict(model)
+                # ollama>=0.4 memakai key 'model', versi lama memakai 'name'
+                name = entry.get('model') or entry.get('name')
+                entries.setdefault(name, {**entry, 'model': name, 'endpoints': []})
+                entries[name]['endpoints'].append(url)
+
+        if errors and not entries:
+            raise ConnectionError("; ".join(errors))
+        return list(entries.values())
+
     def list_models(self) -> List[str]:
-        """List semua model yang tersedia."""
+        """List semua model yang tersedia (gabungan semua server)."""
         try:
-            models = self.client.list()
-            return [model['name'] for model in models.get('models', [])]
-        except Exception as e:
+            return [entry['model'] for entry in self.list_model_entries()]
+        except ConnectionError as e:
             print(f"Error listing models: {e}")
             return []
 
+    def running_models(self) -> List[Dict]:
+        """
+        Model yang sedang di-load di semua server (/api/ps).
+
+        Returns:
+            List entry (model, size, size_vram, ...) dengan key 'endpoint'
+        """
+        running = []
+        for url, client in self._clients.items():
+            try:
+                models = client.ps()
+            except Exception:
+                continue
+            for model in models.get('models', []):
+                entry = _as_dict(model)
+                entry['model'] = entry.get('model') or entry.get('name')
+                entry['endpoint'] = url
+                running.append(entry)
+        return running
+
+    def show_model(self, model: str) -> Dict:
+        """
+        Detail model dari /api/show (details, model_info, capabilities).
+
+        Args:
+            model: Nama model
+
+        Returns:
+            Dictionary respons /api/show
+        """
+        return _as_dict(self._clients[self.pool.select(model)].show(model))
+
+
+def _use_cache(cache: bool, temperature: float) -> bool:
+    """Cache hanya dipakai untuk agent yang opt-in dan call dengan temperature rendah."""
+    return cache and cache_config.enabled and temperature <= cache_config.max_temperature
+
+
+def _cache_options(options: Dict, kwargs: Dict) -> Dict:
+    """Options untuk cache key; format ikut dihitung agar output terstruktur tidak tertukar."""
+    if kwargs.get("format"):
+        return {**options, "format": kwargs["format"]}
+    return options
+
+
+def _caching_stream(stream: Iterator, key: str, model: str) -> Iterator:
+    """Teruskan chunk stream, lalu simpan respons lengkap ke cache jika stream selesai."""
+    parts = []
+    for chunk in stream:
+        content = chunk.get('message', {}).get('content')
+        if content:
+            parts.append(content)
+        if chunk.get('done'):
+            final = _as_dict(chunk)
+            final.setdefault('message', {"role": "assistant"})['content'] = "".join(parts)
+            response_cache.put(key, model, final)
+        yield chunk
+
+
+async def _acaching_stream(stream: AsyncIterator, key: str, model: str) -> AsyncIterator:
+    """Versi async dari _caching_stream."""
+    parts = []
+    async for chunk in stream:
+        content = chunk.get('message', {}).get('content')
+        if content:
+            parts.append(content)
+        if chunk.get('done'):
+            final = _as_dict(chunk)
+            final.setdefault('message', {"role": "assistant"})['content'] = "".join(parts)
+            response_cache.put(key, model, final)
+        yield chunk
+
+
+def _as_dict(value) -> Dict:
+    """Respons ollama (pydantic atau dict) sebagai dict biasa."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", by_alias=True, exclude_none=True)
+    return dict(value)
+
+
+class AsyncOllamaClient:
+    """
+    Async Ollama client dengan connection pool bersama.
+
+    Semua request memakai httpx pool (keep-alive) per server dan dibatasi
+    oleh semaphore max-in-flight, sehingga ratusan coroutine bisa memanggil
+    model dari satu proses tanpa membuat ratusan thread. Pool dibuat per
+    event loop karena httpx.AsyncClient tidak bisa dipakai lintas loop.
+    Routing ke beberapa server sama seperti OllamaClient (EndpointPool).
+    """
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        keepalive_connections: Optional[int] = None,
+        hosts: Optional[List[str]] = None
+    ):
+        """
+        Initialize async client.
+
+        Args:
+            max_in_flight: Maksimal request bersamaan (default dari config)
+            keepalive_connections: Jumlah koneksi keep-alive di pool per server
+            hosts: Override daftar server (default: ollama_config.endpoint_urls())
+        """
+        self.max_in_flight = max_in_flight or ollama_config.max_in_flight
+        self.keepalive_connections = (
+            keepalive_connections or ollama_config.keepalive_connections
+        )
+        self.pool = EndpointPool(hosts) if hosts else get_endpoint_pool()
+        self._loop = None
+        self._clients: Dict[str, AsyncClient] = {}
+        self._semaphore = None
+
+    async def _ensure_clients(self) -> Dict[str, AsyncClient]:
+        """
+        Buat AsyncClient per server dan semaphore untuk event loop yang sedang berjalan.
+
+        Client dari event loop sebelumnya (misal asyncio.run sebelumnya)
+        ditutup agar connection pool-nya tidak bocor.
+        """
+        loop = asyncio.get_running_loop()
+        if not self._clients or self._loop is not loop:
+            stale = list(self._clients.values())
+            self._loop = loop
+            self._clients = {
+                url: AsyncClient(
+                    host=url,
+                    timeout=_http_timeout(),
+                    limits=httpx.Limits(
+                        max_connections=self.max_in_flight,
+                        max_keepalive_connections=self.keepalive_connections
+                    )
+                )
+                for url in self.pool.urls
+            }
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            await self._close_clients(stale)
+        return self._clients
+
+    @staticmethod
+    async def _close_clients(clients: List[AsyncClient]):
+        """Tutup client; error dari koneksi milik event loop yang sudah ditutup diabaikan."""
+        for client in clients:
+            try:
+                await client.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _build_options(temperature: float, kwargs: Dict) -> Dict:
+        """Gabungkan temperature dengan options tambahan."""
+        return {
+            "temperature": temperature,
+            **kwargs.get("options", {})
+        }
+
+    @staticmethod
+    def _timeouts(kwargs: Dict) -> tuple:
+        """Deadline dan stall timeout dari kwargs (default dari config)."""
+        timeout = kwargs.get("timeout")
+        stall_timeout = kwargs.get("stall_timeout")
+        return (
+            ollama_config.timeout if timeout is None else timeout,
+            ollama_config.stall_timeout if stall_timeout is None else stall_timeout
+        )
+
+    async def _request(self, method: str, model: str, kwargs: Dict, **payload) -> Dict:
+        """Request non-streaming dengan routing, retry, dan deadline."""
+        clients = await self._ensure_clients()
+        timeout, _ = self._timeouts(kwargs)
+        chosen = []
+
+        def pick() -> str:
+            chosen.append(self.pool.select(model))
+            return chosen[-1]
+
+        async def call(url: str):
+            try:
+                with self.pool.track(url, model):
+                    return await getattr(clients[url], method)(
+                        model=model,
+                        stream=False,
+                        options=self._build_options(kwargs.get("temperature", 0.7), kwargs),
+                        keep_alive=kwargs.get("keep_alive"),
+                        format=kwargs.get("format"),
+                        **payload
+                    )
+            except (ConnectionError, httpx.TransportError):
+                self.pool.mark_unhealthy(url)
+                raise
+
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(
+                    retry_manager.acall(pick, model, call), timeout or None
+                )
+            except asyncio.TimeoutError:
+                if chosen:
+                    retry_manager.record_failure(chosen[-1], model)
+                raise OllamaTimeoutError(model, "deadline", timeout) from None
+
+    async def _stream(self, method: str, model: str, kwargs: Dict, **payload) -> AsyncIterator[Dict]:
+        """Request streaming dengan routing, retry, dan stall watchdog."""
+        clients = await self._ensure_clients()
+        timeout, stall_timeout = self._timeouts(kwargs)
+        chosen = []
+
+        def pick() -> str:
+            chosen.append(self.pool.select(model))
+            return chosen[-1]
+
+        async def start(url: str):
+            async def tracked():
+                try:
+                    with self.pool.track(url, model):
+                        stream = await getattr(clients[url], method)(
+                            model=model,
+                            stream=True,
+                            options=self._build_options(kwargs.get("temperature", 0.7), kwargs),
+                            keep_alive=kwargs.get("keep_alive"),
+                            format=kwargs.get("format"),
+                            **payload
+                        )
+                        async for chunk in stream:
+                            yield chunk
+                except (ConnectionError, httpx.TransportError):
+                    self.pool.mark_unhealthy(url)
+                    raise
+            return tracked()
+
+        def on_timeout():
+            if chosen:
+                retry_manager.record_failure(chosen[-1], model)
+
+        async with self._semaphore:
+            stream = retry_manager.astream(pick, model, start)
+            async for chunk in _awatch_stream(stream, model, timeout, stall_timeout, on_timeout):
+                yield chunk
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        cache: bool = False,
+        **kwargs
+    ) -> Dict:
+        """
+        Chat dengan model (non-streaming).
+
+        Args:
+            model: Nama model yang digunakan
+            messages: List of messages (role, content)
+            temperature: Temperature untuk generasi (0.0-1.0)
+            cache: Gunakan response cache (key sama dengan OllamaClient.chat)
+            **kwargs: Parameter tambahan untuk Ollama (termasuk timeout)
+
+        Returns:
+            Response dari Ollama
+        """
+        use_cache = _use_cache(cache, temperature)
+        if use_cache:
+            key = response_cache.make_key(
+                "chat", model, messages,
+                _cache_options(self._build_options(temperature, kwargs), kwargs)
+            )
+            cached = response_cache.get(key)
+            if cached is not None:
+                cached['cached'] = True
+                return cached
+
+        try:
+            response = await self._request(
+                "chat", model, {**kwargs, "temperature": temperature}, messages=messages
+            )
+        except Exception as e:
+            print(f"Error dalam async chat: {e}")
+            raise
+        if use_cache:
+            response_cache.put(key, model, response)
+        return response
+
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        cache: bool = False,
+        **kwargs
+    ) -> AsyncIterator[Dict]:
+        """
+        Chat dengan streaming, yield chunk satu per satu.
+
+        Slot max-in-flight dipegang selama stream berlangsung. Dengan
+        `cache`, cache hit dikirim sebagai satu chunk final berisi seluruh
+        teks dan stream yang selesai disimpan ke cache.
+        """
+        use_cache = _use_cache(cache, temperature)
+        if use_cache:
+            key = response_cache.make_key(
+                "chat", model, messages,
+                _cache_options(self._build_options(temperature, kwargs), kwargs)
+            )
+            cached = response_cache.get(key)
+            if cached is not None:
+                cached['cached'] = True
+                yield cached
+                return
+
+        stream = self._stream("chat", model, {**kwargs, "temperature": temperature}, messages=messages)
+        if use_cache:
+            stream = _acaching_stream(stream, key, model)
+        try:
+            async for chunk in stream:
+                yield chunk
+        except Exception as e:
+            print(f"Error dalam async chat stream: {e}")
+            raise
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> Dict:
+        """
+        Generate text dari prompt (non-streaming).
+
+        Args:
+            model: Nama model yang digunakan
+            prompt: Prompt untuk generate
+            temperature: Temperature untuk generasi (0.0-1.0)
+            **kwargs: Parameter tambahan untuk Ollama (termasuk timeout)
+
+        Returns:
+            Response dari Ollama
+        """
+        try:
+            return await self._request("generate", model, {**kwargs, "temperature": temperature}, prompt=prompt)
+        except Exception as e:
+            print(f"Error dalam async generate: {e}")
+            raise
+
+    async def generate_stream(
+        self,
+        model: str,
+        prompt: str,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncIterator[Dict]:
+        """Generate text dengan streaming, yield chunk satu per satu."""
+        try:
+            async for chunk in self._stream(
+                "generate", model, {**kwargs, "temperature": temperature}, prompt=prompt
+            ):
+                yield chunk
+        except Exception as e:
+            print(f"Error dalam async generate stream: {e}")
+            raise
+
+    async def aclose(self):
+        """Tutup connection pool."""
+        clients, self._clients = list(self._clients.values()), {}
+        self._loop = None
+        await self._close_clients(clients)
+
+
+# Singleton instances (lazy)
+get_ollama_client = lazy_singleton(OllamaClient)
+get_async_ollama_client = lazy_singleton(AsyncOllamaClient)
+
 
-# Singleton instance
-ollama_client = OllamaClient()
+def __getattr__(name: str):
+    """Akses `ollama_client`, `async_ollama_client` tetap didukung, instance dibuat saat pertama dipakai."""
+    if name == "ollama_client":
+        return get_ollama_client()
+    if name == "async_ollama_client":
+        return get_async_ollama_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,205 @@
+"""Cache respons Ollama di disk untuk pemanggilan yang berulang."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import cache_config
+
+
+class ResponseCache:
+    """
+    Content-addressed cache berbasis SQLite.
+
+    Key adalah hash dari endpoint + model + messages/prompt + options,
+    sehingga hanya pemanggilan yang identik byte-per-byte yang di-reuse.
+    Entry yang lebih tua dari TTL dianggap miss, dan jika total ukuran
+    melewati batas, entry yang paling lama tidak diakses dihapus (LRU).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_size_mb: Optional[float] = None,
+        ttl_seconds: Optional[int] = None
+    ):
+        """
+        Initialize cache. Database baru dibuat saat pertama kali dipakai.
+
+        Args:
+            path: Lokasi file SQLite (default dari config)
+            max_size_mb: Batas ukuran total cache dalam MB
+            ttl_seconds: Umur maksimal entry (0 = tidak kadaluarsa)
+        """
+        self.path = Path(path or cache_config.path).expanduser()
+        self.max_size_bytes = int((max_size_mb or cache_config.max_size_mb) * 1024 * 1024)
+        self.ttl_seconds = cache_config.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Buka koneksi database (lazy)."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed"
+                " ON responses (accessed_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def make_key(endpoint: str, model: str, payload: Any, options: Dict) -> str:
+        """
+        Buat cache key dari parameter request.
+
+        Args:
+            endpoint: "chat" atau "generate"
+            model: Nama model
+            payload: Messages (chat) atau prompt (generate)
+            options: Options Ollama (temperature, num_ctx, dll)
+
+        Returns:
+            SHA-256 hex digest
+        """
+        raw = json.dumps(
+            {"endpoint": endpoint, "model": model, "payload": payload, "options": options},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Ambil respons dari cache.
+
+        Returns:
+            Respons (dict) atau None jika miss/kadaluarsa
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                self.misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            conn.commit()
+            self.hits += 1
+
+        return json.loads(value)
+
+    def put(self, key: str, model: str, response: Any):
+        """
+        Simpan respons ke cache lalu evict jika melebihi batas ukuran.
+
+        Args:
+            key: Cache key dari make_key
+            model: Nama model (untuk statistik)
+            response: Respons Ollama (dict atau pydantic model)
+        """
+        if hasattr(response, 'model_dump'):
+            response = response.model_dump()
+        value = json.dumps(response, ensure_ascii=False, default=str)
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, model, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, value, len(value.encode('utf-8')), now, now)
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Hapus entry least-recently-used sampai total ukuran di bawah batas."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        rows: List = conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_size_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self) -> int:
+        """
+        Hapus semua entry.
+
+        Returns:
+            Jumlah entry yang dihapus
+        """
+        with self._lock:
+            conn = self._connect()
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+            conn.execute("VACUUM")
+        return count
+
+    def stats(self) -> Dict:
+        """
+        Statistik cache.
+
+        Returns:
+            Dictionary berisi hits, misses, evictions, entries, size_mb
+        """
+        with self._lock:
+            conn = self._connect()
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_mb': round(size / (1024 * 1024), 2),
+            'path': str(self.path)
+        }
+
+
+# Singleton instance
+response_cache = ResponseCache()
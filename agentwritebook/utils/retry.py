@@ -0,0 +1,316 @@
+"""Retry dengan exponential backoff dan circuit breaker per model/host."""
+
+import asyncio
+import random
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Generator, Iterator, Optional, Tuple, Union
+
+from ..config.settings import retry_config
+from .errors import CircuitOpenError, OllamaRateLimitError, OllamaTimeoutError, classify_error
+
+# Host tetap, atau callable yang memilih host untuk setiap percobaan
+HostPicker = Union[str, Callable[[], str]]
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker untuk satu kombinasi model + host.
+
+    Setelah `threshold` kegagalan beruntun breaker terbuka dan semua call
+    langsung gagal selama `cooldown` detik. Setelah itu satu call percobaan
+    (half-open) diizinkan: jika berhasil breaker tertutup lagi, jika gagal
+    breaker kembali terbuka.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        """
+        Initialize breaker dalam keadaan tertutup.
+
+        Args:
+            threshold: Kegagalan beruntun sebelum breaker terbuka
+            cooldown: Detik breaker terbuka sebelum call percobaan
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> Optional[float]:
+        """
+        Cek apakah call boleh dijalankan.
+
+        Returns:
+            None jika boleh, atau detik yang tersisa sebelum boleh mencoba
+        """
+        with self._lock:
+            if self.state == "closed":
+                return None
+            remaining = self.cooldown - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                return remaining
+            if self._probing:
+                # Call percobaan lain sedang berjalan
+                return 1.0
+            self.state = "half_open"
+            self._probing = True
+            return None
+
+    def available(self) -> bool:
+        """Apakah call akan diizinkan sekarang (tanpa mengubah state)."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            return not self._probing and time.monotonic() - self._opened_at >= self.cooldown
+
+    def record_success(self):
+        """Call berhasil: tutup breaker."""
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """
+        Call gagal karena backend bermasalah.
+
+        Returns:
+            True jika kegagalan ini membuka breaker
+        """
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.threshold):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+
+class RetryManager:
+    """
+    Jalankan call ke Ollama dengan retry, backoff, dan circuit breaker.
+
+    Error diklasifikasi lewat classify_error: error transient (koneksi,
+    5xx, model loading, 429) diulang dengan jittered exponential backoff,
+    error request (4xx) langsung di-raise. Stream hanya diulang sebelum
+    chunk pertama diterima agar output tidak terduplikasi.
+    """
+
+    def __init__(self):
+        """Initialize manager tanpa breaker dan metrics kosong."""
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        """Mulai penghitungan metrics baru (dipanggil di awal setiap buku)."""
+        with self._lock:
+            self.metrics = {
+                "retries": 0,
+                "retries_by_kind": {},
+                "retry_wait": 0.0,
+                "failures": 0,
+                "breaker_trips": 0,
+                "fail_fast": 0,
+            }
+
+    def summary(self) -> Dict:
+        """Salinan metrics retry."""
+        with self._lock:
+            return {
+                **self.metrics,
+                "retries_by_kind": dict(self.metrics["retries_by_kind"]),
+                "retry_wait": round(self.metrics["retry_wait"], 2),
+            }
+
+    def breaker(self, host: str, model: str) -> CircuitBreaker:
+        """Breaker untuk model di host tertentu."""
+        key = (host, model)
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(
+                    retry_config.breaker_threshold, retry_config.breaker_cooldown
+                )
+            return self._breakers[key]
+
+    def record_failure(self, host: str, model: str):
+        """Catat kegagalan yang terdeteksi di luar manager (misal stall watchdog)."""
+        tripped = self.breaker(host, model).record_failure()
+        with self._lock:
+            self.metrics["failures"] += 1
+            if tripped:
+                self.metrics["breaker_trips"] += 1
+
+    def _check_breaker(self, host: str, model: str):
+        """Raise CircuitOpenError jika breaker sedang terbuka."""
+        retry_after = self.breaker(host, model).before_call()
+        if retry_after is not None:
+            with self._lock:
+                self.metrics["fail_fast"] += 1
+            raise CircuitOpenError(model, host, retry_after)
+
+    def _handle_error(self, host: str, model: str, error: BaseException, attempt: int) -> Optional[float]:
+        """
+        Klasifikasi error dan tentukan delay sebelum retry.
+
+        Returns:
+            Delay dalam detik, atau None jika error tidak perlu diulang
+        """
+        retryable = getattr(error, "retryable", False)
+        if retryable or isinstance(error, OllamaTimeoutError):
+            self.record_failure(host, model)
+        else:
+            # Server menjawab (misal 404 model tidak ada): backend sehat
+            self.breaker(host, model).record_success()
+
+        attempts = retry_config.max_attempts if retry_config.enabled else 1
+        if not retryable or attempt + 1 >= attempts:
+            return None
+
+        delay = random.uniform(0, min(retry_config.max_delay, retry_config.base_delay * 2 ** attempt))
+        if isinstance(error, OllamaRateLimitError):
+            delay = max(delay, retry_config.rate_limit_delay)
+
+        with self._lock:
+            self.metrics["retries"] += 1
+            by_kind = self.metrics["retries_by_kind"]
+            by_kind[error.kind] = by_kind.get(error.kind, 0) + 1
+            self.metrics["retry_wait"] += delay
+        return delay
+
+    def call(self, host: HostPicker, model: str, fn: Callable[[str], object]):
+        """
+        Jalankan call non-streaming dengan retry.
+
+        Args:
+            host: Base URL server, atau callable yang memilih server per percobaan
+                (retry bisa pindah ke server lain)
+            model: Nama model
+            fn: Callable yang melakukan request ke host yang diberikan
+
+        Returns:
+            Hasil fn
+        """
+        attempt = 0
+        while True:
+            target = host() if callable(host) else host
+            self._check_breaker(target, model)
+            try:
+                result = fn(target)
+            except Exception as e:
+                error = classify_error(e, model)
+                delay = self._handle_error(target, model, error, attempt)
+                if delay is None:
+                    raise error from e
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker(target, model).record_success()
+            return result
+
+    def stream(self, host: HostPicker, model: str, start: Callable[[str], Iterator]) -> Generator:
+        """
+        Jalankan stream dengan retry sampai chunk pertama diterima.
+
+        Args:
+            host: Base URL server, atau callable yang memilih server per percobaan
+            model: Nama model
+            start: Callable yang mengembalikan iterator chunk dari host yang diberikan
+
+        Yields:
+            Chunk dari server
+        """
+        attempt = 0
+        while True:
+            target = host() if callable(host) else host
+            self._check_breaker(target, model)
+            try:
+                iterator = iter(start(target))
+                first = next(iterator, None)
+            except Exception as e:
+                error = classify_error(e, model)
+                delay = self._handle_error(target, model, error, attempt)
+                if delay is None:
+                    raise error from e
+                time.sleep(delay)
+                attempt += 1
+                continue
+            break
+
+        self.breaker(target, model).record_success()
+        if first is None:
+            return
+        yield first
+        try:
+            yield from iterator
+        except Exception as e:
+            # Sudah ada output: jangan diulang di sini, biarkan caller yang memutuskan
+            error = classify_error(e, model)
+            if getattr(error, "retryable", False):
+                self.record_failure(target, model)
+            raise error from e
+
+    async def acall(self, host: HostPicker, model: str, fn: Callable[[str], Awaitable]):
+        """Versi async dari call."""
+        attempt = 0
+        while True:
+            target = host() if callable(host) else host
+            self._check_breaker(target, model)
+            try:
+                result = await fn(target)
+            except Exception as e:
+                error = classify_error(e, model)
+                delay = self._handle_error(target, model, error, attempt)
+                if delay is None:
+                    raise error from e
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker(target, model).record_success()
+            return result
+
+    async def astream(
+        self,
+        host: HostPicker,
+        model: str,
+        start: Callable[[str], Awaitable[AsyncIterator]]
+    ) -> AsyncIterator:
+        """Versi async dari stream."""
+        attempt = 0
+        while True:
+            target = host() if callable(host) else host
+            self._check_breaker(target, model)
+            try:
+                iterator = (await start(target)).__aiter__()
+                first = await iterator.__anext__()
+            except StopAsyncIteration:
+                self.breaker(target, model).record_success()
+                return
+            except Exception as e:
+                error = classify_error(e, model)
+                delay = self._handle_error(target, model, error, attempt)
+                if delay is None:
+                    raise error from e
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            break
+
+        self.breaker(target, model).record_success()
+        yield first
+        try:
+            async for chunk in iterator:
+                yield chunk
+        except Exception as e:
+            error = classify_error(e, model)
+            if getattr(error, "retryable", False):
+                self.record_failure(target, model)
+            raise error from e
+
+
+# Singleton instance
+retry_manager = RetryManager()
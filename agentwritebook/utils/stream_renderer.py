@@ -0,0 +1,177 @@
+"""
+Accumulator dan sink untuk output streaming.
+
+Sink adalah objek dengan method write(text), close() saat stream selesai,
+dan abort() saat stream gagal di tengah jalan. BaseAgent.chat_stream
+meneruskan setiap potongan teks ke semua sink yang diberikan.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+from ..config.settings import stream_config
+
+
+class StreamAccumulator:
+    """
+    Kumpulkan potongan teks stream tanpa string concatenation per token.
+
+    Potongan disimpan di list dan baru di-join sekali di akhir; jumlah
+    kata dan karakter dihitung incremental sehingga tidak perlu
+    split() ulang atas seluruh teks.
+    """
+
+    def __init__(self):
+        """Initialize accumulator kosong."""
+        self._parts: List[str] = []
+        self._in_word = False
+        self.word_count = 0
+        self.char_count = 0
+
+    def append(self, text: str):
+        """Tambahkan satu potongan teks."""
+        if not text:
+            return
+        self._parts.append(text)
+        self.char_count += len(text)
+
+        words = len(text.split())
+        # Kata yang terpotong di batas chunk sudah dihitung di chunk sebelumnya
+        if words and self._in_word and not text[0].isspace():
+            words -= 1
+        self.word_count += words
+        self._in_word = not text[-1].isspace()
+
+    def text(self) -> str:
+        """Seluruh teks yang sudah diterima."""
+        return "".join(self._parts)
+
+
+class StreamRenderer:
+    """
+    Sink terminal: tulis teks stream dengan frame rate terbatas.
+
+    Token ditampung di buffer dan di-flush paling sering render_fps kali
+    per detik, sehingga model yang cepat tidak membuat I/O terminal
+    menjadi bottleneck.
+    """
+
+    def __init__(self, out: Optional[TextIO] = None, fps: Optional[float] = None):
+        """
+        Initialize renderer.
+
+        Args:
+            out: Stream tujuan (default: sys.stdout)
+            fps: Maksimal flush per detik (default dari config, 0 = tiap token)
+        """
+        self.out = out or sys.stdout
+        fps = stream_config.render_fps if fps is None else fps
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self._pending: List[str] = []
+        self._last_flush = 0.0
+
+    def write(self, text: str):
+        """Tampung teks dan flush jika interval frame sudah lewat."""
+        self._pending.append(text)
+        now = time.monotonic()
+        if now - self._last_flush >= self.interval:
+            self.flush()
+            self._last_flush = now
+
+    def flush(self):
+        """Tulis semua teks yang tertunda ke terminal."""
+        if self._pending:
+            self.out.write("".join(self._pending))
+            self.out.flush()
+            self._pending = []
+
+    def close(self):
+        """Flush sisa buffer dan akhiri baris."""
+        self.flush()
+        self.out.write("\n")
+        self.out.flush()
+
+    def abort(self):
+        """Tampilkan teks yang sudah diterima sebelum stream gagal."""
+        self.close()
+
+
+class FileSink:
+    """
+    Sink file: tulis chapter ke `<path>.partial` selama streaming.
+
+    Buffer di-flush ke disk secara berkala sehingga crash di tengah
+    chapter tidak menghilangkan teks yang sudah ditulis. File .partial
+    tidak di-rename saat stream selesai: path final baru ditulis oleh
+    FileManager.save_chapter setelah chapter lolos review dan ditandai
+    selesai, sehingga chapter yang gagal tidak pernah muncul sebagai
+    `NN_judul.md`. Selama itu (atau jika stream gagal) file .partial bisa
+    dilanjutkan saat resume.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        header: str = "",
+        flush_seconds: Optional[float] = None,
+        flush_chars: Optional[int] = None
+    ):
+        """
+        Initialize file sink.
+
+        Args:
+            path: Path final chapter (misal 01_Judul.md)
+            header: Teks pembuka yang ditulis jika file .partial masih kosong
+            flush_seconds: Interval flush ke disk (default dari config)
+            flush_chars: Ukuran buffer maksimal sebelum flush (default dari config)
+        """
+        self.path = Path(path)
+        self.partial_path = partial_path(self.path)
+        self.flush_seconds = stream_config.partial_flush_seconds if flush_seconds is None else flush_seconds
+        self.flush_chars = flush_chars or stream_config.partial_flush_chars
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._last_flush = time.monotonic()
+
+        # Mode append: teks dari run sebelumnya (resume) tetap dipertahankan
+        self._file = open(self.partial_path, 'a', encoding='utf-8')
+        if header and self._file.tell() == 0:
+            self._file.write(header)
+
+    def write(self, text: str):
+        """Tampung teks dan flush ke disk secara berkala."""
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        if (self._pending_chars >= self.flush_chars
+                or time.monotonic() - self._last_flush >= self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        """Tulis buffer ke file .partial."""
+        if self._pending:
+            self._file.write("".join(self._pending))
+            self._pending = []
+            self._pending_chars = 0
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush dan fsync file .partial (di-finalisasi oleh FileManager.save_chapter)."""
+        self.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    def abort(self):
+        """Flush dan tutup file setelah stream gagal (bisa dilanjutkan saat resume)."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+
+def partial_path(path: Path) -> Path:
+    """Path file .partial untuk chapter yang sedang ditulis."""
+    return path.with_name(path.name + ".partial")
@@ -0,0 +1,238 @@
+"""Schema output terstruktur (outline, review) dan decoder yang memvalidasinya."""
+
+import json
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field, ValidationError, create_model
+
+from .json_stream import lenient_loads
+
+# Batas error validasi yang dikirim balik ke model saat repair
+MAX_REPORTED_ERRORS = 8
+
+
+class Character(BaseModel):
+    """Karakter utama di outline fiksi."""
+
+    name: str
+    role: str = ""
+    description: str = ""
+
+
+class FictionChapter(BaseModel):
+    """Satu chapter di outline fiksi."""
+
+    number: int
+    title: str
+    description: str
+    key_events: List[str] = []
+    character_development: str = ""
+
+
+class NonFictionChapter(BaseModel):
+    """Satu chapter di outline non-fiksi."""
+
+    number: int
+    title: str
+    description: str
+    key_points: List[str] = []
+    learning_objectives: str = ""
+
+
+# Urutan field mengikuti urutan generate: metadata dulu, chapters terakhir,
+# agar metadata sudah lengkap saat chapter pertama di-stream.
+class FictionOutline(BaseModel):
+    """Outline buku fiksi."""
+
+    title: str
+    genre: str = "fiction"
+    target_audience: str = "general"
+    synopsis: str = ""
+    main_characters: List[Character] = []
+    setting: str = ""
+    themes: List[str] = []
+    chapters: List[FictionChapter]
+
+
+class NonFictionOutline(BaseModel):
+    """Outline buku non-fiksi."""
+
+    title: str
+    genre: str = "non-fiction"
+    category: str = "general"
+    target_audience: str = "general"
+    synopsis: str = ""
+    key_takeaways: List[str] = []
+    chapters: List[NonFictionChapter]
+
+
+class OutlinePart(BaseModel):
+    """Satu part/babak buku panjang (outline hierarkis)."""
+
+    title: str
+    summary: str
+
+
+class StructuredOutputError(ValueError):
+    """
+    Output model tidak valid terhadap schema.
+
+    Attributes:
+        text: Output mentah dari model
+        errors: Daftar error validasi ("path: pesan")
+    """
+
+    def __init__(self, text: str, errors: List[str]):
+        self.text = text
+        self.errors = errors
+        super().__init__("; ".join(errors[:MAX_REPORTED_ERRORS]) or "output kosong")
+
+
+def outline_model(book_type: str) -> Type[BaseModel]:
+    """Model outline untuk tipe buku."""
+    return FictionOutline if book_type == "fiction" else NonFictionOutline
+
+
+def chapter_model(book_type: str) -> Type[BaseModel]:
+    """Model satu chapter outline untuk tipe buku."""
+    return FictionChapter if book_type == "fiction" else NonFictionChapter
+
+
+def outline_schema(book_type: str, num_chapters: int) -> Dict:
+    """
+    JSON schema outline untuk parameter `format` Ollama.
+
+    Args:
+        book_type: fiction/non_fiction
+        num_chapters: Jumlah chapter (dipaksa lewat minItems/maxItems)
+
+    Returns:
+        JSON schema
+    """
+    schema = outline_model(book_type).model_json_schema()
+    chapters = schema['properties']['chapters']
+    chapters['minItems'] = chapters['maxItems'] = num_chapters
+    return schema
+
+
+def chapters_schema(book_type: str, count: int) -> Dict:
+    """
+    JSON schema {"chapters": [...]} untuk melengkapi chapter yang hilang.
+
+    Args:
+        book_type: fiction/non_fiction
+        count: Jumlah chapter yang diminta
+    """
+    model = create_model("OutlineChapters", chapters=(List[chapter_model(book_type)], ...))
+    schema = model.model_json_schema()
+    chapters = schema['properties']['chapters']
+    chapters['minItems'] = chapters['maxItems'] = count
+    return schema
+
+
+@lru_cache(maxsize=2)
+def skeleton_model(book_type: str) -> Type[BaseModel]:
+    """Model kerangka outline: metadata buku + parts (tanpa chapters)."""
+    base = outline_model(book_type)
+    fields = {
+        name: (field.annotation, field)
+        for name, field in base.model_fields.items() if name != 'chapters'
+    }
+    return create_model(f"{base.__name__}Skeleton", **fields, parts=(List[OutlinePart], ...))
+
+
+def skeleton_schema(book_type: str, num_parts: int) -> Dict:
+    """
+    JSON schema kerangka outline untuk parameter `format` Ollama.
+
+    Args:
+        book_type: fiction/non_fiction
+        num_parts: Jumlah part (dipaksa lewat minItems/maxItems)
+    """
+    schema = skeleton_model(book_type).model_json_schema()
+    parts = schema['properties']['parts']
+    parts['minItems'] = parts['maxItems'] = num_parts
+    return schema
+
+
+@lru_cache(maxsize=32)
+def review_model(criteria: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Model review dengan satu score (1-10) per kriteria.
+
+    Args:
+        criteria: Nama kriteria (misal "pacing")
+
+    Returns:
+        Model pydantic ChapterReview
+    """
+    scores = create_model(
+        "CriteriaScores",
+        **{criterion: (float, Field(ge=1, le=10)) for criterion in criteria}
+    )
+    return create_model(
+        "ChapterReview",
+        overall_assessment=(str, ...),
+        scores=(scores, ...),
+        overall_score=(float, Field(ge=1, le=10)),
+        strengths=(List[str], []),
+        improvements=(List[str], []),
+        specific_feedback=(str, ""),
+        recommendations=(List[str], []),
+    )
+
+
+def describe_errors(error: ValidationError) -> List[str]:
+    """Error validasi pydantic sebagai "path: pesan"."""
+    return [
+        f"{'.'.join(str(part) for part in item['loc']) or '(root)'}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+
+def decode(model: Type[BaseModel], text: str) -> BaseModel:
+    """
+    Parse dan validasi output model dalam satu langkah.
+
+    Output dengan `format` sudah berupa JSON murni sehingga langsung
+    divalidasi oleh pydantic-core; jika JSON dibungkus teks/markdown
+    (model atau server yang mengabaikan `format`), objek di antara "{"
+    pertama dan "}" terakhir yang dipakai.
+
+    Raises:
+        StructuredOutputError: Jika output tidak valid terhadap schema
+    """
+    try:
+        return model.model_validate_json(text)
+    except ValidationError as e:
+        errors = describe_errors(e)
+
+    start, end = text.find("{"), text.rfind("}") + 1
+    if start == -1 or end <= start:
+        raise StructuredOutputError(text, errors)
+    try:
+        return model.model_validate(lenient_loads(text[start:end]))
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(text, [f"(root): JSON tidak valid ({e})"])
+    except ValidationError as e:
+        raise StructuredOutputError(text, describe_errors(e))
+
+
+def repair_prompt(error: StructuredOutputError, schema: Optional[Dict] = None) -> str:
+    """
+    Pesan user untuk meminta model memperbaiki output yang tidak valid.
+
+    Args:
+        error: Error dari decode
+        schema: JSON schema (disertakan jika server tidak memakai `format`)
+    """
+    lines = [
+        "Output sebelumnya tidak valid:",
+        *[f"- {item}" for item in error.errors[:MAX_REPORTED_ERRORS]],
+        "",
+        "Kirim ulang HANYA JSON lengkap yang memperbaiki semua error di atas, tanpa teks lain.",
+    ]
+    if schema is not None:
+        lines += ["", "Schema:", json.dumps(schema, ensure_ascii=False)]
+    return "\n".join(lines)
@@ -0,0 +1,216 @@
+"""Telemetry per call dari statistik respons Ollama."""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Chapter yang sedang dikerjakan di thread/coroutine ini (diisi orchestrator)
+_current_chapter = contextvars.ContextVar("current_chapter", default=None)
+
+# Field durasi Ollama (nanodetik) dan counter token yang disimpan apa adanya
+_STAT_FIELDS = (
+    "prompt_eval_count",
+    "prompt_eval_duration",
+    "eval_count",
+    "eval_duration",
+    "load_duration",
+    "total_duration",
+)
+
+
+def _ns_to_s(value: Optional[int]) -> float:
+    """Konversi nanodetik ke detik."""
+    return (value or 0) / 1e9
+
+
+class TelemetryRecorder:
+    """
+    Kumpulkan metrics setiap call ke Ollama untuk satu buku.
+
+    Ollama mengembalikan eval_count, eval_duration, prompt_eval_count,
+    prompt_eval_duration, load_duration, dan total_duration di respons
+    non-streaming dan di chunk terakhir stream. Record disimpan per call
+    (role, model, chapter) lalu diagregasi per role untuk laporan buku.
+    """
+
+    def __init__(self):
+        """Initialize recorder kosong."""
+        self.records: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Mulai pengumpulan baru (dipanggil di awal setiap buku)."""
+        with self._lock:
+            self.records = []
+
+    @contextmanager
+    def chapter_scope(self, chapter_number: int):
+        """Tandai semua call di dalam blok ini sebagai milik chapter tertentu."""
+        token = _current_chapter.set(chapter_number)
+        try:
+            yield
+        finally:
+            _current_chapter.reset(token)
+
+    def record(
+        self,
+        role: str,
+        model: str,
+        response: Any,
+        wall_time: float,
+        streamed: bool = False,
+        ttft: Optional[float] = None,
+        prompt_chars: int = 0
+    ) -> Dict:
+        """
+        Simpan metrics dari satu respons Ollama.
+
+        Args:
+            role: Role agent yang memanggil
+            model: Nama model
+            response: Respons non-streaming atau chunk terakhir stream
+            wall_time: Durasi call di sisi client (detik)
+            streamed: Apakah call memakai streaming
+            ttft: Time-to-first-token yang diukur client (khusus streaming)
+            prompt_chars: Panjang prompt yang dikirim (karakter)
+
+        Returns:
+            Record yang disimpan
+        """
+        cached = bool(response.get("cached")) if response else False
+        # Cache hit tidak men-generate apa pun: statistik eval tersimpan tidak dihitung ulang
+        stats = {
+            field: (response.get(field) if response and not cached else None) or 0
+            for field in _STAT_FIELDS
+        }
+
+        if ttft is None:
+            # Tanpa streaming, token pertama siap setelah load + prompt eval
+            ttft = _ns_to_s(stats["load_duration"]) + _ns_to_s(stats["prompt_eval_duration"])
+
+        record = {
+            "role": role,
+            "model": model,
+            "chapter": _current_chapter.get(),
+            "streamed": streamed,
+            "cached": cached,
+            "wall_time": round(wall_time, 3),
+            "ttft": round(ttft, 3),
+            "prompt_chars": prompt_chars,
+            **stats,
+            "tokens_per_sec": _rate(stats["eval_count"], stats["eval_duration"]),
+            "prompt_tokens_per_sec": _rate(stats["prompt_eval_count"], stats["prompt_eval_duration"]),
+        }
+
+        with self._lock:
+            self.records.append(record)
+        return record
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Agregasi metrics per role (call dari cache tidak dihitung).
+
+        Returns:
+            Dictionary role -> {calls, prompt_tokens, eval_tokens, tokens_per_sec, ...}
+        """
+        with self._lock:
+            records = [r for r in self.records if not r["cached"]]
+
+        summary = {}
+        for record in records:
+            entry = summary.setdefault(record["role"], {
+                "calls": 0,
+                "models": set(),
+                "prompt_tokens": 0,
+                "eval_tokens": 0,
+                "prompt_eval_duration": 0,
+                "eval_duration": 0,
+                "load_duration": 0,
+                "ttft_total": 0.0,
+                "wall_time": 0.0,
+                "prompt_chars": 0,
+                "tokens_per_char": 0.0,
+            })
+            entry["calls"] += 1
+            entry["models"].add(record["model"])
+            entry["prompt_tokens"] += record["prompt_eval_count"]
+            entry["eval_tokens"] += record["eval_count"]
+            entry["prompt_eval_duration"] += record["prompt_eval_duration"]
+            entry["eval_duration"] += record["eval_duration"]
+            entry["load_duration"] += record["load_duration"]
+            entry["ttft_total"] += record["ttft"]
+            entry["wall_time"] += record["wall_time"]
+            entry["prompt_chars"] += record["prompt_chars"]
+            if record["prompt_chars"]:
+                # Rasio tertinggi = call tanpa prefix cache (seluruh prompt di-evaluate)
+                entry["tokens_per_char"] = max(
+                    entry["tokens_per_char"],
+                    record["prompt_eval_count"] / record["prompt_chars"]
+                )
+
+        return {
+            role: {
+                "calls": entry["calls"],
+                "models": sorted(entry["models"]),
+                "prompt_tokens": entry["prompt_tokens"],
+                "eval_tokens": entry["eval_tokens"],
+                "tokens_per_sec": _rate(entry["eval_tokens"], entry["eval_duration"]),
+                "prompt_tokens_per_sec": _rate(entry["prompt_tokens"], entry["prompt_eval_duration"]),
+                "prompt_eval_time": round(_ns_to_s(entry["prompt_eval_duration"]), 2),
+                "load_time": round(_ns_to_s(entry["load_duration"]), 2),
+                "avg_ttft": round(entry["ttft_total"] / entry["calls"], 3),
+                "wall_time": round(entry["wall_time"], 2),
+                **_prompt_reuse(entry),
+            }
+            for role, entry in summary.items()
+        }
+
+    def chapter_models(self, chapter_number: int) -> Dict[str, str]:
+        """
+        Model yang terakhir dipakai setiap role untuk satu chapter.
+
+        Dengan failover, model ini bisa berbeda dari model yang dikonfigurasi.
+
+        Returns:
+            Dictionary role -> model
+        """
+        with self._lock:
+            return {
+                record["role"]: record["model"]
+                for record in self.records
+                if record["chapter"] == chapter_number
+            }
+
+    def export(self) -> Dict:
+        """Semua record dan ringkasan, siap ditulis sebagai JSON."""
+        with self._lock:
+            records = list(self.records)
+        return {"summary": self.summary(), "calls": records}
+
+
+def _prompt_reuse(entry: Dict) -> Dict:
+    """
+    Perkirakan token prompt yang tidak perlu di-evaluate ulang oleh Ollama.
+
+    Ollama hanya menghitung token di luar prefix yang sudah ada di KV cache
+    pada prompt_eval_count. Rasio token per karakter dikalibrasi dari call
+    dengan rasio tertinggi (call cold), lalu dibandingkan dengan total
+    panjang prompt yang dikirim.
+    """
+    full_tokens = round(entry["prompt_chars"] * entry["tokens_per_char"])
+    reused = max(0, full_tokens - entry["prompt_tokens"])
+    return {
+        "prompt_tokens_reused": reused,
+        "prompt_reuse_rate": round(reused / full_tokens, 3) if full_tokens else 0.0,
+    }
+
+
+def _rate(tokens: int, duration_ns: int) -> float:
+    """Token per detik dari counter dan durasi nanodetik."""
+    seconds = _ns_to_s(duration_ns)
+    return round(tokens / seconds, 2) if seconds else 0.0
+
+
+# Singleton instance
+telemetry = TelemetryRecorder()
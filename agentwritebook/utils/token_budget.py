@@ -0,0 +1,111 @@
+"""Estimasi token dan sizing num_ctx / num_predict per call."""
+
+import math
+from typing import Dict, List, Optional
+
+from ..config.settings import context_config
+
+# Overhead template chat per message (role tag, separator)
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+# Cadangan agar prompt + output tidak pas-pasan di batas context
+_SAFETY_TOKENS = 256
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Perkirakan jumlah token dari teks tanpa tokenizer model.
+
+    Memakai rasio karakter per token yang konservatif (teks Indonesia
+    cenderung lebih banyak token per kata dibanding bahasa Inggris).
+
+    Args:
+        text: Teks yang akan dihitung
+
+    Returns:
+        Perkiraan jumlah token
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / context_config.chars_per_token)
+
+
+def estimate_prompt_tokens(messages: List[Dict[str, str]]) -> int:
+    """Perkirakan token prompt untuk list messages chat."""
+    return sum(
+        estimate_tokens(message.get('content', '')) + _MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def words_to_tokens(words: int) -> int:
+    """Perkirakan token output untuk target jumlah kata (termasuk headroom)."""
+    return math.ceil(words * context_config.tokens_per_word * context_config.output_headroom)
+
+
+class TokenBudget:
+    """
+    Hitung options num_ctx dan num_predict untuk satu call.
+
+    num_ctx dibulatkan ke bucket pangkat dua (2048, 4096, 8192, ...) karena
+    Ollama me-reload model setiap kali num_ctx berubah; dengan bucket,
+    call sejenis (misal semua chapter) memakai num_ctx yang sama.
+    """
+
+    def __init__(
+        self,
+        min_ctx: Optional[int] = None,
+        max_ctx: Optional[int] = None
+    ):
+        """
+        Initialize budget.
+
+        Args:
+            min_ctx: Context minimum (default dari config)
+            max_ctx: Context maksimum yang boleh dialokasikan
+        """
+        self.min_ctx = min_ctx or context_config.min_ctx
+        self.max_ctx = max_ctx or context_config.max_ctx
+
+    def _bucket(self, tokens: int) -> int:
+        """Bulatkan ke pangkat dua terdekat di atasnya, dibatasi min/max."""
+        size = self.min_ctx
+        while size < tokens and size < self.max_ctx:
+            size *= 2
+        return min(size, self.max_ctx)
+
+    def plan(
+        self,
+        messages: List[Dict[str, str]],
+        output_tokens: int
+    ) -> Dict[str, int]:
+        """
+        Tentukan num_ctx dan num_predict.
+
+        Target output hanya dipakai untuk memilih num_ctx. num_predict
+        diisi sisa context setelah prompt (bukan target output), karena
+        target biasanya minimal kata: chapter yang lebih panjang dari target
+        tidak terpotong di tengah kalimat, dan prompt + num_predict tetap
+        tidak melebihi num_ctx.
+
+        Args:
+            messages: Messages yang akan dikirim
+            output_tokens: Target token output (lihat words_to_tokens)
+
+        Returns:
+            Options Ollama: {"num_ctx": ..., "num_predict": ...}
+        """
+        prompt_tokens = estimate_prompt_tokens(messages)
+        num_ctx = self._bucket(prompt_tokens + output_tokens + _SAFETY_TOKENS)
+
+        # Jika context mentok di max_ctx, output otomatis mengecil agar prompt tidak terpotong
+        num_predict = max(1, num_ctx - prompt_tokens - _SAFETY_TOKENS)
+
+        return {
+            "num_ctx": num_ctx,
+            "num_predict": num_predict
+        }
+
+
+# Singleton instance
+token_budget = TokenBudget()
@@ -0,0 +1,30 @@
+"""Fixture bersama: mock Ollama server dan direktori kerja sementara."""
+
+import pytest
+
+from agentwritebook.config.settings import cache_config, ollama_config
+from agentwritebook.utils.mock_server import MockOllamaServer, MockServerConfig
+
+
+@pytest.fixture(scope="session")
+def ollama_server():
+    """
+    Mock Ollama server untuk seluruh sesi test.
+
+    Satu server per sesi karena endpoint pool dan orchestrator adalah
+    singleton yang mengingat URL server saat pertama kali dibuat.
+    """
+    config = MockServerConfig(port=0, ttft=0.01, tokens_per_sec=0)
+    with MockOllamaServer(config) as server, pytest.MonkeyPatch.context() as mp:
+        mp.setattr(ollama_config, "base_url", server.url)
+        mp.setattr(ollama_config, "endpoints", [])
+        mp.setattr(cache_config, "enabled", False)
+        yield server
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Jalankan test di direktori sementara (output/ dan cache ~ tidak bocor)."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    return tmp_path
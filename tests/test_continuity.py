@@ -0,0 +1,110 @@
+"""Test ContinuityMemory untuk chapter yang selesai tidak berurutan."""
+
+from agentwritebook.utils.continuity import ContinuityMemory
+from agentwritebook.utils.token_budget import estimate_tokens
+
+
+def _compress(digest, summaries, max_words):
+    """Compress palsu: gabungkan ringkasan apa adanya."""
+    return " ".join([digest] + [summary for _, _, summary in summaries]).strip()
+
+
+def _memory():
+    return ContinuityMemory(_compress, budget_tokens=10_000, recent_chapters=2)
+
+
+def test_in_order_folds_oldest_chapters():
+    memory = _memory()
+    for number in range(1, 6):
+        memory.record(number, f"T{number}", f"s{number}")
+
+    assert memory.digest_through == 3
+    assert memory.digest == "s1 s2 s3"
+    assert sorted(memory.summaries) == [4, 5]
+
+
+def test_out_of_order_keeps_gap_until_filled():
+    memory = _memory()
+    for number in [2, 3, 4, 5]:
+        memory.record(number, f"T{number}", f"s{number}")
+
+    # Chapter 1 belum ada: tidak ada yang boleh dilipat
+    assert memory.digest_through == 0
+    assert memory.digest == ""
+    assert sorted(memory.summaries) == [2, 3, 4, 5]
+
+    memory.record(1, "T1", "s1")
+
+    assert memory.digest_through == 3
+    assert memory.digest == "s1 s2 s3"
+    assert sorted(memory.summaries) == [4, 5]
+    rendered = memory.render()
+    assert rendered.startswith("Chapter 1-3:\ns1 s2 s3")
+    assert "Chapter 4 (T4):\ns4" in rendered
+    assert "Chapter 5 (T5):\ns5" in rendered
+
+
+def test_render_never_includes_later_chapters():
+    memory = _memory()
+    for number in range(1, 6):
+        memory.record(number, f"T{number}", f"s{number}")
+
+    # Digest terbaru mencakup 1-3: chapter sebelumnya memakai digest lama
+    assert memory.render(before=1) == ""
+    assert memory.render(before=3) == "Chapter 1-2:\ns1 s2"
+    assert memory.render(before=4) == "Chapter 1-3:\ns1 s2 s3"
+    assert memory.render(before=5) == "Chapter 1-3:\ns1 s2 s3\n\nChapter 4 (T4):\ns4"
+
+
+def test_render_drops_digest_without_earlier_snapshot():
+    memory = _memory()
+    for number in [2, 3, 4, 5, 1]:
+        memory.record(number, f"T{number}", f"s{number}")
+
+    # Chapter 1-3 dilipat sekaligus: tidak ada digest yang berhenti sebelum chapter 2/3
+    assert memory.render(before=2) == ""
+    assert memory.render(before=3) == ""
+    assert memory.render(before=4) == "Chapter 1-3:\ns1 s2 s3"
+    for before in range(1, 7):
+        rendered = memory.render(before=before)
+        assert all(f"s{n}" not in rendered for n in range(before, 6))
+
+
+def test_over_budget_truncates_digest_before_recent_summaries():
+    memory = ContinuityMemory(_compress, budget_tokens=120, recent_chapters=2)
+    memory.record(1, "T1", "awal " * 100)
+    # Chapter 2 belum ada: ringkasan 3-5 tidak bisa dilipat
+    for number in range(3, 6):
+        memory.record(number, f"T{number}", f"isi{number} " * 8)
+
+    rendered = memory.render()
+
+    assert estimate_tokens(rendered) <= 120
+    assert rendered.startswith("Chapter 1-1:\nawal")
+    assert "awal..." in rendered
+    for number in range(3, 6):
+        assert f"Chapter {number} (T{number}):\n" + (f"isi{number} " * 8).strip() in rendered
+
+
+def test_over_budget_keeps_newest_summaries():
+    memory = ContinuityMemory(_compress, budget_tokens=40, recent_chapters=2)
+    # Chapter 1 belum ada: tidak ada yang bisa dilipat
+    for number in range(2, 6):
+        memory.record(number, f"T{number}", f"ringkasan {number} " * 3)
+
+    rendered = memory.render()
+
+    assert estimate_tokens(rendered) <= 40
+    assert "Chapter 5 (T5)" in rendered
+    assert "Chapter 2 (T2)" not in rendered
+
+
+def test_state_roundtrip():
+    memory = _memory()
+    for number in [2, 3, 4, 5, 1]:
+        memory.record(number, f"T{number}", f"s{number}")
+
+    restored = ContinuityMemory(_compress, budget_tokens=10_000, recent_chapters=2,
+                                state=memory.to_dict())
+    assert restored.render() == memory.render()
+    assert restored.render(before=3) == memory.render(before=3)
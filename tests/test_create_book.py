@@ -0,0 +1,36 @@
+"""Smoke test end-to-end create_book terhadap mock Ollama server."""
+
+import pytest
+
+NUM_CHAPTERS = 3
+
+
+def _create_book(**kwargs):
+    from agentwritebook.agents.orchestrator import get_orchestrator
+
+    return get_orchestrator().create_book(
+        topic="Petualangan di hutan",
+        book_type="fiction",
+        num_chapters=NUM_CHAPTERS,
+        min_words_per_chapter=100,
+        **kwargs
+    )
+
+
+@pytest.mark.parametrize("mode", [
+    {},
+    {"parallel": 2},
+    {"pipeline": True},
+    {"schedule": "by-model"},
+], ids=["sequential", "parallel", "pipeline", "by-model"])
+def test_create_book(ollama_server, workdir, mode):
+    result = _create_book(**mode)
+
+    assert result["success"]
+    assert not result["failed_chapters"]
+    assert len(result["chapter_results"]) == NUM_CHAPTERS
+
+    # Output ditulis relatif ke direktori kerja test
+    book_dir = workdir / result["book_dir"]
+    assert (book_dir / "00_outline.json").exists()
+    assert ollama_server.request_count > 0
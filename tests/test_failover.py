@@ -0,0 +1,135 @@
+"""Test ModelFailover: chain, cooldown, urutan kandidat dan recovery."""
+
+import asyncio
+
+import pytest
+
+from agentwritebook.config.settings import failover_config, model_config
+from agentwritebook.utils import failover as failover_module
+from agentwritebook.utils.errors import OllamaConnectionError
+from agentwritebook.utils.failover import ModelFailover
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(failover_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(failover_config, "enabled", True)
+    monkeypatch.setattr(failover_config, "suggest_alternatives", False)
+    monkeypatch.setattr(failover_config, "cooldown", 60.0)
+    monkeypatch.setattr(failover_config, "max_cooldown", 200.0)
+    monkeypatch.setattr(failover_config, "chains", {"writer": ["cadangan:1b", "fast_model"]})
+    return now
+
+
+def _error(model):
+    return OllamaConnectionError(model, "down")
+
+
+def _calls(failing):
+    """fn untuk run(): gagal untuk model di `failing`, selain itu mengembalikan nama model."""
+    calls = []
+
+    def fn(model):
+        calls.append(model)
+        if model in failing:
+            raise _error(model)
+        return f"hasil {model}"
+
+    fn.calls = calls
+    return fn
+
+
+def test_chain_resolves_config_names_without_duplicates(clock):
+    failover = ModelFailover()
+
+    assert failover.chain("writer", "utama:7b") == ["utama:7b", "cadangan:1b", model_config.fast_model]
+    assert failover.chain("writer", "cadangan:1b") == ["cadangan:1b", model_config.fast_model]
+    assert failover.chain("lain", "utama:7b") == ["utama:7b"]
+
+
+def test_cooldown_doubles_and_is_capped(clock):
+    failover = ModelFailover()
+    health = failover._get("utama:7b")
+
+    expected = [60.0, 120.0, 200.0, 200.0]
+    for cooldown in expected:
+        failover.record_failure("utama:7b", _error("utama:7b"))
+        assert health.down_until - clock[0] == cooldown
+
+    assert health.failures == 4
+    assert health.last_error == str(_error("utama:7b"))
+
+
+def test_candidates_put_healthy_models_first(clock):
+    failover = ModelFailover()
+    failover.record_failure("utama:7b", _error("utama:7b"))
+    clock[0] += 10
+    failover.record_failure("cadangan:1b", _error("cadangan:1b"))
+    failover.record_failure("cadangan:1b", _error("cadangan:1b"))
+
+    # Yang cooldown-nya paling cepat habis dicoba lebih dulu
+    assert failover.candidates("writer", "utama:7b") == [
+        model_config.fast_model, "utama:7b", "cadangan:1b"
+    ]
+
+    clock[0] += 60
+    assert failover.candidates("writer", "utama:7b")[0] == "utama:7b"
+
+
+def test_run_falls_back_and_skips_down_model(clock):
+    failover = ModelFailover()
+    fn = _calls({"utama:7b"})
+
+    assert failover.run("writer", "utama:7b", fn) == ("hasil cadangan:1b", "cadangan:1b")
+    assert failover.run("writer", "utama:7b", fn) == ("hasil cadangan:1b", "cadangan:1b")
+
+    # Model utama yang down tidak dicoba lagi selama cooldown
+    assert fn.calls == ["utama:7b", "cadangan:1b", "cadangan:1b"]
+    summary = failover.summary()
+    assert summary["fallback_calls"] == 2
+    assert summary["fallback_by_role"] == {"writer": 2}
+    assert list(summary["down"]) == ["utama:7b"]
+
+
+def test_recovery_probe_after_cooldown(clock):
+    failover = ModelFailover()
+    failover.run("writer", "utama:7b", _calls({"utama:7b"}))
+    clock[0] += 60
+
+    fn = _calls(set())
+    assert failover.run("writer", "utama:7b", fn) == ("hasil utama:7b", "utama:7b")
+
+    assert fn.calls == ["utama:7b"]
+    assert failover._get("utama:7b").failures == 0
+    assert not failover.record_success("utama:7b")
+
+
+def test_run_raises_last_error_when_all_models_fail(clock):
+    failover = ModelFailover()
+    fn = _calls({"utama:7b", "cadangan:1b", model_config.fast_model})
+
+    with pytest.raises(OllamaConnectionError) as info:
+        failover.run("writer", "utama:7b", fn)
+
+    assert info.value.model == model_config.fast_model
+    assert len(fn.calls) == 3
+
+
+def test_disabled_runs_primary_only(clock, monkeypatch):
+    monkeypatch.setattr(failover_config, "enabled", False)
+    fn = _calls({"utama:7b"})
+
+    with pytest.raises(OllamaConnectionError):
+        ModelFailover().run("writer", "utama:7b", fn)
+    assert fn.calls == ["utama:7b"]
+
+
+def test_async_run_falls_back(clock):
+    failover = ModelFailover()
+    sync_fn = _calls({"utama:7b"})
+
+    async def fn(model):
+        return sync_fn(model)
+
+    assert asyncio.run(failover.arun("writer", "utama:7b", fn)) == ("hasil cadangan:1b", "cadangan:1b")
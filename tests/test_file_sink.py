@@ -0,0 +1,91 @@
+"""Test FileSink (.partial chapter) dan penyusunan buku dari chapter yang selesai."""
+
+from agentwritebook.utils.file_manager import FileManager
+from agentwritebook.utils.stream_renderer import FileSink, partial_path
+
+
+def test_partial_is_flushed_and_kept_after_close(tmp_path):
+    path = tmp_path / "01_Awal.md"
+    sink = FileSink(path, header="# Chapter 1: Awal\n\n", flush_seconds=60, flush_chars=10)
+
+    sink.write("Halo ")
+    assert "Halo" not in partial_path(path).read_text(encoding='utf-8')
+    sink.write("dunia yang luas")  # melewati flush_chars
+    assert partial_path(path).read_text(encoding='utf-8').endswith("Halo dunia yang luas")
+
+    sink.close()
+
+    # Path final baru ditulis oleh save_chapter setelah chapter selesai
+    assert not path.exists()
+    assert partial_path(path).exists()
+
+
+def test_resume_appends_without_second_header(tmp_path):
+    path = tmp_path / "01_Awal.md"
+    header = "# Chapter 1: Awal\n\n"
+    first = FileSink(path, header=header)
+    first.write("Bagian satu. ")
+    first.abort()
+
+    second = FileSink(path, header=header)
+    second.write("Bagian dua.")
+    second.close()
+
+    manager = FileManager(str(tmp_path))
+    assert manager.load_partial_chapter(tmp_path, 1, "Awal") == "Bagian satu. Bagian dua."
+
+
+def test_save_chapter_replaces_partial(tmp_path):
+    manager = FileManager(str(tmp_path))
+    path = manager.chapter_path(tmp_path, 1, "Awal")
+    sink = FileSink(path, header=manager.chapter_header(1, "Awal"))
+    sink.write("Draf")
+    sink.close()
+
+    saved = manager.save_chapter(tmp_path, 1, "Awal", "Isi final")
+
+    assert saved == path
+    assert path.read_text(encoding='utf-8').endswith("Isi final")
+    assert not partial_path(path).exists()
+
+
+def test_full_book_only_includes_given_chapters(tmp_path):
+    manager = FileManager(str(tmp_path))
+    done = manager.save_chapter(tmp_path, 1, "Satu", "Isi satu")
+    # Sisa file chapter yang gagal (misal dari run lama)
+    manager.save_chapter(tmp_path, 2, "Dua", "Isi dua gagal")
+
+    book = manager.save_full_book(tmp_path, "Buku", [done])
+
+    text = book.read_text(encoding='utf-8')
+    assert "Isi satu" in text
+    assert "Isi dua" not in text
+
+
+def test_failed_review_leaves_no_final_chapter(ollama_server, workdir, monkeypatch):
+    from agentwritebook.agents.orchestrator import get_orchestrator
+
+    orchestrator = get_orchestrator()
+    review = orchestrator.reviewer.execute
+
+    def flaky_review(content, chapter_info, book_context, **kwargs):
+        if chapter_info.get('number') == 2:
+            raise RuntimeError("review gagal")
+        return review(content, chapter_info, book_context, **kwargs)
+
+    monkeypatch.setattr(orchestrator.reviewer, "execute", flaky_review)
+
+    result = orchestrator.create_book(
+        topic="Sungai", book_type="fiction", num_chapters=3,
+        min_words_per_chapter=100, enable_streaming=True
+    )
+
+    book_dir = workdir / result["book_dir"]
+    assert [f['number'] for f in result["failed_chapters"]] == [2]
+    assert sorted(p.name[:2] for p in book_dir.glob("[0-9]*.md")
+                  if p.name != "00_outline.md") == ["01", "03"]
+    # Teks chapter 2 tetap ada di .partial untuk resume
+    assert list(book_dir.glob("02_*.md.partial"))
+    full_book = next(book_dir.glob("*_full.md")).read_text(encoding='utf-8')
+    assert "# Chapter 2:" not in full_book
+    assert "# Chapter 3:" in full_book
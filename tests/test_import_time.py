@@ -0,0 +1,40 @@
+"""Test bahwa CLI tetap cepat di-import (modul berat dimuat lazily)."""
+
+import json
+import subprocess
+import sys
+
+# Modul yang hanya boleh dimuat saat command benar-benar dijalankan
+HEAVY_MODULES = ["ollama", "httpx", "agentwritebook.agents.orchestrator"]
+
+# Batas longgar agar tidak flaky di mesin CI yang lambat
+IMPORT_BUDGET_SEC = 1.5
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import agentwritebook.main
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "elapsed": elapsed,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _import_main():
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        capture_output=True, text=True, check=True, timeout=60
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_main_does_not_import_heavy_modules():
+    assert _import_main()["loaded"] == []
+
+
+def test_main_import_within_budget():
+    # Ambil yang tercepat dari beberapa percobaan untuk meredam noise
+    elapsed = min(_import_main()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_SEC
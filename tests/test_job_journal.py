@@ -0,0 +1,134 @@
+"""Test JobJournal dan resume_book."""
+
+import json
+
+import pytest
+
+from agentwritebook.utils.job_journal import JOURNAL_FILENAME, JobJournal
+
+OUTLINE = {
+    "title": "Judul",
+    "chapters": [
+        {"number": 1, "title": "Awal"},
+        {"number": 2, "title": "Tengah"},
+    ],
+}
+SETTINGS = {"book_type": "fiction", "num_chapters": 3}
+MODELS = {"planner": "gemma3:latest", "writer": "gemma3:latest", "reviewer": "gemma3:latest"}
+
+
+def _entry(book_dir, number, title):
+    path = book_dir / f"{number:02d}_{title}.md"
+    path.write_text(f"# {title}", encoding="utf-8")
+    return {"number": number, "title": title, "path": path, "word_count": 2, "score": 8.0}
+
+
+def test_create_and_load(tmp_path):
+    journal = JobJournal.create(tmp_path, OUTLINE, SETTINGS, MODELS)
+
+    loaded = JobJournal.load(tmp_path)
+
+    assert loaded.outline == OUTLINE
+    assert loaded.settings == SETTINGS
+    assert loaded.models == MODELS
+    assert loaded.outline_complete
+    assert loaded.data["chapters"] == {
+        "1": {"title": "Awal", "status": "pending"},
+        "2": {"title": "Tengah", "status": "pending"},
+    }
+    assert loaded.continuity is None
+    assert not (tmp_path / (JOURNAL_FILENAME + ".tmp")).exists()
+    assert journal.data["status"] == "running"
+
+
+def test_load_without_journal_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        JobJournal.load(tmp_path)
+
+
+def test_streamed_outline(tmp_path):
+    journal = JobJournal.create(tmp_path, {"title": "Judul"}, SETTINGS, MODELS)
+    assert not journal.outline_complete
+
+    journal.add_chapter({"number": 1, "title": "Awal"})
+    journal.complete_outline({"title": "Lain", "synopsis": "Sinopsis", "chapters": []})
+
+    loaded = JobJournal.load(tmp_path)
+    assert loaded.outline_complete
+    assert loaded.outline == {
+        "title": "Judul",
+        "synopsis": "Sinopsis",
+        "chapters": [{"number": 1, "title": "Awal"}],
+    }
+    assert loaded.data["chapters"]["1"]["status"] == "pending"
+
+
+def test_completed_and_failed_chapters(tmp_path):
+    journal = JobJournal.create(tmp_path, OUTLINE, SETTINGS, MODELS)
+
+    journal.mark_completed(_entry(tmp_path, 2, "Tengah"), review={"overall_score": 8.0})
+    journal.mark_failed({"number": 1, "title": "Awal", "error": "timeout"})
+    journal.save_continuity({"digest": "d"})
+    journal.finish(failed_count=1)
+
+    loaded = JobJournal.load(tmp_path)
+    completed = loaded.completed_chapters()
+    assert [(c["number"], c["path"].name, c["score"]) for c in completed] == [
+        (2, "02_Tengah.md", 8.0)
+    ]
+    assert loaded.data["chapters"]["1"] == {"title": "Awal", "status": "failed", "error": "timeout"}
+    assert loaded.continuity == {"digest": "d"}
+    assert loaded.data["status"] == "incomplete"
+
+
+def test_completed_chapter_without_file_is_rewritten(tmp_path):
+    journal = JobJournal.create(tmp_path, OUTLINE, SETTINGS, MODELS)
+    entry = _entry(tmp_path, 1, "Awal")
+    journal.mark_completed(entry)
+    journal.mark_completed(_entry(tmp_path, 2, "Tengah"))
+
+    entry["path"].unlink()
+
+    assert [c["number"] for c in journal.completed_chapters()] == [2]
+
+
+def test_resume_replans_and_writes_missing_chapters(ollama_server, workdir):
+    from agentwritebook.agents.orchestrator import get_orchestrator
+
+    orchestrator = get_orchestrator()
+    result = orchestrator.create_book(
+        topic="Petualangan di hutan",
+        book_type="fiction",
+        num_chapters=3,
+        min_words_per_chapter=100,
+    )
+    book_dir = workdir / result["book_dir"]
+    first = (workdir / result["chapter_results"][0]["path"]).resolve()
+    written = first.stat().st_mtime_ns
+
+    # Simulasikan proses yang mati saat planner baru merencanakan 2 chapter
+    # dan writer baru menyelesaikan chapter 1
+    path = book_dir / JOURNAL_FILENAME
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["outline"]["chapters"] = data["outline"]["chapters"][:2]
+    data["outline_complete"] = False
+    data["status"] = "running"
+    data["chapters"] = {
+        "1": data["chapters"]["1"],
+        "2": {"title": data["chapters"]["2"]["title"], "status": "pending"},
+    }
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    resumed = orchestrator.resume_book(str(book_dir))
+
+    assert resumed["success"]
+    assert not resumed["failed_chapters"]
+    assert [r["number"] for r in resumed["chapter_results"]] == [1, 2, 3]
+    # Chapter yang sudah selesai tidak ditulis ulang
+    assert resumed["chapter_results"][0]["path"].resolve() == first
+    assert first.stat().st_mtime_ns == written
+    journal = JobJournal.load(book_dir)
+    assert journal.outline_complete
+    assert [c["number"] for c in journal.outline["chapters"]] == [1, 2, 3]
+    assert {c["status"] for c in journal.data["chapters"].values()} == {"completed"}
+    assert journal.data["status"] == "completed"
@@ -0,0 +1,125 @@
+"""Test IncrementalObjectParser dan lenient_loads."""
+
+import json
+import random
+
+import pytest
+
+from agentwritebook.utils.json_stream import IncrementalObjectParser, lenient_loads
+
+OUTLINE = {
+    "title": "Buku {Kurung} \"Kutip\"",
+    "synopsis": "Baris satu\nbaris dua, dengan [kurung] dan \\ backslash",
+    "themes": ["a", "b"],
+    "rating": 4.5,
+    "draft": False,
+    "chapters": [
+        {"number": 1, "title": "Awal", "key_events": ["x", "y"]},
+        {"number": 2, "title": "Tengah }", "nested": {"a": [1, 2, {"b": None}]}},
+        {"number": 3, "title": "Akhir"},
+    ],
+}
+
+
+def _feed_all(text, sizes=None, seed=0):
+    """Feed teks dalam potongan acak; kembalikan (parser, events)."""
+    parser = IncrementalObjectParser("chapters")
+    events = []
+    rng = random.Random(seed)
+    i = 0
+    while i < len(text):
+        size = sizes or rng.randint(1, 12)
+        events += parser.feed(text[i:i + size])
+        i += size
+    return parser, events
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_chunked_parse_matches_json_loads(seed):
+    text = "```json\n" + json.dumps(OUTLINE, indent=2) + "\n```"
+
+    parser, events = _feed_all(text, seed=seed)
+
+    assert parser.done
+    assert parser.result() == OUTLINE
+    assert parser.text == text
+    assert parser.errors == 0
+    kinds = [kind for kind, _ in events]
+    # Field sebelum chapters lengkap saat array chapters mulai
+    assert kinds.index("items_start") == 5
+    assert [value for kind, value in events if kind == "item"] == OUTLINE["chapters"]
+
+
+def test_single_character_chunks():
+    text = json.dumps(OUTLINE)
+
+    parser, _ = _feed_all(text, sizes=1)
+
+    assert parser.result() == OUTLINE
+
+
+def test_items_are_emitted_before_the_array_closes():
+    text = json.dumps(OUTLINE)
+    cut = text.index('{"number": 3')
+    parser = IncrementalObjectParser("chapters")
+
+    events = parser.feed(text[:cut])
+
+    assert [value["number"] for kind, value in events if kind == "item"] == [1, 2]
+    assert parser.fields["title"] == OUTLINE["title"]
+
+
+def test_truncated_output_keeps_complete_items():
+    text = json.dumps(OUTLINE)
+    truncated = text[:text.index('"Akhir"')]
+
+    parser, _ = _feed_all(truncated)
+
+    assert not parser.done
+    result = parser.result()
+    assert [c["number"] for c in result["chapters"]] == [1, 2]
+    assert result["synopsis"] == OUTLINE["synopsis"]
+
+
+def test_malformed_item_is_skipped():
+    text = (
+        '{"title": "T", "chapters": ['
+        '{"number": 1, "title": "A"},'
+        '{"number": 2, "title": "B" "rusak": 1},'
+        '{"number": 3, "title": "C",},'
+        ']}'
+    )
+
+    parser, _ = _feed_all(text)
+
+    assert [c["number"] for c in parser.result()["chapters"]] == [1, 3]
+    assert parser.errors == 1
+
+
+def test_fallback_for_unparsed_text():
+    parser = IncrementalObjectParser("chapters")
+    parser.feed('Hasil: {"a": 1}')
+    parser.fields.clear()
+
+    assert parser.result() == {"a": 1}
+
+
+def test_lenient_loads_trailing_comma():
+    assert lenient_loads('{"a": [1, 2,], "b": {"c": 1,},}') == {"a": [1, 2], "b": {"c": 1}}
+    with pytest.raises(json.JSONDecodeError):
+        lenient_loads('{"a": }')
+
+
+def test_buffer_stays_bounded_for_long_item_arrays():
+    chapters = [{"number": n, "title": "x" * 200} for n in range(1, 400)]
+    text = json.dumps({"title": "T", "chapters": chapters})
+
+    parser = IncrementalObjectParser("chapters")
+    largest = 0
+    for i in range(0, len(text), 50):
+        parser.feed(text[i:i + 50])
+        largest = max(largest, len(parser._buf))
+
+    assert len(parser.result()["chapters"]) == 399
+    # Buffer kerja hanya menyimpan elemen yang belum selesai
+    assert largest < 1000
@@ -0,0 +1,79 @@
+"""Test _OutlineSink: penomoran chapter dari output model yang tidak rapi."""
+
+import json
+
+import pytest
+
+from agentwritebook.agents.planner_agent import PlannerAgent, _OutlineSink
+from agentwritebook.config.settings import structured_config
+
+NUM_CHAPTERS = 4
+
+
+@pytest.fixture
+def planner():
+    return PlannerAgent()
+
+
+@pytest.fixture
+def sink(planner):
+    defaults = planner._create_default_fiction_outline("Hutan", NUM_CHAPTERS, "general")
+    return _OutlineSink("fiction", defaults, None, None)
+
+
+def _outline(numbers):
+    return json.dumps({
+        "title": "Hutan",
+        "chapters": [
+            {"number": number, "title": f"Bab {index}", "description": "-"}
+            for index, number in enumerate(numbers)
+        ]
+    })
+
+
+def _numbers(sink):
+    return [chapter['number'] for chapter in sink.chapters]
+
+
+@pytest.mark.parametrize("numbers", [
+    [1, 2, 3, 4],
+    [1, 3],           # celah
+    [1, 1, 2],        # dobel
+    [0, 7, 99, -1],   # di luar range
+    ["x", None, 2],   # bukan int
+], ids=["in-order", "gap", "duplicate", "out-of-range", "not-int"])
+def test_chapters_are_numbered_sequentially(sink, numbers):
+    sink.write(_outline(numbers))
+
+    assert _numbers(sink) == list(range(1, len(numbers) + 1))
+    # Judul tetap mengikuti urutan dari model
+    assert [c['title'] for c in sink.chapters] == [f"Bab {i}" for i in range(len(numbers))]
+
+
+def test_limit_drops_extra_chapters(sink):
+    sink.limit = 2
+    sink.write(_outline([1, 2, 3]))
+
+    assert _numbers(sink) == [1, 2]
+
+
+def test_invalid_chapter_does_not_consume_number(sink):
+    sink.write(json.dumps({"chapters": [
+        {"number": 1, "title": "A", "description": "-"},
+        {"number": 2, "title": ["bukan", "string"], "description": "-"},
+        {"number": 3, "title": "C", "description": "-"},
+    ]}))
+
+    assert _numbers(sink) == [1, 2]
+    assert [c['title'] for c in sink.chapters] == ["A", "C"]
+    assert sink.invalid == 1
+
+
+def test_fill_after_gap_has_unique_numbers(planner, sink, monkeypatch):
+    monkeypatch.setattr(structured_config, "max_repairs", 0)
+    sink.write(_outline([1, 3]))
+
+    planner._fill_chapters([], {}, "fiction", sink, NUM_CHAPTERS)
+
+    assert _numbers(sink) == [1, 2, 3, 4]
+    assert [c['title'] for c in sink.chapters][2:] == ["Chapter 3", "Chapter 4"]
@@ -0,0 +1,134 @@
+"""Test ResponseCache (key, TTL, LRU) dan pemakaiannya di agent."""
+
+import asyncio
+
+import pytest
+
+from agentwritebook.agents.base_agent import BaseAgent
+from agentwritebook.config.settings import cache_config
+from agentwritebook.utils import ollama_client, response_cache as response_cache_module
+from agentwritebook.utils.response_cache import ResponseCache
+from agentwritebook.utils.telemetry import telemetry
+
+MESSAGES = [{"role": "user", "content": "Halo"}]
+
+
+def _response(text):
+    return {"message": {"role": "assistant", "content": text}, "done": True, "eval_count": 10}
+
+
+def test_key_depends_on_every_request_field():
+    key = ResponseCache.make_key("chat", "m", MESSAGES, {"temperature": 0.2, "num_ctx": 2048})
+
+    assert key == ResponseCache.make_key("chat", "m", MESSAGES, {"num_ctx": 2048, "temperature": 0.2})
+    assert key != ResponseCache.make_key("generate", "m", MESSAGES, {"temperature": 0.2, "num_ctx": 2048})
+    assert key != ResponseCache.make_key("chat", "n", MESSAGES, {"temperature": 0.2, "num_ctx": 2048})
+    assert key != ResponseCache.make_key("chat", "m", MESSAGES, {"temperature": 0.3, "num_ctx": 2048})
+    assert key != ResponseCache.make_key(
+        "chat", "m", [{"role": "user", "content": "Halo!"}], {"temperature": 0.2, "num_ctx": 2048}
+    )
+
+
+def test_hit_and_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+
+    assert cache.get("k") is None
+    cache.put("k", "m", _response("isi"))
+
+    assert cache.get("k") == _response("isi")
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_ttl_expires_entries(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, "time", lambda: now[0])
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60)
+    cache.put("k", "m", _response("isi"))
+
+    now[0] += 59
+    assert cache.get("k") is not None
+    now[0] += 2
+    assert cache.get("k") is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_evicts_least_recently_accessed(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, "time", lambda: now[0])
+    text = "x" * 400
+    # Muat kira-kira dua entry
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_size_mb=1000 / (1024 * 1024))
+
+    cache.put("a", "m", _response(text))
+    now[0] += 1
+    cache.put("b", "m", _response(text))
+    now[0] += 1
+    cache.get("a")  # a sekarang lebih baru dari b
+    now[0] += 1
+    cache.put("c", "m", _response(text))
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.evictions == 1
+
+
+class _CachedAgent(BaseAgent):
+    cache_responses = True
+
+    def execute(self, **kwargs):
+        pass
+
+
+@pytest.fixture
+def cache(ollama_server, tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(ollama_client, "response_cache", cache)
+    monkeypatch.setattr(cache_config, "enabled", True)
+    telemetry.reset()
+    return cache
+
+
+def test_async_chat_reuses_sync_cache_entry(ollama_server, cache):
+    agent = _CachedAgent("gemma3:latest", "Tester", temperature=0.2)
+    first = agent.chat(MESSAGES)
+    requests = ollama_server.request_count
+
+    again = asyncio.run(agent.achat(MESSAGES))
+
+    assert ollama_server.request_count == requests
+    assert again['cached'] is True
+    assert again['message']['content'] == first['message']['content']
+
+
+def test_async_chat_populates_cache(ollama_server, cache):
+    agent = _CachedAgent("gemma3:latest", "Tester", temperature=0.2)
+    asyncio.run(agent.achat(MESSAGES))
+    requests = ollama_server.request_count
+
+    assert agent.chat(MESSAGES)['cached'] is True
+    assert asyncio.run(agent.achat_stream(MESSAGES))
+    assert ollama_server.request_count == requests
+
+
+def test_streamed_cache_hit_not_counted_in_telemetry(ollama_server, cache):
+    agent = _CachedAgent("gemma3:latest", "Tester", temperature=0.2)
+    text = agent.chat_stream(MESSAGES, display_live=False)
+    again = agent.chat_stream(MESSAGES, display_live=False)
+
+    assert again == text
+    generated, hit = telemetry.records
+    assert not generated['cached'] and generated['eval_count'] > 0
+    assert hit['cached'] and hit['eval_count'] == 0
+    assert telemetry.summary()['Tester']['calls'] == 1
+
+
+def test_high_temperature_is_not_cached(ollama_server, cache):
+    agent = _CachedAgent("gemma3:latest", "Tester", temperature=0.8)
+    agent.chat(MESSAGES)
+    requests = ollama_server.request_count
+
+    assert not agent.chat(MESSAGES).get('cached')
+    assert ollama_server.request_count == requests + 1
+    assert cache.stats()['entries'] == 0
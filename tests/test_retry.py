@@ -0,0 +1,236 @@
+"""Test RetryManager (backoff, klasifikasi) dan CircuitBreaker."""
+
+import asyncio
+
+import pytest
+
+from agentwritebook.config.settings import retry_config
+from agentwritebook.utils import retry as retry_module
+from agentwritebook.utils.errors import (
+    CircuitOpenError,
+    OllamaConnectionError,
+    OllamaRateLimitError,
+    OllamaRequestError,
+    OllamaServerError,
+)
+from agentwritebook.utils.retry import CircuitBreaker, RetryManager
+
+HOST = "http://ollama:11434"
+MODEL = "gemma3:latest"
+
+
+class _Clock:
+    """time.monotonic palsu yang bisa dimajukan."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(retry_module.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Catat delay backoff tanpa benar-benar tidur; jitter selalu di batas atas."""
+    delays = []
+    monkeypatch.setattr(retry_module.time, "sleep", delays.append)
+    monkeypatch.setattr(retry_module.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(retry_config, "enabled", True)
+    monkeypatch.setattr(retry_config, "max_attempts", 4)
+    monkeypatch.setattr(retry_config, "base_delay", 1.0)
+    monkeypatch.setattr(retry_config, "max_delay", 3.0)
+    monkeypatch.setattr(retry_config, "rate_limit_delay", 10.0)
+    monkeypatch.setattr(retry_config, "breaker_threshold", 100)
+    return delays
+
+
+def _failing(errors, result="ok"):
+    """fn yang raise error dari daftar satu per satu, lalu mengembalikan result."""
+    calls = []
+
+    def fn(host):
+        calls.append(host)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self, clock):
+        breaker = CircuitBreaker(threshold=3, cooldown=30)
+
+        assert not breaker.record_failure()
+        assert not breaker.record_failure()
+        assert breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert breaker.before_call() == pytest.approx(30)
+        clock.now += 10
+        assert breaker.before_call() == pytest.approx(20)
+        assert not breaker.available()
+
+    def test_success_resets_failure_count(self, clock):
+        breaker = CircuitBreaker(threshold=2, cooldown=30)
+        breaker.record_failure()
+        breaker.record_success()
+
+        assert not breaker.record_failure()
+        assert breaker.state == "closed"
+
+    def test_half_open_allows_single_probe(self, clock):
+        breaker = CircuitBreaker(threshold=1, cooldown=30)
+        breaker.record_failure()
+        clock.now += 30
+
+        assert breaker.available()
+        assert breaker.before_call() is None
+        assert breaker.state == "half_open"
+        # Probe lain sedang berjalan
+        assert breaker.before_call() == 1.0
+        assert not breaker.available()
+
+    def test_failed_probe_reopens(self, clock):
+        breaker = CircuitBreaker(threshold=5, cooldown=30)
+        for _ in range(5):
+            breaker.record_failure()
+        clock.now += 30
+        breaker.before_call()
+
+        assert breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.before_call() == pytest.approx(30)
+
+    def test_successful_probe_closes(self, clock):
+        breaker = CircuitBreaker(threshold=1, cooldown=30)
+        breaker.record_failure()
+        clock.now += 30
+        breaker.before_call()
+
+        breaker.record_success()
+
+        assert breaker.state == "closed"
+        assert breaker.before_call() is None
+
+
+class TestRetryManager:
+    def test_transient_errors_are_retried_with_backoff(self, sleeps):
+        manager = RetryManager()
+        fn = _failing([OllamaConnectionError(MODEL, "refused")] * 3)
+
+        assert manager.call(HOST, MODEL, fn) == "ok"
+
+        assert len(fn.calls) == 4
+        # base_delay * 2^attempt, dibatasi max_delay
+        assert sleeps == [1.0, 2.0, 3.0]
+        summary = manager.summary()
+        assert summary["retries"] == 3
+        assert summary["retries_by_kind"] == {"connection": 3}
+        assert summary["retry_wait"] == 6.0
+        assert manager.breaker(HOST, MODEL).state == "closed"
+
+    def test_gives_up_after_max_attempts(self, sleeps):
+        manager = RetryManager()
+        fn = _failing([OllamaServerError(MODEL, "500")] * 10)
+
+        with pytest.raises(OllamaServerError):
+            manager.call(HOST, MODEL, fn)
+
+        assert len(fn.calls) == retry_config.max_attempts
+        assert manager.summary()["failures"] == retry_config.max_attempts
+
+    def test_request_error_is_not_retried(self, sleeps):
+        manager = RetryManager()
+        manager.breaker(HOST, MODEL).record_failure()
+        fn = _failing([OllamaRequestError(MODEL, "model tidak ada")])
+
+        with pytest.raises(OllamaRequestError):
+            manager.call(HOST, MODEL, fn)
+
+        assert len(fn.calls) == 1
+        assert sleeps == []
+        # Server menjawab: backend dianggap sehat
+        assert manager.breaker(HOST, MODEL).failures == 0
+
+    def test_rate_limit_waits_at_least_rate_limit_delay(self, sleeps):
+        manager = RetryManager()
+        fn = _failing([OllamaRateLimitError(MODEL, "429")])
+
+        manager.call(HOST, MODEL, fn)
+
+        assert sleeps == [10.0]
+
+    def test_open_breaker_fails_fast(self, sleeps, clock, monkeypatch):
+        monkeypatch.setattr(retry_config, "breaker_threshold", 2)
+        monkeypatch.setattr(retry_config, "max_attempts", 2)
+        manager = RetryManager()
+        with pytest.raises(OllamaConnectionError):
+            manager.call(HOST, MODEL, _failing([OllamaConnectionError(MODEL, "down")] * 2))
+
+        fn = _failing([])
+        with pytest.raises(CircuitOpenError) as info:
+            manager.call(HOST, MODEL, fn)
+
+        assert fn.calls == []
+        assert info.value.retry_after == pytest.approx(retry_config.breaker_cooldown)
+        assert manager.summary()["breaker_trips"] == 1
+        assert manager.summary()["fail_fast"] == 1
+        # Breaker per host: host lain tetap jalan
+        assert manager.call("http://lain:11434", MODEL, fn) == "ok"
+
+    def test_host_picker_can_switch_host_on_retry(self, sleeps):
+        manager = RetryManager()
+        hosts = iter(["http://a", "http://b"])
+        fn = _failing([OllamaConnectionError(MODEL, "refused")])
+
+        manager.call(lambda: next(hosts), MODEL, fn)
+
+        assert fn.calls == ["http://a", "http://b"]
+
+    def test_stream_retried_only_before_first_chunk(self, sleeps):
+        manager = RetryManager()
+        attempts = []
+
+        def start(host):
+            attempts.append(host)
+            if len(attempts) == 1:
+                raise OllamaConnectionError(MODEL, "refused")
+
+            def chunks():
+                yield {"n": 1}
+                raise OllamaConnectionError(MODEL, "reset")
+            return chunks()
+
+        stream = manager.stream(HOST, MODEL, start)
+        assert next(stream) == {"n": 1}
+        with pytest.raises(OllamaConnectionError):
+            next(stream)
+
+        # Putus setelah chunk pertama tidak diulang (output tidak terduplikasi)
+        assert len(attempts) == 2
+        assert manager.breaker(HOST, MODEL).failures == 1
+
+    def test_async_call_retries(self, sleeps, monkeypatch):
+        async def no_sleep(delay):
+            sleeps.append(delay)
+
+        monkeypatch.setattr(retry_module.asyncio, "sleep", no_sleep)
+        manager = RetryManager()
+        errors = [OllamaServerError(MODEL, "502")]
+
+        async def fn(host):
+            if errors:
+                raise errors.pop()
+            return "ok"
+
+        assert asyncio.run(manager.acall(HOST, MODEL, fn)) == "ok"
+        assert sleeps == [1.0]
@@ -0,0 +1,92 @@
+"""Test fallback score ReviewerAgent saat output tidak sesuai schema."""
+
+import json
+
+import pytest
+
+from agentwritebook.agents.reviewer_agent import ReviewerAgent
+from agentwritebook.utils.structured_output import StructuredOutputError
+
+CRITERIA = ["story_engagement", "character_development", "pacing"]
+
+
+@pytest.fixture
+def reviewer():
+    return ReviewerAgent()
+
+
+def _review_json():
+    return json.dumps({
+        "overall_assessment": "Cukup baik",
+        "scores": {"story_engagement": 8, "character_development": 6.5, "pacing": 7},
+        "overall_score": 7.5,
+        "strengths": ["dialog"],
+    }, indent=2)
+
+
+def test_truncated_json(reviewer):
+    text = _review_json()
+    truncated = text[:text.index('"strengths"')]
+
+    scores = reviewer._parse_scores(truncated, CRITERIA)
+
+    assert scores['overall_score'] == 7.5
+    assert scores['criteria_scores'] == {
+        "story_engagement": 8.0, "character_development": 6.5, "pacing": 7.0
+    }
+
+
+def test_minified_json(reviewer):
+    text = json.dumps(json.loads(_review_json()), separators=(",", ":"))
+
+    scores = reviewer._parse_scores(text, CRITERIA)
+
+    assert scores['overall_score'] == 7.5
+    assert scores['criteria_scores']['pacing'] == 7.0
+
+
+def test_markdown(reviewer):
+    text = (
+        "## Scores (1-10)\n"
+        "- Story Engagement: 8/10\n"
+        "- **Pacing**: 6,5\n"
+        "- Overall Score (1-10): 9/10\n"
+    )
+
+    scores = reviewer._parse_scores(text, CRITERIA)
+
+    assert scores['overall_score'] == 9.0
+    assert scores['criteria_scores'] == {"story_engagement": 8.0, "pacing": 6.5}
+
+
+def test_missing_score_is_none(reviewer):
+    scores = reviewer._parse_scores('{"overall_assessment": "Bagus', CRITERIA)
+
+    assert scores['overall_score'] is None
+    assert scores['criteria_scores'] == {}
+
+
+def test_invalid_output_marks_review_failed(reviewer, monkeypatch):
+    def fail(*args, **kwargs):
+        raise StructuredOutputError('{"overall_assessment": "terpotong', ["(root): invalid"])
+
+    monkeypatch.setattr(reviewer, "chat_structured", fail)
+
+    result = reviewer.execute("Isi chapter", {"number": 1, "title": "A"}, {"genre": "fiction"})
+
+    assert result['overall_score'] is None
+    assert result['needs_revision'] is False
+
+
+def test_invalid_output_uses_partial_scores(reviewer, monkeypatch):
+    text = _review_json()[:-20]
+
+    def fail(*args, **kwargs):
+        raise StructuredOutputError(text, ["(root): invalid"])
+
+    monkeypatch.setattr(reviewer, "chat_structured", fail)
+
+    result = reviewer.execute("Isi chapter", {"number": 1, "title": "A"}, {"genre": "fiction"})
+
+    assert result['overall_score'] == 7.5
+    assert result['needs_revision'] is False
@@ -0,0 +1,72 @@
+"""Test chat(stream=True) memakai failover dan izin memori seperti chat_stream."""
+
+import pytest
+
+from agentwritebook.agents.base_agent import BaseAgent
+from agentwritebook.config.settings import AgentRole, failover_config
+from agentwritebook.utils.memory_scheduler import memory_scheduler
+from agentwritebook.utils.telemetry import telemetry
+
+MESSAGES = [{"role": "user", "content": "Tulis satu paragraf"}]
+
+
+class _Writer(BaseAgent):
+    agent_role = AgentRole.WRITER
+
+    def execute(self, **kwargs):
+        pass
+
+
+@pytest.fixture
+def leases(monkeypatch):
+    acquired = []
+    acquire = memory_scheduler.acquire
+
+    def tracking_acquire(model):
+        lease = acquire(model)
+        acquired.append(lease)
+        return lease
+
+    monkeypatch.setattr(memory_scheduler, "acquire", tracking_acquire)
+    monkeypatch.setattr(failover_config, "suggest_alternatives", False)
+    telemetry.reset()
+    return acquired
+
+
+def test_stream_holds_lease_until_exhausted(ollama_server, leases):
+    agent = _Writer("gemma3:latest", "Writer")
+    stream = agent.chat(MESSAGES, stream=True)
+
+    first = next(stream)
+    assert first['message']['content']
+    assert [lease.model for lease in leases] == ["gemma3:latest"]
+    assert not leases[0]._released
+
+    rest = list(stream)
+    assert rest[-1]['done']
+    assert leases[0]._released
+    assert telemetry.records[-1]['streamed']
+
+
+def test_stream_released_when_closed_early(ollama_server, leases):
+    agent = _Writer("gemma3:latest", "Writer")
+    stream = agent.chat(MESSAGES, stream=True)
+    next(stream)
+
+    stream.close()
+
+    assert leases[0]._released
+
+
+def test_stream_fails_over_before_first_token(ollama_server, leases):
+    agent = _Writer("tidak-ada:1b", "Writer")
+
+    text = "".join(
+        chunk['message']['content'] for chunk in agent.chat(MESSAGES, stream=True)
+    )
+
+    assert text
+    # Model utama gagal sebelum token pertama: izinnya dilepas, cadangan dipakai
+    assert [lease.model for lease in leases] == ["tidak-ada:1b", "gemma3:latest"]
+    assert all(lease._released for lease in leases)
+    assert telemetry.records[-1]['model'] == "gemma3:latest"
@@ -0,0 +1,97 @@
+"""Test decode, repair_prompt dan schema output terstruktur."""
+
+import json
+
+import pytest
+
+from agentwritebook.utils.structured_output import (
+    MAX_REPORTED_ERRORS,
+    FictionOutline,
+    StructuredOutputError,
+    decode,
+    outline_schema,
+    repair_prompt,
+    review_model,
+)
+
+OUTLINE = {
+    "title": "Judul",
+    "synopsis": "Sinopsis",
+    "chapters": [
+        {"number": 1, "title": "Awal", "description": "Pembuka"},
+        {"number": 2, "title": "Akhir", "description": "Penutup", "key_events": ["x"]},
+    ],
+}
+
+
+def test_decode_valid_json():
+    outline = decode(FictionOutline, json.dumps(OUTLINE))
+
+    assert outline.title == "Judul"
+    assert outline.genre == "fiction"
+    assert [c.number for c in outline.chapters] == [1, 2]
+
+
+def test_decode_json_wrapped_in_markdown():
+    text = "Berikut outline-nya:\n```json\n" + json.dumps(OUTLINE, indent=2)[:-1] + ",}\n```\nSemoga membantu."
+
+    outline = decode(FictionOutline, text)
+
+    assert outline.chapters[1].key_events == ["x"]
+
+
+def test_decode_reports_validation_errors():
+    bad = {"title": "Judul", "chapters": [{"number": "satu", "title": "Awal"}]}
+
+    with pytest.raises(StructuredOutputError) as info:
+        decode(FictionOutline, json.dumps(bad))
+
+    errors = info.value.errors
+    assert "chapters.0.number: Input should be a valid integer, unable to parse string as an integer" in errors
+    assert any(error.startswith("chapters.0.description:") for error in errors)
+    assert info.value.text == json.dumps(bad)
+
+
+@pytest.mark.parametrize("text", ["", "tidak ada json", '{"title": }'])
+def test_decode_rejects_non_json(text):
+    with pytest.raises(StructuredOutputError) as info:
+        decode(FictionOutline, text)
+
+    assert info.value.errors
+
+
+def test_repair_prompt_lists_errors_and_schema():
+    error = StructuredOutputError("{}", [f"field{i}: Field required" for i in range(MAX_REPORTED_ERRORS + 3)])
+
+    prompt = repair_prompt(error)
+    assert "- field0: Field required" in prompt
+    assert f"- field{MAX_REPORTED_ERRORS - 1}: Field required" in prompt
+    assert f"field{MAX_REPORTED_ERRORS}:" not in prompt
+    assert "Schema:" not in prompt
+
+    schema = outline_schema("fiction", 3)
+    with_schema = repair_prompt(error, schema)
+    assert with_schema.endswith(json.dumps(schema, ensure_ascii=False))
+
+
+def test_outline_schema_fixes_chapter_count():
+    chapters = outline_schema("non_fiction", 7)['properties']['chapters']
+
+    assert chapters['minItems'] == chapters['maxItems'] == 7
+
+
+def test_review_model_bounds_scores():
+    model = review_model(("pacing", "dialogue"))
+    review = {
+        "overall_assessment": "Bagus",
+        "scores": {"pacing": 8, "dialogue": 7.5},
+        "overall_score": 8,
+    }
+
+    assert decode(model, json.dumps(review)).scores.dialogue == 7.5
+    assert review_model(("pacing", "dialogue")) is model
+
+    review["scores"]["pacing"] = 11
+    with pytest.raises(StructuredOutputError) as info:
+        decode(model, json.dumps(review))
+    assert [error.split(":")[0] for error in info.value.errors] == ["scores.pacing"]
@@ -0,0 +1,62 @@
+"""Test estimasi token dan sizing num_ctx / num_predict."""
+
+import pytest
+
+from agentwritebook.utils.token_budget import (
+    TokenBudget,
+    estimate_prompt_tokens,
+    estimate_tokens,
+    words_to_tokens,
+)
+
+
+def _messages(prompt_tokens):
+    # 3.5 karakter per token (default ContextConfig.chars_per_token)
+    return [{"role": "user", "content": "x" * int(prompt_tokens * 3.5)}]
+
+
+@pytest.fixture
+def budget():
+    return TokenBudget(min_ctx=2048, max_ctx=16384)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("x" * 35) == 10
+    # Overhead template per message
+    assert estimate_prompt_tokens([{"role": "user", "content": "x" * 35}]) == 14
+
+
+def test_num_ctx_uses_power_of_two_buckets(budget):
+    assert budget.plan(_messages(100), 200)["num_ctx"] == 2048
+    assert budget.plan(_messages(1000), 2000)["num_ctx"] == 4096
+    assert budget.plan(_messages(1000), 5000)["num_ctx"] == 8192
+    # Call sejenis dengan prompt sedikit berbeda tetap di bucket yang sama
+    assert budget.plan(_messages(1100), 2000)["num_ctx"] == 4096
+
+
+def test_num_ctx_capped_at_max(budget):
+    assert budget.plan(_messages(10_000), 20_000)["num_ctx"] == 16384
+
+
+@pytest.mark.parametrize("prompt_tokens,output_tokens", [
+    (100, 200),
+    (1000, words_to_tokens(1500)),
+    (3000, 4000),
+    (12_000, 8000),   # context mentok di max_ctx
+    (16_300, 1000),   # prompt hampir memenuhi context
+])
+def test_prompt_plus_output_fits_context(budget, prompt_tokens, output_tokens):
+    messages = _messages(prompt_tokens)
+    options = budget.plan(messages, output_tokens)
+
+    assert options["num_predict"] >= 1
+    assert estimate_prompt_tokens(messages) + options["num_predict"] <= options["num_ctx"]
+
+
+def test_num_predict_not_capped_at_target(budget):
+    # Target minimal kata bukan batas atas: sisa bucket tetap boleh dipakai
+    output_tokens = words_to_tokens(1500)
+    options = budget.plan(_messages(1000), output_tokens)
+
+    assert options["num_predict"] > output_tokens